@@ -9,7 +9,7 @@ import {
   Alert,
 } from "react-native";
 import { SafeAreaView } from "react-native-safe-area-context";
-import api from "../../lib/api";
+import { getAllPages } from "../../lib/api";
 import { Order } from "../../types";
 import StatusBadge from "../../components/StatusBadge";
 import EmptyState from "../../components/EmptyState";
@@ -21,8 +21,8 @@ export default function CompletedOrdersScreen() {
 
   const fetchOrders = async () => {
     try {
-      const response = await api.get<Order[]>("/agent/orders");
-      const completed = response.data.filter((o) =>
+      const orders = await getAllPages<Order>("/agent/orders");
+      const completed = orders.filter((o) =>
         ["pickup completed", "payment_processed", "completed"].includes(
           o.status,
         ),
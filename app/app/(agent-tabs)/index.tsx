@@ -13,7 +13,7 @@ import {
 import { SafeAreaView } from "react-native-safe-area-context";
 import { useAuth } from "../../context/AuthContext";
 import { useRouter } from "expo-router";
-import api from "../../lib/api";
+import { getAllPages } from "../../lib/api";
 import { Order } from "../../types";
 import StatusBadge from "../../components/StatusBadge";
 import EmptyState from "../../components/EmptyState";
@@ -33,9 +33,9 @@ export default function AgentDashboardScreen() {
 
   const fetchOrders = async () => {
     try {
-      const response = await api.get<Order[]>("/agent/orders");
+      const orders = await getAllPages<Order>("/agent/orders");
 
-      setOrders(response.data);
+      setOrders(orders);
     } catch (error: any) {
       if (error.response?.status !== 401) {
         Alert.alert("Error", "Failed to fetch orders");
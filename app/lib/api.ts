@@ -79,4 +79,16 @@ export const tokenManager = {
   },
 };
 
+// Fetch every page of a keyset-paginated list endpoint (follows X-Next-Cursor)
+export async function getAllPages<T>(url: string, params: Record<string, unknown> = {}): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await api.get<T[]>(url, { params: { ...params, ...(cursor ? { cursor } : {}) } });
+    items.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return items;
+}
+
 export default api;
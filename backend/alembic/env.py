@@ -29,8 +29,8 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 from backend.shared.db.connections import Base
 from backend.services.auth.models import User # noqa: F401
-from backend.services.partner.schema.models import Partner, Agent, PartnerServiceablePincode, PartnerHold # noqa: F401
-from backend.services.admin.schema.models import AdminCreditConfiguration, Admin, PartnerCreditTransaction, PartnerVerificationHistory # noqa: F401
+from backend.services.partner.schema.models import Partner, Agent, PartnerServiceablePincode, PartnerHold, AgentOrderTombstone, PincodeCentroid # noqa: F401
+from backend.services.admin.schema.models import AdminCreditConfiguration, Admin, PartnerCreditTransaction, PartnerVerificationHistory, DashboardCounter, PartnerCreditSnapshot # noqa: F401
 from backend.services.sell_phone.schema.models import PhoneList, LeadLock, Order, OrderStatusHistory # noqa: F401
 
 
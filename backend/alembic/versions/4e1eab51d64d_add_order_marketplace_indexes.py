@@ -0,0 +1,47 @@
+"""add order marketplace indexes
+
+Revision ID: 4e1eab51d64d
+Revises: 9f720109393e
+Create Date: 2026-10-19 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e1eab51d64d'
+down_revision: Union[str, Sequence[str], None] = '9f720109393e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Legacy orders only carry `pincode`; backfill so marketplace queries can
+    # filter on pickup_pincode alone and use the indexes below.
+    op.execute(
+        "UPDATE orders SET pickup_pincode = pincode "
+        "WHERE pickup_pincode IS NULL AND pincode IS NOT NULL"
+    )
+
+    op.create_index('ix_orders_status_pickup_pincode_created_at', 'orders', ['status', 'pickup_pincode', 'created_at'], unique=False)
+    op.create_index(
+        'ix_orders_available_pickup_pincode_created_at', 'orders', ['pickup_pincode', 'created_at'], unique=False,
+        postgresql_where=sa.text("status = 'available_for_partners'"),
+        sqlite_where=sa.text("status = 'available_for_partners'"),
+    )
+    op.create_index('ix_orders_partner_id_status_lead_locked_at', 'orders', ['partner_id', 'status', 'lead_locked_at'], unique=False)
+    op.create_index('ix_orders_partner_id_purchased_at', 'orders', ['partner_id', 'purchased_at'], unique=False)
+    op.create_index('ix_orders_agent_id_assigned_at', 'orders', ['agent_id', 'assigned_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_agent_id_assigned_at', table_name='orders')
+    op.drop_index('ix_orders_partner_id_purchased_at', table_name='orders')
+    op.drop_index('ix_orders_partner_id_status_lead_locked_at', table_name='orders')
+    op.drop_index('ix_orders_available_pickup_pincode_created_at', table_name='orders')
+    op.drop_index('ix_orders_status_pickup_pincode_created_at', table_name='orders')
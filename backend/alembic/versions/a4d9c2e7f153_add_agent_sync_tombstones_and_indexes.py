@@ -0,0 +1,50 @@
+"""add agent_order_tombstones table and agent delta sync indexes
+
+Revision ID: a4d9c2e7f153
+Revises: e6b0f3a2c871
+Create Date: 2026-10-19 14:21:48.503617
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d9c2e7f153'
+down_revision: Union[str, Sequence[str], None] = 'e6b0f3a2c871'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('agent_order_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('agent_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['agent_id'], ['agents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_agent_order_tombstones_id'), 'agent_order_tombstones', ['id'], unique=False)
+    op.create_index(
+        'ix_agent_order_tombstones_agent_id_created_at', 'agent_order_tombstones',
+        ['agent_id', 'created_at'], unique=False
+    )
+    op.create_index('ix_orders_agent_id_updated_at', 'orders', ['agent_id', 'updated_at'], unique=False)
+    op.create_index(
+        'ix_order_status_history_order_id_created_at', 'order_status_history',
+        ['order_id', 'created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_status_history_order_id_created_at', table_name='order_status_history')
+    op.drop_index('ix_orders_agent_id_updated_at', table_name='orders')
+    op.drop_index('ix_agent_order_tombstones_agent_id_created_at', table_name='agent_order_tombstones')
+    op.drop_index(op.f('ix_agent_order_tombstones_id'), table_name='agent_order_tombstones')
+    op.drop_table('agent_order_tombstones')
@@ -0,0 +1,35 @@
+"""add dashboard_counters table
+
+Revision ID: b5c2e8a41f07
+Revises: 4e1eab51d64d
+Create Date: 2026-10-19 10:03:27.118904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5c2e8a41f07'
+down_revision: Union[str, Sequence[str], None] = '4e1eab51d64d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows are populated by the first reconciliation (on first dashboard
+    # read or by the periodic job), not here.
+    op.create_table('dashboard_counters',
+    sa.Column('counter_key', sa.String(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('counter_key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('dashboard_counters')
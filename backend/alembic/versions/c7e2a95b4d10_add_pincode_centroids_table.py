@@ -0,0 +1,37 @@
+"""add pincode_centroids table
+
+Revision ID: c7e2a95b4d10
+Revises: a4d9c2e7f153
+Create Date: 2026-10-19 15:37:02.941186
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a95b4d10'
+down_revision: Union[str, Sequence[str], None] = 'a4d9c2e7f153'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows are loaded with import_pincode_centroids.py, not here.
+    op.create_table('pincode_centroids',
+    sa.Column('pincode', sa.String(), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('district', sa.String(), nullable=True),
+    sa.Column('state', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('pincode')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('pincode_centroids')
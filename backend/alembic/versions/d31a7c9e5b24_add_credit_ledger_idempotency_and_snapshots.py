@@ -0,0 +1,49 @@
+"""add credit ledger idempotency key and balance snapshots
+
+Revision ID: d31a7c9e5b24
+Revises: b5c2e8a41f07
+Create Date: 2026-10-19 11:21:54.730162
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd31a7c9e5b24'
+down_revision: Union[str, Sequence[str], None] = 'b5c2e8a41f07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('partner_credit_transactions', sa.Column('idempotency_key', sa.String(), nullable=True))
+    op.create_index(op.f('ix_partner_credit_transactions_idempotency_key'), 'partner_credit_transactions', ['idempotency_key'], unique=True)
+
+    op.create_table('partner_credit_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('partner_id', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.Column('last_transaction_id', sa.Integer(), nullable=False),
+    sa.Column('covered_through_id', sa.Integer(), nullable=False),
+    sa.Column('drift', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['partner_id'], ['partners.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_partner_credit_snapshots_id'), 'partner_credit_snapshots', ['id'], unique=False)
+    op.create_index(op.f('ix_partner_credit_snapshots_partner_id'), 'partner_credit_snapshots', ['partner_id'], unique=False)
+    op.create_index(op.f('ix_partner_credit_snapshots_covered_through_id'), 'partner_credit_snapshots', ['covered_through_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_partner_credit_snapshots_covered_through_id'), table_name='partner_credit_snapshots')
+    op.drop_index(op.f('ix_partner_credit_snapshots_partner_id'), table_name='partner_credit_snapshots')
+    op.drop_index(op.f('ix_partner_credit_snapshots_id'), table_name='partner_credit_snapshots')
+    op.drop_table('partner_credit_snapshots')
+    op.drop_index(op.f('ix_partner_credit_transactions_idempotency_key'), table_name='partner_credit_transactions')
+    op.drop_column('partner_credit_transactions', 'idempotency_key')
@@ -0,0 +1,78 @@
+"""add normalized variant keys and unique index to phones_list
+
+Revision ID: e6b0f3a2c871
+Revises: d31a7c9e5b24
+Create Date: 2026-10-19 12:04:17.318452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b0f3a2c871'
+down_revision: Union[str, Sequence[str], None] = 'd31a7c9e5b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Duplicate variant rows removed from phones_list by upgrade
+BACKUP_TABLE = 'phones_list_variant_duplicates'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('phones_list', sa.Column('brand_key', sa.String(), nullable=True))
+    op.add_column('phones_list', sa.Column('model_key', sa.String(), nullable=True))
+    op.execute("UPDATE phones_list SET brand_key = LOWER(TRIM(\"Brand\")), model_key = LOWER(TRIM(\"Model\"))")
+
+    # The unique index cannot be built over duplicate variants. Keep the
+    # lowest id of each (the row bulk imports already update) and move the
+    # others to BACKUP_TABLE, listing every conflicting group; downgrade puts
+    # them back. Rows with a NULL RAM_GB are left alone: the index does not
+    # treat NULLs as equal, so they do not conflict.
+    bind = op.get_bind()
+    variant = "brand_key, model_key, \"RAM_GB\", \"Internal_Storage_GB\""
+    duplicates = bind.execute(sa.text(
+        f"SELECT {variant}, COUNT(*) AS n FROM phones_list WHERE \"RAM_GB\" IS NOT NULL "
+        f"GROUP BY {variant} HAVING COUNT(*) > 1 ORDER BY brand_key, model_key"
+    )).fetchall()
+    if duplicates:
+        losers = (
+            f"SELECT id FROM phones_list WHERE \"RAM_GB\" IS NOT NULL AND id NOT IN ("
+            f"SELECT MIN(id) FROM phones_list WHERE \"RAM_GB\" IS NOT NULL GROUP BY {variant})"
+        )
+        print(f"phones_list: {len(duplicates)} variants have duplicate rows; "
+              f"moving all but the lowest id of each to {BACKUP_TABLE}:")
+        for brand_key, model_key, ram_gb, storage_gb, count in duplicates:
+            rows = bind.execute(sa.text(
+                "SELECT id, \"Storage_Raw\", \"Selling_Price\" FROM phones_list "
+                "WHERE brand_key = :b AND model_key = :m AND \"RAM_GB\" = :r AND \"Internal_Storage_GB\" = :s "
+                "ORDER BY id"
+            ), {"b": brand_key, "m": model_key, "r": ram_gb, "s": storage_gb}).fetchall()
+            print(f"  {brand_key} / {model_key} / {ram_gb}GB / {storage_gb}GB: keep id {rows[0].id}, move "
+                  + ", ".join(f"id {r.id} ({r.Storage_Raw}, {r.Selling_Price})" for r in rows[1:]))
+        op.execute(f"CREATE TABLE {BACKUP_TABLE} AS SELECT * FROM phones_list WHERE 1 = 0")
+        op.execute(f"INSERT INTO {BACKUP_TABLE} SELECT * FROM phones_list WHERE id IN ({losers})")
+        op.execute(f"DELETE FROM phones_list WHERE id IN (SELECT id FROM {BACKUP_TABLE})")
+
+    with op.batch_alter_table('phones_list') as batch_op:
+        batch_op.alter_column('brand_key', existing_type=sa.String(), nullable=False)
+        batch_op.alter_column('model_key', existing_type=sa.String(), nullable=False)
+    op.create_index(
+        'ux_phones_list_variant', 'phones_list',
+        ['brand_key', 'model_key', 'RAM_GB', 'Internal_Storage_GB'], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_phones_list_variant', table_name='phones_list')
+    if sa.inspect(op.get_bind()).has_table(BACKUP_TABLE):
+        # Restore the rows moved aside by upgrade (columns match, keys included)
+        op.execute(f"INSERT INTO phones_list SELECT * FROM {BACKUP_TABLE}")
+        op.drop_table(BACKUP_TABLE)
+    with op.batch_alter_table('phones_list') as batch_op:
+        batch_op.drop_column('model_key')
+        batch_op.drop_column('brand_key')
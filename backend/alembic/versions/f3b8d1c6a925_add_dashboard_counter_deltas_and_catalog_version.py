@@ -0,0 +1,65 @@
+"""add dashboard_counter_deltas and catalog_version tables
+
+Revision ID: f3b8d1c6a925
+Revises: c7e2a95b4d10
+Create Date: 2026-10-19 17:12:40.276315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d1c6a925'
+down_revision: Union[str, Sequence[str], None] = 'c7e2a95b4d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('dashboard_counter_deltas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('counter_key', sa.String(), nullable=False),
+    sa.Column('delta', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_dashboard_counter_deltas_id'), 'dashboard_counter_deltas', ['id'], unique=False)
+    op.create_table('catalog_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # The catalog version used to be a dashboard counter; carry it over so
+    # cached catalog ETags stay valid
+    op.execute(
+        "INSERT INTO catalog_version (id, version, updated_at) "
+        "SELECT 1, CAST(value AS INTEGER), updated_at FROM dashboard_counters WHERE counter_key = 'catalog_version'"
+    )
+    op.execute("DELETE FROM dashboard_counters WHERE counter_key = 'catalog_version'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fold pending deltas back into the counters so no counted change is lost
+    op.execute(
+        "UPDATE dashboard_counters SET value = value + ("
+        "SELECT SUM(d.delta) FROM dashboard_counter_deltas d WHERE d.counter_key = dashboard_counters.counter_key"
+        ") WHERE counter_key IN (SELECT counter_key FROM dashboard_counter_deltas)"
+    )
+    op.execute(
+        "INSERT INTO dashboard_counters (counter_key, value) "
+        "SELECT counter_key, SUM(delta) FROM dashboard_counter_deltas "
+        "WHERE counter_key NOT IN (SELECT counter_key FROM dashboard_counters) GROUP BY counter_key"
+    )
+    op.execute(
+        "INSERT INTO dashboard_counters (counter_key, value, updated_at) "
+        "SELECT 'catalog_version', version, updated_at FROM catalog_version WHERE id = 1"
+    )
+    op.drop_table('catalog_version')
+    op.drop_index(op.f('ix_dashboard_counter_deltas_id'), table_name='dashboard_counter_deltas')
+    op.drop_table('dashboard_counter_deltas')
@@ -0,0 +1,154 @@
+"""
+Sync vs async database session throughput.
+
+Serves the public catalog listing (GET /sell-phone/phones, now async on
+get_async_db) next to a synchronous twin that runs the same queries through
+get_db in FastAPI's threadpool, and fires concurrent requests at each
+(in-process, over ASGI). Reports requests/sec and latency percentiles.
+
+The threadpool is capped at --threadpool tokens (FastAPI/AnyIO default: 40),
+which is what limits the sync handler's concurrency. The difference grows with
+database round-trip time, so run against a real server for meaningful numbers:
+
+Run:
+    python backend/benchmarks/async_db_throughput.py --requests 2000 --concurrency 200
+    python backend/benchmarks/async_db_throughput.py --database-url postgresql://user:pw@host/db
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from math import ceil
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per variant")
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent in-flight requests")
+    parser.add_argument("--threadpool", type=int, default=40, help="Threadpool tokens for sync handlers")
+    parser.add_argument("--phones", type=int, default=2000, help="Catalog rows to seed (scratch SQLite only)")
+    parser.add_argument("--database-url", default=None, help="Existing database (default: scratch SQLite)")
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def seed(args):
+    from backend.shared.db.connections import SessionLocal, engine, Base
+    from backend.services.auth.models import User  # noqa: F401
+    from backend.services.partner.schema.models import Partner  # noqa: F401
+    from backend.services.admin.schema.models import Admin  # noqa: F401
+    from backend.services.sell_phone.schema.models import PhoneList
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    if db.query(PhoneList.id).first() is None:
+        db.add_all(
+            PhoneList(
+                Brand=f"Brand {i % 40}", Series="S", Model=f"Model {i // 4}", Storage_Raw="x",
+                Selling_Price=1000 + i, RAM_GB=4 + i % 4, Internal_Storage_GB=64 * (1 + i % 4),
+            )
+            for i in range(args.phones)
+        )
+        db.commit()
+    db.close()
+
+
+def build_app():
+    from fastapi import Depends, FastAPI, Query
+    from sqlalchemy import func
+    from sqlalchemy.orm import Session
+
+    from backend.shared.db.connections import get_db
+    from backend.services.sell_phone.apis.routes import router as sell_phone_router
+    from backend.services.sell_phone.schema.models import PhoneList
+
+    app = FastAPI()
+    app.include_router(sell_phone_router)
+
+    @app.get("/sync/phones")
+    def sync_phones(
+        db: Session = Depends(get_db),
+        page: int = Query(1, ge=1),
+        limit: int = Query(10, ge=1, le=100),
+    ):
+        subquery = db.query(
+            PhoneList.brand_key,
+            PhoneList.model_key,
+            func.max(PhoneList.id).label('max_id'),
+            func.max(PhoneList.Selling_Price).label('highest_price')
+        ).group_by(PhoneList.brand_key, PhoneList.model_key).subquery()
+        query = db.query(PhoneList, subquery.c.highest_price).join(subquery, PhoneList.id == subquery.c.max_id)
+        total = query.count()
+        rows = query.offset((page - 1) * limit).limit(limit).all()
+        return {
+            "phones": [{"id": phone.id, "Selling_Price": price} for phone, price in rows],
+            "total": total,
+            "total_pages": ceil(total / limit),
+        }
+
+    return app
+
+
+async def measure(client, path, args):
+    latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            r = await client.get(path, params={"page": 1 + i % 20})
+            latencies.append(time.perf_counter() - start)
+            assert r.status_code == 200, r.text
+
+    await one(0)  # warm up
+    latencies.clear()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    return args.requests / elapsed, latencies
+
+
+async def run(args):
+    import httpx
+    from anyio import to_thread
+    from backend.shared.db.connections import dispose_async_engine
+
+    to_thread.current_default_thread_limiter().total_tokens = args.threadpool
+    app = build_app()
+
+    print(f"requests={args.requests} concurrency={args.concurrency} threadpool={args.threadpool}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name, path in (("sync  (get_db)", "/sync/phones"), ("async (get_async_db)", "/sell-phone/phones")):
+            rate, latencies = await measure(client, path, args)
+            print(f"  {name:<22} {rate:8.1f} req/s   p50={statistics.median(latencies) * 1000:7.1f}ms "
+                  f"p95={percentile(latencies, 95) * 1000:7.1f}ms p99={percentile(latencies, 99) * 1000:7.1f}ms")
+    await dispose_async_engine()
+
+
+def main():
+    args = parse_args()
+    # Connection settings are read at import time, so set them before importing the app
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        workdir = tempfile.mkdtemp(prefix="async-bench-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    # Enough connections that the pool is not the bottleneck being measured
+    os.environ.setdefault("DB_POOL_SIZE", str(max(args.threadpool, 20)))
+    os.environ.setdefault("DB_POOL_PRE_PING", "off")
+    seed(args)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Connection pool load benchmark.
+
+Runs concurrent workers that each check out a connection, run a small query,
+hold the connection for --hold-ms (simulating request work) and return it,
+once per pool configuration. Reports throughput, checkout wait percentiles
+and timeouts for each, using the same instrumented pool as the app.
+
+Configurations are given as size:overflow:pre_ping (pre_ping = always|off).
+
+Run:
+    python backend/benchmarks/db_pool.py --threads 64 --ops 2000
+    python backend/benchmarks/db_pool.py --database-url postgresql://... \\
+        --config 5:10:always --config 5:10:off --config 20:10:off
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+DEFAULT_CONFIGS = ["5:10:always", "5:10:off", "20:10:off", "50:0:off"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=64, help="Concurrent workers")
+    parser.add_argument("--ops", type=int, default=2000, help="Checkouts per configuration")
+    parser.add_argument("--hold-ms", type=float, default=2.0, help="Time each checkout holds its connection")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Pool checkout timeout (seconds)")
+    parser.add_argument("--config", action="append", help="size:overflow:pre_ping (repeatable)")
+    parser.add_argument("--database-url", default=None, help="Default: scratch SQLite file")
+    return parser.parse_args()
+
+
+def run_config(url, connect_args, size, overflow, pre_ping, args):
+    from sqlalchemy import create_engine, exc, text
+    from backend.shared.db.pool import InstrumentedQueuePool, pool_status
+
+    engine = create_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=InstrumentedQueuePool,
+        pool_size=size,
+        max_overflow=overflow,
+        pool_timeout=args.timeout,
+        pool_pre_ping=pre_ping == "always",
+    )
+    hold = args.hold_ms / 1000
+
+    def work(_):
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1")).scalar()
+                time.sleep(hold)
+            return True
+        except exc.TimeoutError:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        results = list(executor.map(work, range(args.ops)))
+    elapsed = time.perf_counter() - start
+
+    status = pool_status(engine)
+    engine.dispose()
+    return {
+        "ops_per_sec": sum(results) / elapsed,
+        "timeouts": status["timeouts"],
+        "wait_ms": status["wait_ms"],
+    }
+
+
+def main():
+    args = parse_args()
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'pool.db')}"
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+
+    print(f"{args.ops} checkouts, {args.threads} threads, {args.hold_ms} ms hold")
+    print(f"{'config':<16}{'ops/s':>10}{'wait p50':>11}{'wait p95':>11}{'wait p99':>11}{'max':>10}{'timeouts':>10}")
+    for config in args.config or DEFAULT_CONFIGS:
+        size, overflow, pre_ping = config.split(":")
+        result = run_config(url, connect_args, int(size), int(overflow), pre_ping, args)
+        wait = result["wait_ms"]
+        print(
+            f"{config:<16}{result['ops_per_sec']:>10.0f}{wait['p50']:>9.2f}ms{wait['p95']:>9.2f}ms"
+            f"{wait['p99']:>9.2f}ms{wait['max']:>8.1f}ms{result['timeouts']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+List response serialization benchmark.
+
+Serves the same 1k-row payloads through two routes: one returning the data
+for FastAPI to validate against the response_model and encode with the
+stdlib encoder (the old path), one returning it through
+backend.shared.responses (schema projection + orjson). Payload shapes match
+the list endpoints that use the fast path: customer orders (ORM objects,
+OrderOut), partner orders (dicts, PartnerOrderBriefOut), locked deals (dicts,
+LockedDealOut with exclude_unset), agent orders (dicts, AgentOrderListItem)
+and the admin order page (AdminOrderPaginatedOut). Checks that both routes return the same
+JSON, then reports the mean and p95 request time for each.
+
+No database is needed; rows are built in memory.
+
+Run:
+    python backend/benchmarks/json_responses.py --rows 1000 --iterations 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per payload")
+    parser.add_argument("--iterations", type=int, default=200, help="Requests per route")
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def build_orders(n):
+    from backend.services.auth.models import User  # noqa: F401
+    from backend.services.partner.schema.models import Partner  # noqa: F401
+    from backend.services.admin.schema.models import Admin  # noqa: F401
+    from backend.services.sell_phone.schema.models import Order
+
+    created = datetime(2026, 10, 1, 9, 30, tzinfo=timezone.utc)
+    return [
+        Order(
+            id=i + 1, customer_id=7, user_id=7, partner_id=3, agent_id=5,
+            phone_name=f"Brand {i % 40} Model {i % 500}", brand=f"Brand {i % 40}", model=f"Model {i % 500}",
+            ram_gb=float(4 + i % 8), storage_gb=float(64 * (1 + i % 4)), variant="Black",
+            ai_estimated_price=12000.0 + i, ai_reasoning="Price provided by customer",
+            customer_condition_answers={"screen": "good", "body": "minor scratches", "battery": 87},
+            quoted_price=12000.0 + i, final_quoted_price=12000.0 + i,
+            customer_name=f"Customer {i}", customer_phone="9876543210", customer_email=f"c{i}@example.com",
+            pickup_address_line="12 MG Road", pickup_city="Mumbai", pickup_state="MH", pickup_pincode="400001",
+            pickup_date=created + timedelta(days=2), pickup_time="10:00", payment_method="upi",
+            status="lead_locked", agent_name="Agent", lead_locked_at=created,
+            lead_lock_expires_at=created + timedelta(minutes=15), created_at=created + timedelta(minutes=i),
+            updated_at=created + timedelta(minutes=i),
+        )
+        for i in range(n)
+    ]
+
+
+def build_payloads(orders):
+    from backend.services.partner.schema.schemas import LockedDealOut
+
+    partner_rows = [
+        {c: getattr(o, c) for c in (
+            "id", "phone_name", "ram_gb", "storage_gb", "status", "ai_estimated_price", "final_quoted_price",
+            "ai_reasoning", "customer_name", "customer_phone", "customer_email", "pickup_address_line",
+            "pickup_city", "pickup_state", "pickup_pincode", "agent_name", "agent_id",
+            "customer_condition_answers", "created_at",
+        )}
+        for o in orders
+    ]
+    locked_fields = [f for f in LockedDealOut.model_fields if f not in ("lead_cost", "time_remaining")]
+    locked_rows = [{**{f: getattr(o, f) for f in locked_fields}, "lead_cost": 240.0, "time_remaining": 600.0}
+                   for o in orders]
+    agent_rows = [
+        {"id": o.id, "phone_name": o.phone_name, "brand": o.brand, "model": o.model,
+         "specs": f"{int(o.ram_gb)}GB RAM • {int(o.storage_gb)}GB Storage", "status": o.status,
+         "estimated_value": o.ai_estimated_price, "customer_name": o.customer_name,
+         "customer_phone": o.customer_phone, "pickup_address_line": o.pickup_address_line,
+         "pickup_city": o.pickup_city, "pickup_state": o.pickup_state, "pickup_pincode": o.pickup_pincode,
+         "pickup_date": o.pickup_date.strftime('%d/%m/%Y'), "pickup_time": o.pickup_time,
+         "payment_method": o.payment_method, "ram_gb": o.ram_gb, "storage_gb": o.storage_gb,
+         "ai_estimated_price": o.ai_estimated_price, "final_quoted_price": o.final_quoted_price,
+         "status_detail": o.status}
+        for o in orders
+    ]
+    admin_page = {
+        "items": [{"id": o.id, "phone_name": o.phone_name, "customer_name": o.customer_name,
+                   "partner_name": "Partner Co", "agent_name": o.agent_name, "status": o.status,
+                   "quoted_price": o.quoted_price, "created_at": o.created_at} for o in orders],
+        "total": 250000, "page": 1, "limit": len(orders), "total_pages": 250, "has_more": True,
+        "next_cursor": "eyJ2IjogIjIwMjYtMTAtMDEifQ",
+    }
+    return partner_rows, locked_rows, agent_rows, admin_page
+
+
+def build_app(args):
+    from fastapi import FastAPI
+
+    from backend.shared import responses
+    from backend.services.sell_phone.schema.schemas import OrderOut
+    from backend.services.partner.schema.schemas import AgentOrderListItem, LockedDealOut, PartnerOrderBriefOut
+    from backend.services.admin.schema.schemas import AdminOrderPaginatedOut
+
+    # The fast path is opt-in (FAST_JSON_RESPONSES); measure it regardless of the env
+    responses.FAST_JSON_RESPONSES = True
+    orders = build_orders(args.rows)
+    partner_rows, locked_rows, agent_rows, admin_page = build_payloads(orders)
+    app = FastAPI()
+
+    @app.get("/std/my-orders", response_model=List[OrderOut])
+    def std_my_orders():
+        return orders
+
+    @app.get("/fast/my-orders", response_model=List[OrderOut])
+    def fast_my_orders():
+        return responses.list_response(orders, OrderOut)
+
+    @app.get("/std/partner-orders", response_model=List[PartnerOrderBriefOut])
+    def std_partner_orders():
+        return partner_rows
+
+    @app.get("/fast/partner-orders", response_model=List[PartnerOrderBriefOut])
+    def fast_partner_orders():
+        return responses.list_response(partner_rows, PartnerOrderBriefOut)
+
+    @app.get("/std/locked-deals", response_model=List[LockedDealOut], response_model_exclude_unset=True)
+    def std_locked_deals():
+        return locked_rows
+
+    @app.get("/fast/locked-deals", response_model=List[LockedDealOut], response_model_exclude_unset=True)
+    def fast_locked_deals():
+        return responses.list_response(locked_rows, LockedDealOut, exclude_unset=True)
+
+    @app.get("/std/agent-orders", response_model=List[AgentOrderListItem])
+    def std_agent_orders():
+        return agent_rows
+
+    @app.get("/fast/agent-orders", response_model=List[AgentOrderListItem])
+    def fast_agent_orders():
+        return responses.list_response(agent_rows, AgentOrderListItem)
+
+    @app.get("/std/admin-orders", response_model=AdminOrderPaginatedOut)
+    def std_admin_orders():
+        return admin_page
+
+    @app.get("/fast/admin-orders", response_model=AdminOrderPaginatedOut)
+    def fast_admin_orders():
+        return responses.model_response(admin_page, AdminOrderPaginatedOut)
+
+    return app
+
+
+async def run(args):
+    import httpx
+
+    app = build_app(args)
+    names = ["my-orders", "partner-orders", "locked-deals", "agent-orders", "admin-orders"]
+    print(f"rows={args.rows} iterations={args.iterations}\n")
+    print(f"{'payload':<16}{'bytes':>10}{'std ms':>10}{'p95':>8}{'fast ms':>10}{'p95':>8}{'speedup':>9}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name in names:
+            std = await client.get(f"/std/{name}")
+            fast = await client.get(f"/fast/{name}")
+            assert std.status_code == fast.status_code == 200, (std.text[:200], fast.text[:200])
+            assert json.loads(std.content) == json.loads(fast.content), f"{name}: responses differ"
+
+            timings = {}
+            for variant in ("std", "fast"):
+                samples = []
+                for _ in range(args.iterations):
+                    start = time.perf_counter()
+                    await client.get(f"/{variant}/{name}")
+                    samples.append(time.perf_counter() - start)
+                timings[variant] = samples
+
+            std_mean = statistics.mean(timings["std"]) * 1000
+            fast_mean = statistics.mean(timings["fast"]) * 1000
+            print(f"{name:<16}{len(fast.content):>10}{std_mean:>10.2f}{percentile(timings['std'], 95) * 1000:>8.2f}"
+                  f"{fast_mean:>10.2f}{percentile(timings['fast'], 95) * 1000:>8.2f}{std_mean / fast_mean:>8.1f}x")
+
+
+def main():
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
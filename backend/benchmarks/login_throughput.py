@@ -0,0 +1,137 @@
+"""
+Login throughput benchmark.
+
+Fires concurrent agent logins at the real /agent/login route (in-process,
+over ASGI) against a scratch SQLite database and reports logins/sec,
+logins/sec per hashing worker, login latency and the latency of a trivial
+sync endpoint measured during the spike (shows whether logins starve other
+requests of worker threads).
+
+Run:
+    python backend/benchmarks/login_throughput.py --requests 200 --concurrency 32
+    python backend/benchmarks/login_throughput.py --executor process --workers 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Total logins to perform")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent in-flight logins")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost (BCRYPT_ROUNDS)")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--workers", type=int, default=0, help="Hashing pool size (default: CPU count)")
+    parser.add_argument("--agents", type=int, default=50, help="Distinct agent accounts to log in as")
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+async def run(args):
+    import httpx
+    from fastapi import FastAPI
+
+    from backend.shared.db.connections import SessionLocal, engine, Base
+    from backend.services.auth.models import User  # noqa: F401
+    from backend.services.partner.schema.models import Partner, Agent
+    from backend.services.admin.schema.models import Admin  # noqa: F401
+    from backend.services.sell_phone.schema.models import Order  # noqa: F401
+    from backend.services.partner.apis.agent_routes import router as agent_router
+    from backend.shared.auth import hashing
+
+    Base.metadata.create_all(bind=engine)
+    password = "benchmark-password"
+    hashed = hashing.hash_password(password)
+    db = SessionLocal()
+    partner = Partner(
+        email="bench-partner@example.com", full_name="Bench", phone="9000000000",
+        hashed_password=hashed, verification_status="approved",
+    )
+    db.add(partner)
+    db.flush()
+    for i in range(args.agents):
+        db.add(Agent(
+            partner_id=partner.id, email=f"agent{i}@example.com", phone=f"90000{i:05d}",
+            hashed_password=hashed, full_name=f"Agent {i}", is_active=True,
+        ))
+    db.commit()
+    db.close()
+
+    app = FastAPI()
+    app.include_router(agent_router)
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    login_latencies, ping_latencies = [], []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def login(i):
+            async with semaphore:
+                start = time.perf_counter()
+                r = await client.post("/agent/login", json={
+                    "email": f"agent{i % args.agents}@example.com", "password": password,
+                })
+                login_latencies.append(time.perf_counter() - start)
+                assert r.status_code == 200, r.text
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/ping")
+                ping_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        # Warm up the pool
+        await login(0)
+        login_latencies.clear()
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+
+    hashing.shutdown_executor()
+    rate = args.requests / elapsed
+    print(f"executor={args.executor} workers={hashing.PASSWORD_HASH_WORKERS} rounds={args.rounds} "
+          f"requests={args.requests} concurrency={args.concurrency}")
+    print(f"  logins/sec:            {rate:.1f}")
+    print(f"  logins/sec per worker: {rate / hashing.PASSWORD_HASH_WORKERS:.1f}")
+    print(f"  login latency  p50={statistics.median(login_latencies) * 1000:.0f}ms "
+          f"p95={percentile(login_latencies, 95) * 1000:.0f}ms")
+    if ping_latencies:
+        print(f"  /ping during spike p50={statistics.median(ping_latencies) * 1000:.1f}ms "
+              f"p95={percentile(ping_latencies, 95) * 1000:.1f}ms")
+
+
+def main():
+    args = parse_args()
+    # Settings are read at import time, so set them before importing the app
+    workdir = tempfile.mkdtemp(prefix="login-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["PASSWORD_HASH_EXECUTOR"] = args.executor
+    if args.workers:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
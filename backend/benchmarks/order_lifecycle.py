@@ -0,0 +1,371 @@
+"""
+Order lifecycle load benchmark.
+
+Seeds a database with customers, approved partners (with serviceable
+pincodes, credits and agents), the phone catalog and a backlog of existing
+orders, then drives complete order lifecycles concurrently through the real
+routes (in-process, over ASGI):
+
+    create_order -> get_available_leads -> lock_lead -> purchase_lead ->
+    assign_agent -> schedule_pickup -> complete_pickup -> process_payment
+
+Reports overall lifecycles/sec and, per step, requests/sec, p50/p95/p99
+latency and the number of SQL statements per request. The price prediction
+(LLM) and image detection (YOLO) services are not on this path: customers
+submit the quote they were given, so the app is built from the order routers
+only and neither model is loaded.
+
+Results are compared with a baseline file; the run exits non-zero when a step
+runs more queries than its baseline (+QUERY_SLACK) or its p95 latency / the
+overall throughput is worse than the baseline by more than --tolerance.
+Query counts are portable between machines; latency baselines are not, so
+regenerate the baseline on the machine that runs the comparison:
+
+Run:
+    python backend/benchmarks/order_lifecycle.py --lifecycles 500 --concurrency 16
+    python backend/benchmarks/order_lifecycle.py --update-baseline
+    python backend/benchmarks/order_lifecycle.py --database-url postgresql://user:pw@host/db
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "order_lifecycle.json"
+
+STEPS = [
+    "create_order",
+    "get_available_leads",
+    "lock_lead",
+    "purchase_lead",
+    "assign_agent",
+    "schedule_pickup",
+    "complete_pickup",
+    "process_payment",
+]
+
+# Extra statements per request tolerated before a step counts as regressed
+QUERY_SLACK = 0.5
+# Latency differences below this are noise, whatever the ratio
+LATENCY_FLOOR_MS = 5.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lifecycles", type=int, default=300, help="Orders driven through the full flow")
+    parser.add_argument("--concurrency", type=int, default=16, help="Lifecycles in flight at once")
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--partners", type=int, default=50)
+    parser.add_argument("--pincodes", type=int, default=200, help="Distinct pincodes across partners")
+    parser.add_argument("--pincodes-per-partner", type=int, default=10)
+    parser.add_argument("--phones", type=int, default=2000, help="Catalog rows")
+    parser.add_argument("--orders", type=int, default=20000, help="Existing orders seeded before the run")
+    parser.add_argument("--database-url", default=None, help="Default: scratch SQLite file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="Allowed latency/throughput ratio vs baseline")
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def pincode(i):
+    return str(400000 + i)
+
+
+# ------------------------------
+# Seeding
+# ------------------------------
+
+def seed(args):
+    """Bulk-insert the fixture rows; returns {partner_id: (agent_id, [pincodes])}."""
+    from sqlalchemy import insert
+
+    from backend.shared.auth import hashing
+    from backend.shared.db.connections import SessionLocal, engine, Base
+    from backend.services.auth.models import User
+    from backend.services.partner.schema.models import Partner, PartnerServiceablePincode, Agent
+    from backend.services.admin.schema.models import Admin  # noqa: F401
+    from backend.services.sell_phone.schema.models import PhoneList, Order
+
+    Base.metadata.create_all(bind=engine)
+    # Accounts only authenticate by token here, so one cheap hash is enough
+    password = hashing.hash_password("benchmark", rounds=4)
+
+    db = SessionLocal()
+    try:
+        if db.query(Partner.id).filter(Partner.email == "bench-partner-0@example.com").first() is None:
+            db.execute(insert(User.__table__), [
+                {"email": f"bench-user-{i}@example.com", "full_name": f"Customer {i}", "phone": f"7{i:09d}",
+                 "hashed_password": password, "is_active": True, "pincode": pincode(i % args.pincodes)}
+                for i in range(args.customers)
+            ])
+            db.execute(insert(Partner.__table__), [
+                {"email": f"bench-partner-{i}@example.com", "full_name": f"Partner {i}", "phone": f"8{i:09d}",
+                 "hashed_password": password, "company_name": f"Partner Co {i}", "verification_status": "approved",
+                 "credit_balance": 1e9, "is_active": True}
+                for i in range(args.partners)
+            ])
+            partner_ids = [pid for (pid,) in db.query(Partner.id).filter(
+                Partner.email.like("bench-partner-%")).order_by(Partner.id)]
+            db.execute(insert(PartnerServiceablePincode.__table__), [
+                {"partner_id": pid, "pincode": pincode((n * args.pincodes_per_partner + k) % args.pincodes),
+                 "is_active": True}
+                for n, pid in enumerate(partner_ids)
+                for k in range(args.pincodes_per_partner)
+            ])
+            db.execute(insert(Agent.__table__), [
+                {"partner_id": pid, "email": f"bench-agent-{n}@example.com", "phone": f"9{n:09d}",
+                 "hashed_password": password, "full_name": f"Agent {n}", "is_active": True}
+                for n, pid in enumerate(partner_ids)
+            ])
+            db.execute(insert(PhoneList.__table__), [
+                {"Brand": f"Brand {i % 40}", "Series": "S", "Model": f"Model {i // 4}", "Storage_Raw": "x",
+                 "Selling_Price": 1000 + i, "RAM_GB": 4 + i % 4, "Internal_Storage_GB": 64 * (1 + i % 4),
+                 "brand_key": f"brand {i % 40}", "model_key": f"model {i // 4}"}
+                for i in range(args.phones)
+            ])
+            user_ids = [uid for (uid,) in db.query(User.id).filter(User.email.like("bench-user-%"))]
+            statuses = ["lead_created"] * 3 + ["lead_purchased", "assigned_to_agent", "payment_processed", "cancelled"]
+            for start in range(0, args.orders, 5000):
+                db.execute(insert(Order.__table__), [
+                    {"customer_id": user_ids[i % len(user_ids)], "user_id": user_ids[i % len(user_ids)],
+                     "phone_name": f"Brand {i % 40} Model {i % 500}", "brand": f"Brand {i % 40}",
+                     "model": f"Model {i % 500}", "quoted_price": 5000 + i % 20000,
+                     "final_quoted_price": 5000 + i % 20000, "pickup_pincode": pincode(i % args.pincodes),
+                     "status": statuses[i % len(statuses)]}
+                    for i in range(start, min(start + 5000, args.orders))
+                ])
+            db.commit()
+
+        agents = {agent.partner_id: agent.id for agent in db.query(Agent).filter(Agent.email.like("bench-agent-%"))}
+        pincodes = defaultdict(list)
+        for pid, code in db.query(PartnerServiceablePincode.partner_id, PartnerServiceablePincode.pincode).filter(
+            PartnerServiceablePincode.partner_id.in_(list(agents))
+        ):
+            pincodes[pid].append(code)
+        return {pid: (agents[pid], sorted(codes)) for pid, codes in pincodes.items()}
+    finally:
+        db.close()
+
+
+def tokens(args, partners):
+    """Bearer headers for customers, partners and agents (no login round-trips)."""
+    from backend.shared.db.connections import SessionLocal
+    from backend.services.auth.models import User
+    from backend.services.auth.utils import create_access_token
+
+    db = SessionLocal()
+    try:
+        user_ids = [uid for (uid,) in db.query(User.id).filter(User.email.like("bench-user-%")).order_by(User.id)]
+    finally:
+        db.close()
+
+    def bearer(data):
+        return {"Authorization": f"Bearer {create_access_token(data=data)}"}
+
+    customers = [bearer({"user_id": uid}) for uid in user_ids]
+    partner_headers = {pid: bearer({"partner_id": pid}) for pid in partners}
+    agent_headers = {pid: bearer({"agent_id": agent_id, "partner_id": pid}) for pid, (agent_id, _) in partners.items()}
+    return customers, partner_headers, agent_headers
+
+
+# ------------------------------
+# Load
+# ------------------------------
+
+def build_app():
+    from fastapi import FastAPI
+
+    from backend.services.sell_phone.apis.routes import router as sell_phone_router
+    from backend.services.partner.apis.routes import router as partner_router
+    from backend.services.partner.apis.agent_routes import router as agent_router
+
+    app = FastAPI()
+    for router in (sell_phone_router, partner_router, agent_router):
+        app.include_router(router)
+    return app
+
+
+async def run(args, partners):
+    import httpx
+    from backend.shared import metrics
+    from backend.shared.db.connections import dispose_async_engine
+
+    metrics.install_query_hooks()
+    customers, partner_headers, agent_headers = tokens(args, partners)
+    partner_ids = sorted(partners)
+    latencies = defaultdict(list)
+    queries = defaultdict(list)
+    failures = defaultdict(int)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=build_app()), base_url="http://bench") as client:
+
+        async def step(name, method, url, headers, expected=200, **kwargs):
+            with metrics.track_queries() as stats:
+                start = time.perf_counter()
+                r = await client.request(method, url, headers=headers, **kwargs)
+                latencies[name].append(time.perf_counter() - start)
+            queries[name].append(stats.queries)
+            if r.status_code != expected:
+                failures[name] += 1
+                raise RuntimeError(f"{name}: HTTP {r.status_code} {r.text[:200]}")
+            return r.json()
+
+        async def lifecycle(i):
+            pid = partner_ids[i % len(partner_ids)]
+            agent_id, codes = partners[pid]
+            ph, ah = partner_headers[pid], agent_headers[pid]
+
+            created = await step("create_order", "POST", "/sell-phone/orders", customers[i % len(customers)], 201, json={
+                "phone_name": f"Brand {i % 40} Model {i % 500}", "brand": f"Brand {i % 40}", "model": f"Model {i % 500}",
+                "ram_gb": 6, "storage_gb": 128, "quoted_price": 10000 + i, "pincode": codes[i % len(codes)],
+                "address_line": "1 Bench Street", "city": "Mumbai", "state": "MH",
+            })
+            order_id = created["order"]["id"]
+            await step("get_available_leads", "GET", "/sell-phone/partner/leads/available", ph)
+            await step("lock_lead", "POST", f"/sell-phone/partner/leads/{order_id}/lock", ph)
+            await step("purchase_lead", "POST", f"/sell-phone/partner/leads/{order_id}/purchase", ph)
+            await step("assign_agent", "POST", f"/partner/orders/{order_id}/assign", ph, params={"agent_id": agent_id})
+            await step("schedule_pickup", "POST", f"/agent/orders/{order_id}/schedule-pickup", ah, json={
+                "scheduled_date": "2030-01-15", "scheduled_time": "10:00",
+            })
+            await step("complete_pickup", "POST", f"/agent/orders/{order_id}/complete-pickup", ah, json={
+                "actual_condition": "good", "final_offered_price": 9000 + i, "customer_accepted": True,
+            })
+            await step("process_payment", "POST", f"/agent/orders/{order_id}/process-payment", ah, json={
+                "payment_amount": 9000 + i, "payment_method": "upi", "transaction_id": f"bench-{i}",
+            })
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        errors = []
+
+        async def guarded(i):
+            async with semaphore:
+                try:
+                    await lifecycle(i)
+                except RuntimeError as e:
+                    errors.append(str(e))
+
+        # One warm-up lifecycle per partner fills the principal and pincode caches
+        await asyncio.gather(*(guarded(i) for i in range(len(partner_ids))))
+        latencies.clear()
+        queries.clear()
+        failures.clear()
+        errors.clear()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(guarded(len(partner_ids) + i) for i in range(args.lifecycles)))
+        elapsed = time.perf_counter() - start
+
+    await dispose_async_engine()
+
+    results = {"lifecycles_per_sec": round((args.lifecycles - len(errors)) / elapsed, 2), "steps": {}}
+    for name in STEPS:
+        values = latencies[name]
+        if not values:
+            continue
+        results["steps"][name] = {
+            "requests_per_sec": round(len(values) / elapsed, 2),
+            "p50_ms": round(statistics.median(values) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "queries": round(statistics.mean(queries[name]), 2),
+            "failures": failures[name],
+        }
+    return results, errors
+
+
+# ------------------------------
+# Reporting
+# ------------------------------
+
+def report(results, errors):
+    print(f"\n{'step':<22}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'failed':>8}")
+    for name, step in results["steps"].items():
+        print(f"{name:<22}{step['requests_per_sec']:>9.1f}{step['p50_ms']:>9.1f}{step['p95_ms']:>9.1f}"
+              f"{step['p99_ms']:>9.1f}{step['queries']:>9.2f}{step['failures']:>8}")
+    print(f"\nlifecycles/sec: {results['lifecycles_per_sec']:.1f}")
+    for error in errors[:10]:
+        print(f"  error: {error}")
+
+
+def compare(results, baseline, tolerance):
+    """Regression messages for this run against a baseline."""
+    problems = []
+    if results["lifecycles_per_sec"] * tolerance < baseline["lifecycles_per_sec"]:
+        problems.append(
+            f"throughput {results['lifecycles_per_sec']:.1f}/s vs baseline {baseline['lifecycles_per_sec']:.1f}/s"
+        )
+    for name, expected in baseline["steps"].items():
+        step = results["steps"].get(name)
+        if step is None:
+            problems.append(f"{name}: no successful requests")
+            continue
+        if step["failures"]:
+            problems.append(f"{name}: {step['failures']} failed requests")
+        if step["queries"] > expected["queries"] + QUERY_SLACK:
+            problems.append(f"{name}: {step['queries']:.2f} queries/request vs baseline {expected['queries']:.2f}")
+        limit = max(expected["p95_ms"] * tolerance, expected["p95_ms"] + LATENCY_FLOOR_MS)
+        if step["p95_ms"] > limit:
+            problems.append(f"{name}: p95 {step['p95_ms']:.1f}ms vs baseline {expected['p95_ms']:.1f}ms")
+    return problems
+
+
+def main():
+    args = parse_args()
+    # Connection settings are read at import time, so set them before importing the app
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        workdir = tempfile.mkdtemp(prefix="lifecycle-bench-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault("DB_POOL_SIZE", str(max(args.concurrency, 5)))
+    os.environ.setdefault("DB_POOL_PRE_PING", "off")
+    os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+
+    print(f"seeding: {args.customers} customers, {args.partners} partners, {args.pincodes} pincodes, "
+          f"{args.phones} phones, {args.orders} orders")
+    partners = seed(args)
+    print(f"running: {args.lifecycles} lifecycles, concurrency {args.concurrency}")
+    results, errors = asyncio.run(run(args, partners))
+    report(results, errors)
+
+    results["config"] = {
+        key: getattr(args, key)
+        for key in ("lifecycles", "concurrency", "customers", "partners", "pincodes", "phones", "orders")
+    }
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nbaseline written to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"\nno baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("config") != results["config"]:
+        print("\nwarning: run configuration differs from the baseline's")
+    problems = compare(results, baseline, args.tolerance)
+    if problems:
+        print("\nREGRESSIONS:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("\nno regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Concurrency check for the partner credit ledger.
+
+Runs parallel credit purchases (including retried duplicates with the same
+idempotency key) and lead buys against one partner, then verifies:
+  - no lost updates: final balance == sum of ledger amounts == expected
+  - duplicates were credited once
+  - the balance never went negative and every entry's before/after is consistent
+  - a balance snapshot reconciles with zero drift, starting from a balance
+    the partner had before the ledger (OPENING_BALANCE)
+
+Uses a scratch SQLite file by default; pass --database-url to run against
+Postgres (the tables must already exist there).
+
+Run: python check_credit_ledger.py [--threads 16] [--database-url URL]
+"""
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--threads", type=int, default=16)
+parser.add_argument("--purchases", type=int, default=40)
+parser.add_argument("--lead-buys", type=int, default=60)
+parser.add_argument("--database-url", default=None)
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'ledger.db')}"
+os.environ["CREDIT_SNAPSHOT_SETTLE_SECONDS"] = "0"
+
+from backend.shared.db.connections import SessionLocal, engine, Base
+from backend.services.auth.models import User  # noqa: F401
+from backend.services.partner.schema.models import Partner
+from backend.services.admin.schema.models import PartnerCreditTransaction, PartnerCreditSnapshot
+from backend.services.sell_phone.schema.models import Order  # noqa: F401
+from backend.services.sell_phone.utils import deduct_partner_credits
+from backend.services.admin import ledger
+
+PURCHASE = 100.0
+LEAD_COST = 50.0
+# Balance set before the ledger existed; no transaction row explains it
+OPENING_BALANCE = 250.0
+
+
+def purchase(partner_id: int, key: str) -> None:
+    db = SessionLocal()
+    try:
+        ledger.record_transaction(db, partner_id, PURCHASE, "credit_purchase", idempotency_key=key)
+        db.commit()
+    finally:
+        db.close()
+
+
+def buy_lead(partner_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        deduct_partner_credits(db=db, partner_id=partner_id, amount=LEAD_COST)
+        db.commit()
+        return True
+    except ValueError:
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+def check_credit_ledger() -> bool:
+    if not args.database_url:
+        Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    partner = Partner(
+        email=f"ledger-check-{os.getpid()}@example.com", full_name="Ledger Check",
+        phone="9000000000", hashed_password="x", verification_status="approved",
+        credit_balance=OPENING_BALANCE,
+    )
+    db.add(partner)
+    db.commit()
+    partner_id = partner.id
+
+    # Every purchase is submitted twice with the same key (client retry)
+    keys = [f"ledger-check:{partner_id}:{i}" for i in range(args.purchases)]
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        futures = [pool.submit(purchase, partner_id, key) for key in keys + keys]
+        futures += [pool.submit(buy_lead, partner_id) for _ in range(args.lead_buys)]
+        results = [f.result() for f in futures]
+    successful_buys = sum(1 for r in results[len(keys) * 2:] if r)
+
+    db.expire_all()
+    balance = db.query(Partner.credit_balance).filter(Partner.id == partner_id).scalar()
+    entries = db.query(PartnerCreditTransaction).filter(
+        PartnerCreditTransaction.partner_id == partner_id
+    ).all()
+    expected = OPENING_BALANCE + args.purchases * PURCHASE - successful_buys * LEAD_COST
+
+    checks = {
+        "no lost updates": abs(balance - expected) < 1e-6,
+        "ledger sums to balance": abs(OPENING_BALANCE + sum(e.amount for e in entries) - balance) < 1e-6,
+        "duplicates credited once": sum(1 for e in entries if e.transaction_type == "credit_purchase") == args.purchases,
+        "never negative": all(e.balance_after >= 0 for e in entries),
+        "entries consistent": all(abs(e.balance_before + e.amount - e.balance_after) < 1e-6 for e in entries),
+    }
+
+    ledger.snapshot_balances(db)
+    snapshot = db.query(PartnerCreditSnapshot).filter(
+        PartnerCreditSnapshot.partner_id == partner_id
+    ).order_by(PartnerCreditSnapshot.id.desc()).first()
+    checks["snapshot reconciles"] = (
+        snapshot is not None and abs(snapshot.balance - balance) < 1e-6 and not snapshot.drift
+    )
+    db.close()
+
+    print(f"balance={balance} expected={expected} lead buys={successful_buys}/{args.lead_buys}")
+    for name, passed in checks.items():
+        print(f"{'✓' if passed else '❌'} {name}")
+    return all(checks.values())
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_credit_ledger() else 1)
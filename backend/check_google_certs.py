@@ -0,0 +1,142 @@
+"""
+Check for the Google signing cert cache.
+
+Serves PEM signing keys from a local HTTP server with Cache-Control, points
+google_certs at it and verifies locally signed ID tokens:
+  - repeated verifications reuse the cached certs (one download)
+  - the certs are downloaded again once max-age has passed
+  - a token signed with a key the cache does not have yet triggers one refetch
+  - unknown key ids cannot force a download more often than the refetch interval
+  - a failed download is not cached, and a failed refetch keeps the cached certs
+  - no-store responses are not cached
+
+Run: python check_google_certs.py [--max-age 2]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--max-age", type=int, default=2)
+args = parser.parse_args()
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.auth import crypt, exceptions, jwt
+
+AUDIENCE = "check-google-certs"
+REFETCH_INTERVAL = 1.0
+
+
+class CertServer:
+    """Local cert endpoint; tracks how often it was hit."""
+
+    def __init__(self):
+        self.certs = {}
+        self.cache_control = f"public, max-age={args.max_age}"
+        self.status = 200
+        self.hits = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.hits += 1
+                body = json.dumps(server.certs).encode() if server.status == 200 else b"unavailable"
+                self.send_response(server.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", server.cache_control)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/certs"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+
+def make_key(kid: str):
+    """(signer, public key PEM) for a new RSA key."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return crypt.RSASigner.from_string(private_pem, key_id=kid), public_pem.decode()
+
+
+def make_token(signer) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com", "aud": AUDIENCE, "sub": "1234",
+        "email": "check@example.com", "iat": now, "exp": now + 300,
+    }
+    return jwt.encode(signer, payload).decode()
+
+
+def check_google_certs() -> bool:
+    server = CertServer()
+    os.environ["GOOGLE_CERTS_URL"] = server.url
+    os.environ["GOOGLE_CERTS_REFETCH_INTERVAL_SECONDS"] = str(REFETCH_INTERVAL)
+    from backend.services.auth import google_certs
+
+    def verifies(token: str) -> bool:
+        try:
+            return google_certs.verify_google_id_token(token, AUDIENCE)["email"] == "check@example.com"
+        except (ValueError, exceptions.TransportError):
+            return False
+
+    signer1, public1 = make_key("key-1")
+    signer2, public2 = make_key("key-2")
+    unknown_signer, _ = make_key("key-unknown")
+    server.certs = {"key-1": public1}
+    token1, token2, unknown_token = make_token(signer1), make_token(signer2), make_token(unknown_signer)
+    checks = {}
+
+    checks["cache hit"] = verifies(token1) and verifies(token1) and server.hits == 1
+
+    time.sleep(args.max_age + 0.2)
+    checks["refetch after max-age"] = verifies(token1) and server.hits == 2
+
+    # Key rotation: the new key is served while the cached copy is still fresh
+    server.certs = {"key-1": public1, "key-2": public2}
+    checks["refetch on unknown kid"] = verifies(token2) and server.hits == 3 and verifies(token2) and server.hits == 3
+
+    time.sleep(REFETCH_INTERVAL + 0.1)
+    rejected = not verifies(unknown_token) and not verifies(unknown_token)
+    checks["unknown kid refetch rate-limited"] = rejected and server.hits == 4
+
+    time.sleep(REFETCH_INTERVAL + 0.1)
+    server.status = 503
+    checks["failed refetch keeps cache"] = not verifies(unknown_token) and server.hits == 5 and verifies(token1)
+
+    google_certs.cert_request.clear()
+    checks["failed download raises"] = not verifies(token1) and server.hits == 6
+    server.status = 200
+    checks["failed download not cached"] = verifies(token1) and server.hits == 7
+
+    google_certs.cert_request.clear()
+    server.cache_control = "no-store"
+    checks["no-store not cached"] = verifies(token1) and verifies(token1) and server.hits == 9
+
+    server.httpd.shutdown()
+    print(f"cert server hits={server.hits}")
+    for name, passed in checks.items():
+        print(f"{'✓' if passed else '❌'} {name}")
+    return all(checks.values())
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_google_certs() else 1)
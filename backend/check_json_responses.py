@@ -0,0 +1,132 @@
+"""
+Parity check for the fast JSON response path (backend/shared/responses.py).
+
+For the response schema of every route converted to the fast path, serves
+the same rows twice: once returned as-is for FastAPI to validate against the
+response_model (the standard path), once through responses.list_response /
+model_response with FAST_JSON_RESPONSES on. The two bodies must be identical
+byte for byte. Rows deliberately carry values validation has to convert:
+ints and Decimals in float fields, whole floats in int fields, str enums,
+dates in datetime fields, naive and aware datetimes, ORM-style objects and
+dicts with missing keys (for exclude_unset).
+
+No database is needed; rows are built in memory.
+
+Run: python check_json_responses.py
+"""
+import enum
+import sys
+import typing
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from backend.shared import responses
+from backend.services.admin.schema.schemas import AdminOrderPaginatedOut
+from backend.services.partner.schema import schemas as partner_schemas
+from backend.services.sell_phone.schema.schemas import OrderOut
+
+responses.FAST_JSON_RESPONSES = True
+
+
+class Status(str, enum.Enum):
+    LOCKED = "lead_locked"
+
+
+# route -> (response schema, list or single object, exclude_unset)
+CONVERTED_ROUTES = {
+    "GET /sell-phone/my-orders": (OrderOut, True, False),
+    "GET /partner/orders": (partner_schemas.PartnerOrderBriefOut, True, False),
+    "GET /partner/locked-deals": (partner_schemas.LockedDealOut, True, True),
+    "GET /agent/orders": (partner_schemas.AgentOrderListItem, True, False),
+    "GET /agent/sync": (partner_schemas.AgentSyncOut, False, False),
+    "GET /admin/orders": (AdminOrderPaginatedOut, False, False),
+}
+
+
+def sample_value(annotation, i: int):
+    """A value for `annotation` that validation has to convert (variant chosen by i)."""
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    if type(None) in typing.get_args(annotation) and len(args) == 1:
+        if i % 5 == 4:
+            return None
+        annotation = args[0]
+    origin = typing.get_origin(annotation)
+    if origin in (list, List):
+        return [sample_value(typing.get_args(annotation)[0], i + n) for n in range(2)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return sample_row(annotation, i)
+    base = datetime(2026, 10, 1, 9, 30, 15, 250000)
+    return {
+        int: (i, float(i), Decimal(i))[i % 3],
+        float: (i, float(i) + 0.5, Decimal("12000.25"), True)[i % 4],
+        str: (f"value {i} ✓", Status.LOCKED)[i % 2],
+        bool: (True, 0, False)[i % 3],
+        datetime: (base, base.replace(tzinfo=timezone.utc), date(2026, 10, 2),
+                   base.replace(tzinfo=timezone(timedelta(hours=5, minutes=30))))[i % 4],
+        dict: {"screen": "good", "battery": 87, "nested": {"ok": True}},
+    }.get(annotation, f"value {i}")
+
+
+def sample_row(schema, i: int):
+    """Row for `schema`: an ORM-style object for from_attributes schemas, else a dict."""
+    values = {name: sample_value(field.annotation, i + n) for n, (name, field) in enumerate(schema.model_fields.items())}
+    if schema.model_config.get("from_attributes") and i % 2:
+        return SimpleNamespace(**values)
+    return values
+
+
+def drop_optional(row: dict, schema, i: int) -> dict:
+    """Leave some optional keys out, as a fields= selection does."""
+    return {k: v for n, (k, v) in enumerate(row.items()) if schema.model_fields[k].is_required() or (n + i) % 3}
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    for n, (route, (schema, many, exclude_unset)) in enumerate(CONVERTED_ROUTES.items()):
+        if many:
+            rows = [sample_row(schema, i) for i in range(12)]
+            if exclude_unset:
+                rows = [drop_optional(row, schema, i) for i, row in enumerate(rows)]
+            response_model = List[schema]
+            fast = (lambda rows=rows, schema=schema, exclude_unset=exclude_unset:
+                    responses.list_response(rows, schema, exclude_unset=exclude_unset))
+        else:
+            rows = sample_row(schema, n)
+            response_model = schema
+            fast = (lambda rows=rows, schema=schema, exclude_unset=exclude_unset:
+                    responses.model_response(rows, schema, exclude_unset=exclude_unset))
+        app.add_api_route(f"/std/{n}", lambda rows=rows: rows, response_model=response_model,
+                          response_model_exclude_unset=exclude_unset)
+        app.add_api_route(f"/fast/{n}", fast, response_model=response_model,
+                          response_model_exclude_unset=exclude_unset)
+    return app
+
+
+def check_json_responses() -> bool:
+    client = TestClient(build_app())
+    passed = True
+    for n, route in enumerate(CONVERTED_ROUTES):
+        std = client.get(f"/std/{n}")
+        fast = client.get(f"/fast/{n}")
+        same = std.status_code == fast.status_code == 200 and std.content == fast.content
+        passed &= same
+        print(f"{'✓' if same else '❌'} {route}")
+        if not same:
+            diverge = next((i for i, (a, b) in enumerate(zip(std.content, fast.content)) if a != b), 0)
+            print(f"    standard: {std.status_code} ...{std.content[max(0, diverge - 60):diverge + 60]!r}")
+            print(f"    fast:     {fast.status_code} ...{fast.content[max(0, diverge - 60):diverge + 60]!r}")
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_json_responses() else 1)
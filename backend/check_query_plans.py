@@ -0,0 +1,104 @@
+"""
+Query-plan regression check for the order marketplace and phone catalog
+hot queries.
+
+Builds the schema in a scratch in-memory SQLite database, runs
+EXPLAIN QUERY PLAN for each hot query and fails if any of them scans
+its table (orders / phones_list) instead of using an index.
+
+Run: python check_query_plans.py
+"""
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Always plan against a throwaway database, never the configured one
+os.environ["DATABASE_URL"] = "sqlite://"
+
+from sqlalchemy import func
+
+from backend.shared.db.connections import SessionLocal, engine, Base
+from backend.services.auth.models import User  # noqa: F401
+from backend.services.partner.schema.models import Partner, Agent  # noqa: F401
+from backend.services.admin.schema.models import Admin  # noqa: F401
+from backend.services.sell_phone.schema.models import Order, PhoneList
+
+
+def hot_queries(db):
+    """The hot queries as issued by the routes: name -> (table, query)."""
+    pincode_list = ["400001", "400002"]
+    queries = {
+        "available_leads": db.query(Order).filter(
+            Order.status == "available_for_partners",
+            Order.pickup_pincode.in_(pincode_list)
+        ).order_by(Order.created_at.desc()).limit(20),
+        "locked_deals": db.query(Order).filter(
+            Order.partner_id == 1,
+            Order.status == "lead_locked"
+        ).order_by(Order.lead_locked_at.desc()),
+        "partner_orders": db.query(Order).filter(
+            Order.partner_id == 1
+        ).order_by(Order.purchased_at.desc()),
+        "agent_orders": db.query(Order).filter(
+            Order.agent_id == 1
+        ).order_by(Order.assigned_at.desc()),
+    }
+    phone_queries = {
+        "phone_variant_price": db.query(PhoneList.Selling_Price).filter(
+            PhoneList.brand_key == "apple",
+            PhoneList.model_key == "iphone 14",
+            PhoneList.RAM_GB == 6,
+            PhoneList.Internal_Storage_GB == 128
+        ),
+        "phone_variants": db.query(PhoneList.RAM_GB, PhoneList.Internal_Storage_GB).filter(
+            PhoneList.brand_key == "apple",
+            PhoneList.model_key == "iphone 14"
+        ),
+        "phone_highest_variant": db.query(func.max(PhoneList.Selling_Price)).filter(
+            PhoneList.brand_key == "apple",
+            PhoneList.model_key == "iphone 14"
+        ),
+    }
+    return {
+        **{name: ("orders", query) for name, query in queries.items()},
+        **{name: ("phones_list", query) for name, query in phone_queries.items()},
+    }
+
+
+def explain(db, query) -> list:
+    """Return the EXPLAIN QUERY PLAN detail lines for a query."""
+    compiled = query.statement.compile(engine, compile_kwargs={"literal_binds": True})
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()
+    return [row[-1] for row in rows]
+
+
+def uses_index(plan: list, table: str) -> bool:
+    """True if every access to `table` goes through an index."""
+    steps = [step for step in plan if f" {table}" in step]
+    return bool(steps) and all("INDEX" in step for step in steps)
+
+
+def check_query_plans() -> bool:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    ok = True
+    try:
+        for name, (table, query) in hot_queries(db).items():
+            plan = explain(db, query)
+            if uses_index(plan, table):
+                print(f"✓ {name}")
+            else:
+                ok = False
+                print(f"❌ {name} does not use an index")
+            for step in plan:
+                print(f"    {step}")
+    finally:
+        db.close()
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_query_plans() else 1)
@@ -0,0 +1,55 @@
+"""
+Bulk import the phone catalog from a CSV (final_mobile_master_data.csv format).
+
+Upserts on (Brand, Model, RAM_GB, Internal_Storage_GB) against the configured
+DATABASE_URL and prints the diff report. Use --dry-run to see what would
+change without writing anything.
+
+Run: python import_phone_catalog.py path/to/final_mobile_master_data.csv [--dry-run] [--batch-size 1000]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.shared.db.connections import SessionLocal
+from backend.services.auth.models import User  # noqa: F401
+from backend.services.partner.schema.models import Partner  # noqa: F401
+from backend.services.admin.schema.models import Admin  # noqa: F401
+from backend.services.admin import catalog_import
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import phones into phones_list")
+    parser.add_argument("csv_path")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    parser.add_argument("--batch-size", type=int, default=catalog_import.CATALOG_IMPORT_BATCH_SIZE)
+    parser.add_argument("--verbose", action="store_true", help="print per-row changes and errors")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        with open(args.csv_path, "r", encoding="utf-8-sig", newline="") as f:
+            report = catalog_import.import_catalog(
+                db, f, dry_run=args.dry_run, batch_size=args.batch_size
+            )
+    except catalog_import.CatalogImportError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"{'Dry run' if args.dry_run else 'Imported'}: {report['rows']} rows")
+    for key in ("inserted", "updated", "unchanged", "duplicates", "invalid"):
+        print(f"  {key:<10} {report[key]}")
+    if args.verbose:
+        print(json.dumps({"errors": report["errors"], "changes": report["changes"]}, indent=2, default=str))
+    elif report["errors"]:
+        print(f"  first error: line {report['errors'][0]['line']}: {report['errors'][0]['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Load pincode centroids (used by the agent pickup planner) from a CSV.
+
+Expects pincode, latitude and longitude columns (district / state optional;
+India Post directory headers such as Pincode, Latitude, Longitude,
+District, StateName are recognised). Rows for the same pincode are averaged
+and upserted into pincode_centroids against the configured DATABASE_URL.
+
+Run: python import_pincode_centroids.py path/to/pincodes.csv [--dry-run]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.shared.db.connections import SessionLocal
+from backend.services.auth.models import User  # noqa: F401
+from backend.services.partner.schema.models import Partner  # noqa: F401
+from backend.services.admin.schema.models import Admin  # noqa: F401
+from backend.services.partner import pickup_planner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import pincode centroids into pincode_centroids")
+    parser.add_argument("csv_path")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    parser.add_argument("--verbose", action="store_true", help="print row errors")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        with open(args.csv_path, "r", encoding="utf-8-sig", newline="") as f:
+            report = pickup_planner.import_centroids(db, f, dry_run=args.dry_run)
+    except pickup_planner.CentroidImportError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"{'Dry run' if args.dry_run else 'Imported'}: {report['rows']} rows, {report['pincodes']} pincodes")
+    for key in ("inserted", "updated", "invalid"):
+        print(f"  {key:<10} {report[key]}")
+    if args.verbose:
+        print(json.dumps({"errors": report["errors"]}, indent=2))
+    elif report["errors"]:
+        print(f"  first error: line {report['errors'][0]['line']}: {report['errors'][0]['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,36 @@
 import os
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from backend.services.auth.apis import router as auth_router
-from backend.services.sell_phone.apis.routes import router as sell_phone_router
-from backend.services.customer_side_prediction.apis import router as customer_side_prediction_router
-from backend.services.admin.apis.routes import router as admin_router
-from backend.services.partner.apis.routes import router as partner_router
-from backend.services.partner.apis.agent_routes import router as agent_router
-from backend.shared.db.connections import Base, engine
-from starlette.middleware.sessions import SessionMiddleware
-from backend.config import FRONTEND_URL
+from backend.shared.startup import startup_timer
+
+# Imports are grouped per service so the startup log shows where boot time goes
+with startup_timer.phase("import:framework"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from starlette.middleware.sessions import SessionMiddleware
+    from backend.shared.db.connections import ensure_schema, dispose_async_engine
+    from backend.shared.jobs import register_job, start_jobs, stop_jobs
+    from backend.shared.auth import hashing
+    from backend.shared import metrics
+    from backend.shared.compression import CompressionMiddleware
+    from backend.shared.http_cache import ETagMiddleware
+    from backend.config import FRONTEND_URL
+with startup_timer.phase("import:auth"):
+    from backend.services.auth.apis import router as auth_router
+with startup_timer.phase("import:sell_phone"):
+    from backend.services.sell_phone.apis.routes import router as sell_phone_router
+with startup_timer.phase("import:customer_side_prediction"):
+    # langchain is imported on the first prediction request, not here
+    from backend.services.customer_side_prediction.apis import router as customer_side_prediction_router
+with startup_timer.phase("import:admin"):
+    from backend.services.admin.apis.routes import router as admin_router
+    from backend.services.admin import dashboard as admin_dashboard
+    from backend.services.admin import ledger as credit_ledger
+with startup_timer.phase("import:partner"):
+    from backend.services.partner.apis.routes import router as partner_router
+    from backend.services.partner.apis.agent_routes import router as agent_router
+    from backend.services.partner import agent_sync
+    from backend.services.partner import hold_cache
+with startup_timer.phase("import:internal"):
+    from backend.services.internal.apis import router as internal_router, metrics_router
 
 import asyncio
 from dotenv import load_dotenv
@@ -44,22 +65,84 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination / sync headers read by the agent apps
+    expose_headers=["X-Next-Cursor", "X-Sync-Timestamp"],
 )
 
-# create tables (models' Base.metadata.create_all also called in services, safe to call again)
-Base.metadata.create_all(bind=engine)
+# Body-hash ETags (304 on If-None-Match) for admin listings; catalog routes set
+# their own version-based ETags. Compression wraps it so ETags see the plain body.
+app.add_middleware(ETagMiddleware, path_prefixes=("/admin/",))
+app.add_middleware(CompressionMiddleware)
+
+# Per-route latency / SQL statement count / DB time / response size, served at /metrics.
+# Added last so it is outermost and its timings include the other middleware.
+metrics.install_query_hooks()
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Create missing tables, unless SCHEMA_MANAGEMENT=alembic (then migrations own the
+# schema and startup skips inspecting every table)
+with startup_timer.phase("schema"):
+    ensure_schema()
 
 # Register service routers
-app.include_router(auth_router, prefix="/auth", tags=["auth"])
-app.include_router(sell_phone_router)
-app.include_router(customer_side_prediction_router)
-app.include_router(admin_router)
-app.include_router(partner_router)
-app.include_router(agent_router)
+with startup_timer.phase("routers"):
+    app.include_router(auth_router, prefix="/auth", tags=["auth"])
+    app.include_router(sell_phone_router)
+    app.include_router(customer_side_prediction_router)
+    app.include_router(admin_router)
+    app.include_router(partner_router)
+    app.include_router(agent_router)
+    app.include_router(internal_router)
+    app.include_router(metrics_router)
 # app.include_router(detection_router)
 
 # Register service routes here (e.g., from services.valuation.apis import router; app.include_router(router))
 
+# Background jobs (set an interval to 0 to disable a job, e.g. when another worker runs it)
+register_job(
+    "dashboard-reconcile",
+    float(os.getenv("DASHBOARD_RECONCILE_INTERVAL_SECONDS", "900")),
+    admin_dashboard.reconcile_job,
+)
+register_job(
+    "dashboard-fold",
+    float(os.getenv("DASHBOARD_FOLD_INTERVAL_SECONDS", "10")),
+    admin_dashboard.fold_job,
+)
+register_job(
+    "credit-ledger-snapshot",
+    float(os.getenv("CREDIT_SNAPSHOT_INTERVAL_SECONDS", "3600")),
+    credit_ledger.snapshot_job,
+)
+register_job(
+    "agent-sync-tombstone-prune",
+    float(os.getenv("AGENT_SYNC_PRUNE_INTERVAL_SECONDS", "86400")),
+    agent_sync.prune_job,
+)
+register_job(
+    "partner-hold-auto-lift",
+    float(os.getenv("PARTNER_HOLD_AUTO_LIFT_INTERVAL_SECONDS", "60")),
+    hold_cache.auto_lift_job,
+)
+
+
+@app.on_event("startup")
+def on_startup():
+    with startup_timer.phase("jobs"):
+        start_jobs()
+    startup_timer.log()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_jobs()
+    hashing.shutdown_executor()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await dispose_async_engine()
+
 
 @app.get("/")
 def read_root():
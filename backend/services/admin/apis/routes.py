@@ -1,18 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, load_only
-from sqlalchemy import func, desc
+from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select
+from sqlalchemy.exc import IntegrityError
 from typing import Optional, List
 from datetime import datetime, timezone
-from backend.shared.db.connections import get_db
+from backend.shared.db.connections import get_db, get_async_db
+from backend.shared.auth import hashing
+from backend.shared import responses
+from starlette.concurrency import run_in_threadpool
+from backend.shared.db.pagination import apply_keyset, encode_cursor
 from backend.services.auth import models as auth_models, utils as auth_utils
+from backend.services.auth.principals import principal_cache
 from backend.services.sell_phone.schema import models as sell_models
 from backend.services.partner.schema.models import Partner, PartnerServiceablePincode
 from backend.services.partner import utils as partner_utils
+from backend.services.partner.pincode_index import pincode_index
 from backend.services.admin.schema.models import (
     Admin, PartnerVerificationHistory, CreditPlan, 
     PartnerCreditTransaction, AdminCreditConfiguration
 )
 from backend.services.admin import utils as admin_utils
+from backend.services.admin import dashboard as admin_dashboard
+from backend.services.admin import ledger
+from backend.services.admin import exports
+from backend.services.admin import catalog_import
 from backend.services.admin.schema.schemas import (
     # Admin auth
     AdminLoginRequest, AdminToken, AdminOut, AdminCreate, AdminUpdate,
@@ -28,6 +41,7 @@ from backend.services.admin.schema.schemas import (
     DashboardStats,
     # Phone List
     PhoneListOut, PhoneListCreate, PhoneListUpdate, PhoneListPaginatedOut,
+    CatalogImportReport,
     # Legacy
     AdminUserCreate, AdminUserUpdate, AdminUserOut, AdminOrderOut,
     AdminOrderPaginatedOut, OrderSortBy, SortOrder,
@@ -44,12 +58,14 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 # ============================================================================
 
 @router.post("/auth/login", response_model=AdminToken)
-def admin_login(payload: AdminLoginRequest, db: Session = Depends(get_db)):
+async def admin_login(payload: AdminLoginRequest, db: Session = Depends(get_db)):
     """
     Admin login endpoint.
     Returns JWT token with admin_id and user_type='admin'.
     """
-    admin = db.query(Admin).filter(Admin.email == payload.email).first()
+    admin = await run_in_threadpool(
+        lambda: db.query(Admin).filter(Admin.email == payload.email).first()
+    )
     
     if not admin:
         raise HTTPException(
@@ -63,19 +79,19 @@ def admin_login(payload: AdminLoginRequest, db: Session = Depends(get_db)):
             detail="Admin account is inactive"
         )
     
-    if not admin_utils.verify_password(payload.password, admin.hashed_password):
+    if not await hashing.verify_password_async(payload.password, admin.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect credentials"
         )
+    await hashing.rehash_if_needed(db, admin, payload.password)
     
     token = admin_utils.create_admin_access_token(data={"admin_id": admin.id})
     
-    return {
-        "access_token": token,
-        "token_type": "bearer",
-        "admin": admin
-    }
+    # Reading the ORM instance may load expired columns; keep it off the event loop
+    return await run_in_threadpool(
+        lambda: AdminToken(access_token=token, token_type="bearer", admin=admin)
+    )
 
 
 @router.get("/auth/me", response_model=AdminOut)
@@ -108,6 +124,7 @@ def create_admin(
     db.add(admin)
     db.commit()
     db.refresh(admin)
+    auth_utils.invalidate_role(admin.email)
     return admin
 
 
@@ -204,6 +221,8 @@ def request_partner_clarification(
     db.add(partner)
     db.add(history_entry)
     db.commit()
+    pincode_index.refresh_partner(db, partner_id)
+    principal_cache.invalidate_partner(partner_id)
     
     # TODO: Create notification for partner
     
@@ -244,6 +263,8 @@ def approve_partner(
     db.add(partner)
     db.add(history_entry)
     db.commit()
+    pincode_index.refresh_partner(db, partner_id)
+    principal_cache.invalidate_partner(partner_id)
     
     # TODO: Create notification for partner
     
@@ -284,6 +305,8 @@ def reject_partner(
     db.add(partner)
     db.add(history_entry)
     db.commit()
+    pincode_index.refresh_partner(db, partner_id)
+    principal_cache.invalidate_partner(partner_id)
     
     # TODO: Create notification for partner
     
@@ -318,6 +341,7 @@ def place_partner_hold(
             lift_date=payload.lift_date,
             admin_id=current_admin.id
         )
+        principal_cache.invalidate_partner(partner_id)
         return hold
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -369,6 +393,7 @@ def lift_partner_hold_endpoint(
             lift_reason=payload.lift_reason,
             admin_id=current_admin.id
         )
+        principal_cache.invalidate_partner(partner_id)
         return {
             "status": "success",
             "message": "Partner hold lifted successfully",
@@ -463,45 +488,35 @@ def adjust_partner_credits(
     """
     Manual credit adjustment (add or deduct).
     Amount can be positive (add) or negative (deduct).
+    An optional idempotency_key makes retries safe.
     """
-    partner = db.query(Partner).filter(Partner.id == partner_id).first()
-    if not partner:
+    try:
+        transaction, _ = ledger.record_transaction(
+            db,
+            partner_id,
+            payload.amount,
+            'adjustment',
+            idempotency_key=f"adjustment:{partner_id}:{payload.idempotency_key}" if payload.idempotency_key else None,
+            reference_type='manual',
+            notes=payload.notes,
+            created_by_admin_id=current_admin.id,
+        )
+    except ledger.PartnerNotFoundError:
         raise HTTPException(status_code=404, detail="Partner not found")
-    
-    balance_before = partner.credit_balance
-    new_balance = balance_before + payload.amount
-    
-    if new_balance < 0:
+    except ledger.InsufficientCreditsError:
+        balance_before = db.query(Partner.credit_balance).filter(Partner.id == partner_id).scalar()
         raise HTTPException(
             status_code=400,
             detail=f"Insufficient balance. Current: {balance_before}, Requested: {payload.amount}"
         )
-    
-    # Update partner balance
-    partner.credit_balance = new_balance
-    
-    # Create transaction record
-    transaction = PartnerCreditTransaction(
-        partner_id=partner_id,
-        transaction_type='adjustment',
-        amount=payload.amount,
-        balance_before=balance_before,
-        balance_after=new_balance,
-        reference_type='manual',
-        notes=payload.notes,
-        created_by_admin_id=current_admin.id
-    )
-    
-    db.add(partner)
-    db.add(transaction)
     db.commit()
     
     return {
         "status": "success",
         "message": "Credits adjusted",
         "partner_id": partner_id,
-        "amount": payload.amount,
-        "new_balance": new_balance,
+        "amount": transaction.amount,
+        "new_balance": transaction.balance_after,
         "transaction_id": transaction.id
     }
 
@@ -526,6 +541,46 @@ def get_partner_transactions(
     return transactions
 
 
+@router.get("/credit-transactions/export")
+def export_credit_transactions(
+    format: str = Query("csv", pattern="^(csv|parquet)$", description="csv or parquet"),
+    partner_id: Optional[int] = Query(None, description="Only this partner's transactions"),
+    transaction_type: Optional[str] = Query(None, description="e.g. credit_purchase, lead_purchase, adjustment"),
+    start_date: Optional[str] = Query(None, description="From this date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Until this date, inclusive (YYYY-MM-DD)"),
+    current_admin: Admin = Depends(admin_utils.get_current_admin)
+):
+    """
+    Stream all matching credit transactions as CSV or Parquet.
+    Rows are read with a server-side cursor, so memory use does not grow with the export size.
+    """
+    from datetime import timedelta
+    
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+        end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) if end_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    
+    stmt = exports.credit_transactions_query(partner_id, transaction_type, start, end)
+    filename = f"credit_transactions_{datetime.now(timezone.utc):%Y%m%d_%H%M%S}"
+    
+    if format == "parquet":
+        if not exports.parquet_available():
+            raise HTTPException(status_code=400, detail="Parquet export requires pyarrow to be installed")
+        return StreamingResponse(
+            exports.stream_parquet(stmt, exports.credit_transactions_parquet_schema()),
+            media_type="application/vnd.apache.parquet",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.parquet"'},
+        )
+    
+    return StreamingResponse(
+        exports.stream_csv(stmt, exports.CREDIT_TRANSACTION_EXPORT_COLUMNS),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'},
+    )
+
+
 # ============================================================================
 # SYSTEM CONFIGURATION
 # ============================================================================
@@ -606,76 +661,36 @@ def get_dashboard_stats(
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(admin_utils.get_current_admin)
 ):
-    """Get dashboard statistics"""
-    
-    # Count customers
-    total_customers = db.query(auth_models.User).count()
-    
-    # Count partners
-    total_partners = db.query(Partner).count()
-    active_partners = db.query(Partner).filter(
-        Partner.verification_status == 'approved',
-        Partner.is_active == True
-    ).count()
-    pending_verifications = db.query(Partner).filter(
-        Partner.verification_status.in_(['pending', 'under_review', 'clarification_needed'])
-    ).count()
-    
-    # Count agents (will be implemented in next phase)
-    total_agents = 0  # TODO: Implement when agent model is ready
-    
-    # Count orders
-    total_orders = db.query(sell_models.Order).count()
-    
-    # Orders by status
-    status_counts = db.query(
-        sell_models.Order.status,
-        func.count(sell_models.Order.id)
-    ).group_by(sell_models.Order.status).all()
-    
-    orders_by_status = {status: count for status, count in status_counts}
-    
-    # Calculate revenue (sum of all lead purchases)
-    total_revenue = db.query(
-        func.coalesce(func.sum(-PartnerCreditTransaction.amount), 0)
-    ).filter(
-        PartnerCreditTransaction.transaction_type == 'lead_purchase'
-    ).scalar() or 0.0
-    
-    # Credits in circulation (sum of all partner balances)
-    credits_in_circulation = db.query(
-        func.coalesce(func.sum(Partner.credit_balance), 0)
-    ).scalar() or 0.0
-    
-    return {
-        "total_customers": total_customers,
-        "total_partners": total_partners,
-        "active_partners": active_partners,
-        "pending_verifications": pending_verifications,
-        "total_agents": total_agents,
-        "total_orders": total_orders,
-        "orders_by_status": orders_by_status,
-        "total_revenue": float(total_revenue),
-        "credits_in_circulation": float(credits_in_circulation)
-    }
+    """Get dashboard statistics (materialized counters, single read)"""
+    return admin_dashboard.get_stats(db)
+
+
+@router.post("/dashboard/reconcile", response_model=DashboardStats)
+def reconcile_dashboard_stats(
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(admin_utils.get_current_admin)
+):
+    """Recompute dashboard counters from the source tables"""
+    admin_dashboard.reconcile(db)
+    return admin_dashboard.get_stats(db)
 
 
 @router.get("/partners", response_model=List[PartnerOut])
-def list_all_partners(
+async def list_all_partners(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     verification_status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin: Admin = Depends(admin_utils.get_current_admin)
 ):
     """List all partners with optional filtering"""
-    query = db.query(Partner)
+    query = select(Partner)
     
     if verification_status:
-        query = query.filter(Partner.verification_status == verification_status)
+        query = query.where(Partner.verification_status == verification_status)
     
-    partners = query.order_by(desc(Partner.created_at)).offset((page - 1) * limit).limit(limit).all()
-    return partners
+    partners = await db.scalars(query.order_by(desc(Partner.created_at)).offset((page - 1) * limit).limit(limit))
+    return partners.all()
 
 
 # ============================================================================
@@ -683,20 +698,18 @@ def list_all_partners(
 # ============================================================================
 
 @router.get("/users", response_model=list[AdminUserOut])
-def list_users(
-    db: Session = Depends(get_db),
+async def list_users(
+    db: AsyncSession = Depends(get_async_db),
     current_admin: Admin = Depends(admin_utils.get_current_admin),
 ):
     """
     List users — only load fields required by the admin UI to avoid fetching everything.
     """
-    users = db.query(auth_models.User).options(
-        load_only(
-            auth_models.User.id,
-            auth_models.User.email,
-            auth_models.User.full_name,
-        )
-    ).all()
+    users = (await db.execute(select(
+        auth_models.User.id,
+        auth_models.User.email,
+        auth_models.User.full_name,
+    ))).all()
 
     # auth_models.User does not have a `role` field. Admin UI expects a `role`.
     # Provide a default role value to satisfy the response schema.
@@ -769,6 +782,7 @@ def update_user(
     db.add(user)
     db.commit()
     db.refresh(user)
+    principal_cache.invalidate("user", user.id)
     return user
 
 @router.delete("/users/{user_id}")
@@ -785,27 +799,34 @@ def delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     db.delete(user)
     db.commit()
+    principal_cache.invalidate("user", user_id)
     return {"message": "User deleted successfully"}
 
 @router.get("/orders", response_model=AdminOrderPaginatedOut)
-def list_orders(
+async def list_orders(
     status: Optional[str] = Query(None, description="Filter by order status"),
-    page: int = Query(1, ge=1, description="Page number (1-indexed)"),
+    page: int = Query(1, ge=1, description="Page number (1-indexed); ignored when a cursor is given"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(True, description="Include the (cached) total count"),
     sort_by: OrderSortBy = Query(OrderSortBy.created_at, description="Sort field"),
     sort_order: SortOrder = Query(SortOrder.desc, description="Sort order (asc/desc)"),
     start_date: Optional[str] = Query(None, description="Filter orders from this date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="Filter orders until this date (YYYY-MM-DD)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin: Admin = Depends(admin_utils.get_current_admin),
 ):
     """
     List orders with pagination, sorting, and date range filtering.
     Supports filtering by status and date range.
+
+    Pass `next_cursor` back as `cursor` to page with keyset pagination
+    (constant cost per page). Page numbers are still accepted for the
+    first pages. The total is served from a short-lived cache.
     """
     from datetime import datetime, timedelta
     
-    query = db.query(
+    query = select(
         sell_models.Order.id,
         sell_models.Order.phone_name,
         sell_models.Order.customer_name,
@@ -839,24 +860,39 @@ def list_orders(
         except ValueError:
             pass  # Invalid date format, skip filter
     
-    # Get total count before pagination
-    total = query.count()
+    # Total count of the filtered set, cached briefly per filter combination
+    total = None
+    if include_total:
+        count_key = ("orders", status, start_date, end_date)
+        total = admin_utils.listing_count_cache.get(count_key)
+        if total is None:
+            total = await db.scalar(query.with_only_columns(func.count(sell_models.Order.id)))
+            admin_utils.listing_count_cache.set(count_key, total)
     
-    # Apply sorting
+    # Apply sorting; id is the tie-breaker so the order is total and cursors are stable
     sort_column = {
         OrderSortBy.created_at: sell_models.Order.created_at,
         OrderSortBy.quoted_price: sell_models.Order.quoted_price,
         OrderSortBy.status: sell_models.Order.status,
     }[sort_by]
     
-    if sort_order == SortOrder.asc:
-        query = query.order_by(sort_column.asc())
-    else:
-        query = query.order_by(sort_column.desc())
+    try:
+        query = apply_keyset(
+            query, sort_column, sell_models.Order.id,
+            descending=(sort_order == SortOrder.desc), cursor=cursor,
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
     
-    # Apply pagination
-    offset = (page - 1) * limit
-    results = query.offset(offset).limit(limit).all()
+    # Apply pagination; fetch one extra row to know whether there is a next page
+    if not cursor and page > 1:
+        query = query.offset((page - 1) * limit)
+    results = (await db.execute(query.limit(limit + 1))).all()
+    has_more = len(results) > limit
+    results = results[:limit]
     
     # Convert to dict format for Pydantic
     items = [
@@ -873,18 +909,23 @@ def list_orders(
         for r in results
     ]
     
+    next_cursor = None
+    if has_more and results:
+        last = results[-1]
+        next_cursor = encode_cursor(getattr(last, sort_by.value), last.id)
+    
     # Calculate pagination metadata
-    total_pages = (total + limit - 1) // limit  # Ceiling division
-    has_more = page < total_pages
+    total_pages = (total + limit - 1) // limit if total is not None else None  # Ceiling division
     
-    return {
+    return responses.model_response({
         "items": items,
         "total": total,
         "page": page,
         "limit": limit,
         "total_pages": total_pages,
         "has_more": has_more,
-    }
+        "next_cursor": next_cursor,
+    }, AdminOrderPaginatedOut)
 
 
 # ============================================================================
@@ -892,34 +933,35 @@ def list_orders(
 # ============================================================================
 
 @router.get("/phones", response_model=PhoneListPaginatedOut)
-def get_phones_list(
+async def get_phones_list(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     search: Optional[str] = Query(None, description="Search by brand, series, or model"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin: Admin = Depends(admin_utils.get_current_admin)
 ):
     """
     Get paginated phones from the database with search support.
     Search is performed on Brand, Series, and Model fields.
     """
-    query = db.query(sell_models.PhoneList)
+    query = select(sell_models.PhoneList)
     
     # Apply search filter across Brand, Series, and Model
     if search:
         search_term = f"%{search}%"
-        query = query.filter(
+        query = query.where(
             (sell_models.PhoneList.Brand.ilike(search_term)) |
             (sell_models.PhoneList.Series.ilike(search_term)) |
             (sell_models.PhoneList.Model.ilike(search_term))
         )
     
     # Get total count before pagination
-    total = query.count()
+    total = await db.scalar(query.with_only_columns(func.count(sell_models.PhoneList.id)))
     
     # Apply pagination
-    phones = query.order_by(sell_models.PhoneList.Brand, sell_models.PhoneList.Model)\
-                   .offset(skip).limit(limit).all()
+    phones = (await db.scalars(
+        query.order_by(sell_models.PhoneList.Brand, sell_models.PhoneList.Model).offset(skip).limit(limit)
+    )).all()
     
     # Calculate pagination metadata
     total_pages = (total + limit - 1) // limit  # Ceiling division
@@ -958,17 +1000,19 @@ def create_phone(
     """
     Create a new phone in the database.
     """
-    # Check for duplicate
-    existing = db.query(sell_models.PhoneList).filter(
-        sell_models.PhoneList.Brand == payload.Brand,
-        sell_models.PhoneList.Model == payload.Model,
-        sell_models.PhoneList.Storage_Raw == payload.Storage_Raw
+    # Check for duplicate variant (same keys as the unique index)
+    PhoneList = sell_models.PhoneList
+    existing = db.query(PhoneList.id).filter(
+        PhoneList.brand_key == sell_models.normalize_key(payload.Brand),
+        PhoneList.model_key == sell_models.normalize_key(payload.Model),
+        PhoneList.RAM_GB.is_(None) if payload.RAM_GB is None else PhoneList.RAM_GB == payload.RAM_GB,
+        PhoneList.Internal_Storage_GB == payload.Internal_Storage_GB
     ).first()
     
     if existing:
         raise HTTPException(
             status_code=400,
-            detail="Phone with this brand, model, and storage already exists"
+            detail="Phone with this brand, model, RAM and storage already exists"
         )
     
     phone = sell_models.PhoneList(**payload.model_dump())
@@ -978,6 +1022,28 @@ def create_phone(
     return phone
 
 
+@router.post("/phones/import", response_model=CatalogImportReport)
+def import_phones(
+    file: UploadFile = File(..., description="CSV in the final_mobile_master_data.csv format"),
+    dry_run: bool = Query(False, description="Only report what would change"),
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(admin_utils.get_current_admin)
+):
+    """
+    Bulk upsert phones from a CSV, matching on (Brand, Model, RAM_GB, Internal_Storage_GB).
+    Returns the diff; with dry_run nothing is written.
+    """
+    import io
+    
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return catalog_import.import_catalog(db, lines, dry_run=dry_run)
+    except catalog_import.CatalogImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded CSV")
+
+
 @router.put("/phones/{phone_id}", response_model=PhoneListOut)
 def update_phone(
     phone_id: int,
@@ -997,7 +1063,14 @@ def update_phone(
     for field, value in update_data.items():
         setattr(phone, field, value)
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Phone with this brand, model, RAM and storage already exists"
+        )
     db.refresh(phone)
     return phone
 
@@ -0,0 +1,233 @@
+"""
+Bulk phone catalog import.
+
+Streams a CSV with the same columns as `final_mobile_master_data.csv`
+(Brand, Series, Model, Storage_Raw, Original_Price, Selling_Price, RAM_GB,
+Internal_Storage_GB; extra columns are ignored) into `phones_list`.
+
+Rows are upserted on (brand_key, model_key, RAM_GB, Internal_Storage_GB), the
+columns of the unique variant index, so Brand and Model match
+case-insensitively like the price lookups do. The existing
+catalog is loaded once, incoming rows are classified as new / changed /
+unchanged, and writes go out in batches of CATALOG_IMPORT_BATCH_SIZE as one
+executemany INSERT and one executemany UPDATE per batch. Table statistics are
+refreshed once at the end rather than per row.
+
+With dry_run the same diff is computed and reported, and nothing is written.
+"""
+import csv
+import logging
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import bindparam, insert, text, update
+from sqlalchemy.orm import Session
+
+from backend.services.sell_phone import catalog_version
+from backend.services.sell_phone.schema.models import PhoneList, normalize_key
+
+logger = logging.getLogger(__name__)
+
+CATALOG_IMPORT_BATCH_SIZE = int(os.getenv("CATALOG_IMPORT_BATCH_SIZE", "1000"))
+
+REQUIRED_COLUMNS = ["Brand", "Series", "Model", "Storage_Raw", "Selling_Price", "Internal_Storage_GB"]
+OPTIONAL_COLUMNS = ["Original_Price", "RAM_GB"]
+VALUE_COLUMNS = ["Series", "Storage_Raw", "Original_Price", "Selling_Price"]
+
+# Errors / per-row changes included in the report (the counts are always complete)
+MAX_REPORTED_ERRORS = 100
+MAX_REPORTED_CHANGES = 200
+
+
+class CatalogImportError(ValueError):
+    """The file cannot be imported at all (e.g. missing columns)."""
+
+
+def catalog_key(brand: str, model: str, ram_gb: Optional[float], storage_gb: float) -> Tuple:
+    return (normalize_key(brand), normalize_key(model), ram_gb, storage_gb)
+
+
+def _parse_float(value: Optional[str], column: str, required: bool) -> Optional[float]:
+    value = (value or "").strip()
+    if not value:
+        if required:
+            raise ValueError(f"{column} is required")
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{column} is not a number: {value!r}")
+
+
+def parse_row(row: Dict[str, str]) -> dict:
+    """Convert one CSV row into PhoneList column values. Raises ValueError."""
+    phone = {}
+    for column in ("Brand", "Series", "Model", "Storage_Raw"):
+        value = (row.get(column) or "").strip()
+        if not value:
+            raise ValueError(f"{column} is required")
+        phone[column] = value
+    phone["Selling_Price"] = _parse_float(row.get("Selling_Price"), "Selling_Price", True)
+    phone["Internal_Storage_GB"] = _parse_float(row.get("Internal_Storage_GB"), "Internal_Storage_GB", True)
+    phone["Original_Price"] = _parse_float(row.get("Original_Price"), "Original_Price", False)
+    phone["RAM_GB"] = _parse_float(row.get("RAM_GB"), "RAM_GB", False)
+    # Core bulk writes bypass PhoneList's validators
+    phone["brand_key"] = normalize_key(phone["Brand"])
+    phone["model_key"] = normalize_key(phone["Model"])
+    return phone
+
+
+def read_catalog_csv(lines: Iterable[str], report: dict) -> Iterator[Tuple[int, dict]]:
+    """
+    Yield (line number, parsed row) from CSV text. Invalid rows are counted
+    and recorded in `report` instead of being yielded.
+
+    Raises:
+        CatalogImportError: If required columns are missing from the header
+    """
+    reader = csv.DictReader(lines)
+    missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise CatalogImportError(f"Missing required columns: {', '.join(missing)}")
+
+    for row in reader:
+        try:
+            yield reader.line_num, parse_row(row)
+        except ValueError as e:
+            report["invalid"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"line": reader.line_num, "error": str(e)})
+
+
+def _load_existing(db: Session) -> Dict[Tuple, dict]:
+    existing = {}
+    rows = db.query(
+        PhoneList.id, PhoneList.brand_key, PhoneList.model_key, PhoneList.RAM_GB, PhoneList.Internal_Storage_GB,
+        PhoneList.Brand, PhoneList.Model, *[getattr(PhoneList, c) for c in VALUE_COLUMNS],
+    ).order_by(PhoneList.id).all()
+    for row in rows:
+        key = (row.brand_key, row.model_key, row.RAM_GB, row.Internal_Storage_GB)
+        # Variants with a NULL RAM_GB are not covered by the unique index;
+        # for any duplicates the lowest id is the one we keep updating
+        existing.setdefault(key, row._asdict())
+    return existing
+
+
+def _flush(db: Session, inserts: List[dict], updates: List[dict]) -> None:
+    if inserts:
+        db.execute(insert(PhoneList.__table__), inserts)
+    if updates:
+        table = PhoneList.__table__
+        # SET columns come from the parameter keys
+        db.execute(update(table).where(table.c.id == bindparam("_id")), updates)
+    inserts.clear()
+    updates.clear()
+
+
+def refresh_catalog_indexes(db: Session) -> None:
+    """Refresh planner statistics for phones_list after a bulk load."""
+    db.execute(text("ANALYZE phones_list"))
+    db.commit()
+
+
+def import_catalog(
+    db: Session,
+    lines: Iterable[str],
+    dry_run: bool = False,
+    batch_size: int = CATALOG_IMPORT_BATCH_SIZE,
+) -> dict:
+    """
+    Upsert a catalog CSV into phones_list.
+
+    Args:
+        db: Database session
+        lines: CSV text (file object or any iterable of lines) with a header row
+        dry_run: Only compute and report the diff
+        batch_size: Rows per executemany batch
+
+    Returns:
+        Report with counts (rows, inserted, updated, unchanged, duplicates,
+        invalid), the first errors and the first per-row changes
+
+    Raises:
+        CatalogImportError: If the file is missing required columns
+    """
+    report = {
+        "dry_run": dry_run,
+        "rows": 0,
+        "inserted": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "duplicates": 0,
+        "invalid": 0,
+        "errors": [],
+        "changes": [],
+    }
+    existing = _load_existing(db)
+    seen = set()
+    inserts: List[dict] = []
+    updates: List[dict] = []
+
+    def note_change(line: int, action: str, phone: dict, fields: Optional[dict] = None):
+        if len(report["changes"]) < MAX_REPORTED_CHANGES:
+            report["changes"].append({
+                "line": line,
+                "action": action,
+                "brand": phone["Brand"],
+                "model": phone["Model"],
+                "ram_gb": phone["RAM_GB"],
+                "internal_storage_gb": phone["Internal_Storage_GB"],
+                "fields": fields or {},
+            })
+
+    try:
+        for line, phone in read_catalog_csv(lines, report):
+            report["rows"] += 1
+            key = catalog_key(phone["Brand"], phone["Model"], phone["RAM_GB"], phone["Internal_Storage_GB"])
+            if key in seen:
+                # First occurrence in the file wins
+                report["duplicates"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append({"line": line, "error": "Duplicate variant in file, skipped"})
+                continue
+            seen.add(key)
+
+            current = existing.get(key)
+            if current is None:
+                report["inserted"] += 1
+                note_change(line, "insert", phone)
+                inserts.append(phone)
+            else:
+                fields = {
+                    c: {"old": current[c], "new": phone[c]}
+                    for c in ["Brand", "Model", *VALUE_COLUMNS]
+                    if current[c] != phone[c]
+                }
+                if not fields:
+                    report["unchanged"] += 1
+                    continue
+                report["updated"] += 1
+                note_change(line, "update", phone, fields)
+                updates.append({"_id": current["id"], **{c: phone[c] for c in ["Brand", "Model", *VALUE_COLUMNS]}})
+
+            if not dry_run and len(inserts) + len(updates) >= batch_size:
+                _flush(db, inserts, updates)
+
+        if dry_run:
+            return report
+
+        _flush(db, inserts, updates)
+        if report["inserted"] or report["updated"]:
+            catalog_version.bump(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if report["inserted"] or report["updated"]:
+        refresh_catalog_indexes(db)
+    logger.info(
+        "Catalog import: %s inserted, %s updated, %s unchanged, %s invalid, %s duplicates",
+        report["inserted"], report["updated"], report["unchanged"], report["invalid"], report["duplicates"],
+    )
+    return report
@@ -0,0 +1,358 @@
+"""
+Materialized admin dashboard statistics.
+
+Instead of running full-table aggregates on every dashboard load, counters
+are maintained from the writes they count. Mapper events on users, partners,
+orders and credit transactions work out from attribute history how each
+insert, update or delete changes the counters (no extra queries inside the
+flush); the deltas are collected in `session.info` and, when the transaction
+commits, appended to `dashboard_counter_deltas` as one row per counter.
+Writers only ever insert, so they never wait on each other for a shared
+counter row.
+
+`fold_deltas()`, run every DASHBOARD_FOLD_INTERVAL_SECONDS by a background
+job, moves the pending deltas into the per-counter rows of
+`dashboard_counters`, which is all a dashboard read touches.
+
+`reconcile()` recomputes every counter from the source tables and appends the
+difference as correction deltas. It runs on first read (empty table),
+periodically from the app's background job, and on demand from the admin API,
+and corrects any drift (e.g. rows written by scripts outside the app, updates
+of attributes that were never loaded, or deltas of a rolled-back savepoint).
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, Optional
+
+from sqlalchemy import event, func, inspect, literal, or_, select, union_all, insert, delete
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.base import NO_VALUE
+
+from backend.services.admin.schema.models import DashboardCounter, DashboardCounterDelta, PartnerCreditTransaction
+from backend.services.auth.models import User
+from backend.services.partner.schema.models import Partner
+from backend.services.sell_phone.schema.models import Order
+
+logger = logging.getLogger(__name__)
+
+ORDER_STATUS_PREFIX = "orders_status:"
+PENDING_VERIFICATION_STATUSES = ('pending', 'under_review', 'clarification_needed')
+PENDING_DELTAS_KEY = "dashboard_counter_deltas"
+# pg_advisory_xact_lock key serializing reconciliations
+RECONCILE_LOCK_ID = 7_301_520
+
+
+# ------------------------------
+# Per-row contributions
+# ------------------------------
+
+def _user_counters(values: dict) -> Dict[str, float]:
+    return {"customers_total": 1}
+
+
+def _partner_counters(values: dict) -> Dict[str, float]:
+    verification_status = values["verification_status"]
+    return {
+        "partners_total": 1,
+        "partners_active": 1 if verification_status == 'approved' and values["is_active"] else 0,
+        "partners_pending": 1 if verification_status in PENDING_VERIFICATION_STATUSES else 0,
+        "credits_in_circulation": values["credit_balance"] or 0.0,
+    }
+
+
+def _order_counters(values: dict) -> Dict[str, float]:
+    return {"orders_total": 1, f"{ORDER_STATUS_PREFIX}{values['status']}": 1}
+
+
+def _transaction_counters(values: dict) -> Dict[str, float]:
+    if values["transaction_type"] != 'lead_purchase':
+        return {}
+    return {"revenue_total": -(values["amount"] or 0.0)}
+
+
+# model -> (columns the counters depend on, contribution function)
+TRACKED_MODELS = {
+    User: ((), _user_counters),
+    Partner: (("verification_status", "is_active", "credit_balance"), _partner_counters),
+    Order: (("status",), _order_counters),
+    PartnerCreditTransaction: (("transaction_type", "amount"), _transaction_counters),
+}
+
+
+def _inserted_values(obj, attrs) -> dict:
+    """Column values of a just-inserted object, from its state (scalar defaults are applied by then)."""
+    state = inspect(obj)
+    values = {}
+    for attr in attrs:
+        value = state.attrs[attr].loaded_value
+        if value is NO_VALUE:
+            default = obj.__table__.c[attr].default
+            value = default.arg if default is not None and default.is_scalar else None
+        values[attr] = value
+    return values
+
+
+def _history_values(obj, attrs, old: bool) -> Optional[dict]:
+    """
+    Values before (old) or after a flush, from attribute history only.
+    None if an attribute was never loaded, e.g. overwritten while expired.
+    """
+    state = inspect(obj)
+    values = {}
+    for attr in attrs:
+        history = state.attrs[attr].history
+        if history.has_changes():
+            known = history.deleted if old else history.added
+        else:
+            known = history.unchanged
+        if not known:
+            return None
+        values[attr] = known[0]
+    return values
+
+
+def _add_contribution(obj, counters: Dict[str, float], sign: int) -> None:
+    session = Session.object_session(obj)
+    if session is not None and counters:
+        add_deltas(session, {key: sign * value for key, value in counters.items()})
+
+
+def _track(model, attrs, counters) -> None:
+    """Keep counters in step with inserts, updates and deletes of `model`."""
+
+    @event.listens_for(model, "after_insert")
+    def _inserted(mapper, connection, target) -> None:
+        _add_contribution(target, counters(_inserted_values(target, attrs)), 1)
+
+    @event.listens_for(model, "after_delete")
+    def _deleted(mapper, connection, target) -> None:
+        old = _history_values(target, attrs, old=True)
+        if old is None:
+            logger.debug("Dashboard counters: old values of deleted %r not loaded, left to reconcile", target)
+            return
+        _add_contribution(target, counters(old), -1)
+
+    if not attrs:
+        return
+
+    @event.listens_for(model, "after_update")
+    def _updated(mapper, connection, target) -> None:
+        state = inspect(target)
+        if not any(state.attrs[a].history.has_changes() for a in attrs):
+            return
+        old = _history_values(target, attrs, old=True)
+        new = _history_values(target, attrs, old=False)
+        if old is None or new is None:
+            logger.debug("Dashboard counters: old values of %r not loaded, left to reconcile", target)
+            return
+        _add_contribution(target, counters(old), -1)
+        _add_contribution(target, counters(new), 1)
+
+
+for _model, (_attrs, _counters) in TRACKED_MODELS.items():
+    _track(_model, _attrs, _counters)
+
+
+@event.listens_for(Session, "before_commit")
+def _write_dashboard_deltas(session: Session) -> None:
+    if session.in_nested_transaction():
+        # Savepoint release; the outer commit writes everything at once
+        return
+    # Commit flushes only after this hook runs; flush first so the last
+    # changes are counted too
+    session.flush()
+    deltas = session.info.pop(PENDING_DELTAS_KEY, None)
+    if deltas:
+        write_deltas(session, deltas)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_dashboard_deltas(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        # Rolled back (or already written by the commit)
+        session.info.pop(PENDING_DELTAS_KEY, None)
+
+
+# ------------------------------
+# Writes
+# ------------------------------
+
+def add_deltas(session: Session, deltas: Dict[str, float]) -> None:
+    """
+    Count deltas towards the session's transaction; they are written when it
+    commits and dropped if it rolls back. For changes the mapper events
+    cannot see (e.g. Core updates).
+    """
+    pending = session.info.setdefault(PENDING_DELTAS_KEY, defaultdict(float))
+    for key, value in deltas.items():
+        pending[key] += value
+
+
+def write_deltas(session: Session, deltas: Dict[str, float]) -> None:
+    """Append delta rows within the session's transaction, in a fixed key order."""
+    rows = [{"counter_key": key, "delta": deltas[key]} for key in sorted(deltas) if deltas[key]]
+    if rows:
+        session.connection().execute(insert(DashboardCounterDelta.__table__), rows)
+
+
+def _upsert(connection):
+    """INSERT ... ON CONFLICT construct for the connection's dialect."""
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert
+
+
+def fold_deltas(db: Session) -> int:
+    """
+    Move pending deltas into the counter rows. The deltas are deleted and
+    returned by one statement, so concurrent folds never apply the same row
+    twice. Commits the session; returns the number of deltas folded.
+    """
+    connection = db.connection()
+    deltas = DashboardCounterDelta.__table__
+    rows = connection.execute(delete(deltas).returning(deltas.c.counter_key, deltas.c.delta)).all()
+    totals: Dict[str, float] = defaultdict(float)
+    for key, delta in rows:
+        totals[key] += delta
+
+    table = DashboardCounter.__table__
+    dialect_insert = _upsert(connection)
+    # Fixed key order keeps lock acquisition order consistent across folds
+    for key in sorted(totals):
+        stmt = dialect_insert(table).values(counter_key=key, value=totals[key])
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.counter_key],
+            set_={"value": table.c.value + stmt.excluded.value, "updated_at": func.now()},
+        ))
+    db.commit()
+    return len(rows)
+
+
+def _corrections_select():
+    """
+    SELECT counter_key, delta: for every counter, the recount from the source
+    tables minus its current value (stored row plus pending deltas). Counters
+    that have no row yet are included even when the correction is 0.
+    """
+    recount = [
+        select(literal("customers_total"), func.count(User.id)),
+        select(literal("partners_total"), func.count(Partner.id)),
+        select(literal("partners_active"), func.count(Partner.id)).where(
+            Partner.verification_status == 'approved',
+            Partner.is_active == True
+        ),
+        select(literal("partners_pending"), func.count(Partner.id)).where(
+            Partner.verification_status.in_(PENDING_VERIFICATION_STATUSES)
+        ),
+        select(literal("orders_total"), func.count(Order.id)),
+        select(literal("revenue_total"), func.coalesce(func.sum(-PartnerCreditTransaction.amount), 0)).where(
+            PartnerCreditTransaction.transaction_type == 'lead_purchase'
+        ),
+        select(literal("credits_in_circulation"), func.coalesce(func.sum(Partner.credit_balance), 0)),
+        select(literal(ORDER_STATUS_PREFIX) + Order.status, func.count(Order.id)).group_by(Order.status),
+    ]
+    parts = union_all(
+        *[stmt.add_columns(literal(0)) for stmt in recount],
+        select(DashboardCounter.counter_key, -DashboardCounter.value, literal(1)),
+        select(DashboardCounterDelta.counter_key, -DashboardCounterDelta.delta, literal(0)),
+    ).subquery()
+    key, value, stored = parts.c
+    return select(key, func.sum(value)).group_by(key).having(
+        or_(func.abs(func.sum(value)) > 1e-9, func.max(stored) == 0)
+    )
+
+
+def reconcile(db: Session) -> Dict[str, float]:
+    """
+    Recompute all counters from the source tables and append the difference
+    to the current values as correction deltas, then fold. The recount and the
+    current values are read by the same INSERT ... SELECT, so they come from
+    one snapshot: a writer's rows and its deltas are either both seen or both
+    not. On Postgres an advisory lock makes concurrent reconciliations run one
+    after the other, so the second finds nothing left to correct. Commits the
+    session; returns the counters.
+    """
+    connection = db.connection()
+    if connection.dialect.name == "postgresql":
+        connection.execute(select(func.pg_advisory_xact_lock(RECONCILE_LOCK_ID)))
+    connection.execute(
+        insert(DashboardCounterDelta.__table__).from_select(["counter_key", "delta"], _corrections_select())
+    )
+    db.commit()
+    fold_deltas(db)
+    return _stored_counters(db)
+
+
+def reconcile_job() -> None:
+    """Background job entry point: reconcile using a dedicated session."""
+    from backend.shared.db.connections import SessionLocal
+
+    db = SessionLocal()
+    try:
+        reconcile(db)
+    except Exception:
+        db.rollback()
+        logger.exception("Dashboard counter reconciliation failed")
+    finally:
+        db.close()
+
+
+def fold_job() -> None:
+    """Background job entry point: fold pending deltas using a dedicated session."""
+    from backend.shared.db.connections import SessionLocal
+
+    db = SessionLocal()
+    try:
+        fold_deltas(db)
+    except Exception:
+        db.rollback()
+        logger.exception("Dashboard counter fold failed")
+    finally:
+        db.close()
+
+
+# ------------------------------
+# Reads
+# ------------------------------
+
+def _stored_counters(db: Session) -> Dict[str, float]:
+    return dict(db.query(DashboardCounter.counter_key, DashboardCounter.value).all())
+
+
+def read_counters(db: Session) -> Dict[str, float]:
+    """
+    All counter rows in one query (one row per counter). Changes are at most
+    one fold interval old. Reconciles first if the table has never been
+    populated.
+    """
+    counters = _stored_counters(db)
+    if not counters:
+        counters = reconcile(db)
+    return counters
+
+
+def get_stats(db: Session) -> dict:
+    """Dashboard statistics in the shape of DashboardStats."""
+    counters = read_counters(db)
+
+    def count(key: str) -> int:
+        return int(round(counters.get(key, 0)))
+
+    orders_by_status = {
+        key[len(ORDER_STATUS_PREFIX):]: int(round(value))
+        for key, value in counters.items()
+        if key.startswith(ORDER_STATUS_PREFIX) and round(value)
+    }
+    return {
+        "total_customers": count("customers_total"),
+        "total_partners": count("partners_total"),
+        "active_partners": count("partners_active"),
+        "pending_verifications": count("partners_pending"),
+        "total_agents": 0,  # TODO: Implement when agent model is ready
+        "total_orders": count("orders_total"),
+        "orders_by_status": orders_by_status,
+        "total_revenue": float(counters.get("revenue_total", 0.0)),
+        "credits_in_circulation": float(counters.get("credits_in_circulation", 0.0)),
+    }
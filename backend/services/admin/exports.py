@@ -0,0 +1,141 @@
+"""
+Streaming exports for finance reconciliation.
+
+Rows are read with a server-side cursor (`yield_per`) and written out chunk by
+chunk, so memory use is bounded by EXPORT_CHUNK_SIZE regardless of how many
+rows match. Each generator opens its own session because the response body
+is produced after the request's dependencies have finished.
+
+Parquet output needs the optional `pyarrow` package.
+"""
+import csv
+import io
+import os
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import select
+
+from backend.services.admin.schema.models import PartnerCreditTransaction
+from backend.shared.db.connections import SessionLocal
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "5000"))
+
+CREDIT_TRANSACTION_EXPORT_COLUMNS = [
+    "id", "partner_id", "transaction_type", "amount", "balance_before", "balance_after",
+    "reference_id", "reference_type", "payment_method", "payment_transaction_id",
+    "notes", "created_by_admin_id", "created_at",
+]
+
+
+def credit_transactions_query(
+    partner_id: Optional[int] = None,
+    transaction_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Select the export columns with the given filters, in ledger order."""
+    columns = [getattr(PartnerCreditTransaction, c) for c in CREDIT_TRANSACTION_EXPORT_COLUMNS]
+    stmt = select(*columns).order_by(PartnerCreditTransaction.id)
+    if partner_id is not None:
+        stmt = stmt.where(PartnerCreditTransaction.partner_id == partner_id)
+    if transaction_type:
+        stmt = stmt.where(PartnerCreditTransaction.transaction_type == transaction_type)
+    if start is not None:
+        stmt = stmt.where(PartnerCreditTransaction.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(PartnerCreditTransaction.created_at < end)
+    return stmt
+
+
+def _iter_chunks(stmt) -> Iterator[List[tuple]]:
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def stream_csv(stmt, columns: List[str]) -> Iterator[bytes]:
+    """CSV with a header row, emitted one chunk of rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+
+    for rows in _iter_chunks(stmt):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            writer.writerow(
+                value.isoformat() if isinstance(value, datetime) else value for value in row
+            )
+        yield buffer.getvalue().encode("utf-8")
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the generator."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def credit_transactions_parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("partner_id", pa.int64()),
+        ("transaction_type", pa.string()),
+        ("amount", pa.float64()),
+        ("balance_before", pa.float64()),
+        ("balance_after", pa.float64()),
+        ("reference_id", pa.int64()),
+        ("reference_type", pa.string()),
+        ("payment_method", pa.string()),
+        ("payment_transaction_id", pa.string()),
+        ("notes", pa.string()),
+        ("created_by_admin_id", pa.int64()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+def stream_parquet(stmt, schema) -> Iterator[bytes]:
+    """Parquet file with one row group per chunk. Requires pyarrow."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    for rows in _iter_chunks(stmt):
+        columns = list(zip(*rows))
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema,
+        ))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
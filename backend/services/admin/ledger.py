@@ -0,0 +1,232 @@
+"""
+Partner credit ledger.
+
+All changes to `Partner.credit_balance` go through `record_transaction`, which
+applies the change with a single atomic
+`UPDATE partners SET credit_balance = credit_balance + :amount ... RETURNING`
+and appends the matching `PartnerCreditTransaction` in the same savepoint.
+Concurrent purchases and lead buys therefore cannot lose updates, and the
+ledger row always carries the exact before/after balance.
+
+Callers may pass an idempotency key (e.g. the payment gateway's transaction
+id). Replaying a key returns the original transaction without touching the
+balance, including when two requests with the same key race.
+
+`snapshot_balances` periodically records, per partner, the balance implied by
+the ledger so far (last snapshot + newer transactions). Reconciliation only
+has to read transactions added since the previous snapshot.
+"""
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from backend.services.admin import dashboard
+from backend.services.admin.schema.models import PartnerCreditTransaction, PartnerCreditSnapshot
+from backend.services.partner.schema.models import Partner
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SETTLE_SECONDS = int(os.getenv("CREDIT_SNAPSHOT_SETTLE_SECONDS", "60"))
+
+
+class InsufficientCreditsError(ValueError):
+    """The partner's balance would go negative."""
+
+
+class PartnerNotFoundError(ValueError):
+    """No partner with the given id."""
+
+
+def get_transaction_by_key(db: Session, idempotency_key: str) -> Optional[PartnerCreditTransaction]:
+    return db.query(PartnerCreditTransaction).filter(
+        PartnerCreditTransaction.idempotency_key == idempotency_key
+    ).first()
+
+
+def record_transaction(
+    db: Session,
+    partner_id: int,
+    amount: float,
+    transaction_type: str,
+    *,
+    idempotency_key: Optional[str] = None,
+    allow_negative_balance: bool = False,
+    reference_id: Optional[int] = None,
+    reference_type: Optional[str] = None,
+    payment_method: Optional[str] = None,
+    payment_transaction_id: Optional[str] = None,
+    notes: Optional[str] = None,
+    created_by_admin_id: Optional[int] = None,
+) -> Tuple[PartnerCreditTransaction, bool]:
+    """
+    Atomically apply `amount` (positive = credit, negative = debit) to a
+    partner's balance and append the ledger entry. Does not commit.
+
+    Args:
+        db: Database session
+        partner_id: Partner whose balance changes
+        amount: Signed credit amount
+        transaction_type: 'credit_purchase', 'lead_purchase', 'refund', 'adjustment', 'bonus'
+        idempotency_key: Unique key; a replay returns the existing transaction
+        allow_negative_balance: Skip the balance >= 0 guard
+
+    Returns:
+        (transaction, created) - created is False for an idempotent replay
+
+    Raises:
+        PartnerNotFoundError: If the partner does not exist
+        InsufficientCreditsError: If the balance would become negative
+    """
+    if idempotency_key:
+        existing = get_transaction_by_key(db, idempotency_key)
+        if existing:
+            return existing, False
+
+    partners = Partner.__table__
+    stmt = update(partners).where(partners.c.id == partner_id).values(
+        credit_balance=partners.c.credit_balance + amount
+    ).returning(partners.c.credit_balance)
+    if not allow_negative_balance and amount < 0:
+        stmt = stmt.where(partners.c.credit_balance + amount >= 0)
+
+    try:
+        with db.begin_nested():
+            balance_after = db.execute(stmt).scalar()
+            if balance_after is None:
+                if db.query(Partner.id).filter(Partner.id == partner_id).first() is None:
+                    raise PartnerNotFoundError("Partner not found")
+                raise InsufficientCreditsError("Insufficient credits")
+
+            transaction = PartnerCreditTransaction(
+                partner_id=partner_id,
+                transaction_type=transaction_type,
+                amount=amount,
+                balance_before=balance_after - amount,
+                balance_after=balance_after,
+                reference_id=reference_id,
+                reference_type=reference_type,
+                payment_method=payment_method,
+                payment_transaction_id=payment_transaction_id,
+                notes=notes,
+                created_by_admin_id=created_by_admin_id,
+                idempotency_key=idempotency_key,
+            )
+            db.add(transaction)
+            db.flush()
+    except IntegrityError:
+        # Another request committed the same idempotency key first; the
+        # savepoint rollback has undone our balance change.
+        existing = get_transaction_by_key(db, idempotency_key) if idempotency_key else None
+        if existing is None:
+            raise
+        return existing, False
+
+    # The balance was changed outside the ORM: refresh any loaded Partner and
+    # keep the dashboard's credits-in-circulation counter in step.
+    loaded = db.identity_map.get(identity_key(Partner, partner_id))
+    if loaded is not None:
+        db.expire(loaded, ["credit_balance"])
+    dashboard.add_deltas(db, {"credits_in_circulation": amount})
+
+    return transaction, True
+
+
+# ------------------------------
+# Snapshots / reconciliation
+# ------------------------------
+
+def snapshot_balances(db: Session) -> int:
+    """
+    Record a PartnerCreditSnapshot for every partner with ledger activity since
+    the previous run. Only transactions after the last run's watermark are
+    read. Logs partners whose computed balance disagrees with the
+    balance_after of their latest ledger entry. Commits; returns snapshots written.
+    """
+    watermark = db.query(func.max(PartnerCreditSnapshot.covered_through_id)).scalar() or 0
+    # Ids are assigned before commit, so a recent lower id may still be in
+    # flight; only cover transactions older than the settle lag.
+    settled_before = datetime.now(timezone.utc) - timedelta(seconds=SNAPSHOT_SETTLE_SECONDS)
+    covered_through = db.query(func.max(PartnerCreditTransaction.id)).filter(
+        PartnerCreditTransaction.created_at <= settled_before
+    ).scalar()
+    if covered_through is None or covered_through <= watermark:
+        return 0
+
+    activity = db.query(
+        PartnerCreditTransaction.partner_id,
+        func.sum(PartnerCreditTransaction.amount),
+        func.max(PartnerCreditTransaction.id),
+        func.min(PartnerCreditTransaction.id),
+    ).filter(
+        PartnerCreditTransaction.id > watermark,
+        PartnerCreditTransaction.id <= covered_through,
+    ).group_by(PartnerCreditTransaction.partner_id).all()
+    if not activity:
+        return 0
+
+    partner_ids = [partner_id for partner_id, _, _, _ in activity]
+    previous = {
+        s.partner_id: s.balance
+        for s in db.query(PartnerCreditSnapshot).filter(
+            PartnerCreditSnapshot.id.in_(
+                db.query(func.max(PartnerCreditSnapshot.id)).filter(
+                    PartnerCreditSnapshot.partner_id.in_(partner_ids)
+                ).group_by(PartnerCreditSnapshot.partner_id)
+            )
+        ).all()
+    }
+    last_balances = dict(
+        db.query(PartnerCreditTransaction.id, PartnerCreditTransaction.balance_after).filter(
+            PartnerCreditTransaction.id.in_([last_id for _, _, last_id, _ in activity])
+        ).all()
+    )
+    # A partner's first snapshot starts from the balance before their first
+    # covered transaction, which need not be 0 (balances set before the
+    # ledger existed or outside it)
+    opening_balances = dict(
+        db.query(PartnerCreditTransaction.id, PartnerCreditTransaction.balance_before).filter(
+            PartnerCreditTransaction.id.in_(
+                [first_id for partner_id, _, _, first_id in activity if partner_id not in previous]
+            )
+        ).all()
+    )
+
+    for partner_id, delta, last_id, first_id in activity:
+        opening = previous[partner_id] if partner_id in previous else opening_balances[first_id] or 0.0
+        balance = opening + (delta or 0.0)
+        drift = round(last_balances[last_id] - balance, 6)
+        if drift:
+            logger.warning(
+                "Credit ledger drift for partner %s: ledger sum %.2f, last balance_after %.2f",
+                partner_id, balance, last_balances[last_id],
+            )
+        db.add(PartnerCreditSnapshot(
+            partner_id=partner_id,
+            balance=balance,
+            last_transaction_id=last_id,
+            covered_through_id=covered_through,
+            drift=drift,
+        ))
+
+    db.commit()
+    return len(activity)
+
+
+def snapshot_job() -> None:
+    """Background job entry point: snapshot using a dedicated session."""
+    from backend.shared.db.connections import SessionLocal
+
+    db = SessionLocal()
+    try:
+        snapshot_balances(db)
+    except Exception:
+        db.rollback()
+        logger.exception("Credit ledger snapshot failed")
+    finally:
+        db.close()
@@ -93,6 +93,9 @@ class PartnerCreditTransaction(Base):
     created_by_admin_id = Column(Integer, ForeignKey("admins.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
+    # Client/payment supplied key making the transaction idempotent (see admin/ledger.py)
+    idempotency_key = Column(String, unique=True, index=True, nullable=True)
+
 
 class AdminCreditConfiguration(Base):
     """
@@ -106,3 +109,53 @@ class AdminCreditConfiguration(Base):
     description = Column(Text, nullable=True)
     updated_by_admin_id = Column(Integer, ForeignKey("admins.id", ondelete="SET NULL"), nullable=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class DashboardCounter(Base):
+    """
+    Materialized admin dashboard statistics, one row per counter (see
+    admin/dashboard.py). Changes not yet folded in are in
+    dashboard_counter_deltas.
+
+    Keys: 'customers_total', 'partners_total', 'partners_active', 'partners_pending',
+    'orders_total', 'orders_status:<status>', 'revenue_total', 'credits_in_circulation'
+    """
+    __tablename__ = "dashboard_counters"
+
+    counter_key = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class DashboardCounterDelta(Base):
+    """
+    Append-only change to a dashboard counter, one row per counter per
+    committed transaction (or reconciliation). Folded into
+    dashboard_counters and deleted by the fold job.
+    """
+    __tablename__ = "dashboard_counter_deltas"
+
+    id = Column(Integer, primary_key=True, index=True)
+    counter_key = Column(String, nullable=False)
+    delta = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class PartnerCreditSnapshot(Base):
+    """
+    Periodic per-partner balance computed from the credit ledger
+    (previous snapshot + transactions up to covered_through_id).
+    Written by admin/ledger.py snapshot_balances.
+    """
+    __tablename__ = "partner_credit_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    partner_id = Column(Integer, ForeignKey("partners.id", ondelete="CASCADE"), nullable=False, index=True)
+    balance = Column(Float, nullable=False)
+    # Latest ledger entry of this partner included in the balance
+    last_transaction_id = Column(Integer, nullable=False)
+    # Global ledger watermark of the snapshot run
+    covered_through_id = Column(Integer, nullable=False, index=True)
+    # balance_after of the latest entry minus the computed balance (0 when consistent)
+    drift = Column(Float, nullable=False, default=0.0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 import re
 from enum import Enum
@@ -194,6 +194,7 @@ class PartnerCreditTransactionOut(BaseModel):
 class AdjustCreditsRequest(BaseModel):
     amount: float
     notes: str
+    idempotency_key: Optional[str] = None
 
 
 class AdminCreditConfigurationOut(BaseModel):
@@ -272,11 +273,12 @@ class AdminOrderOut(BaseModel):
 
 class AdminOrderPaginatedOut(BaseModel):
     items: List[AdminOrderOut]
-    total: int
+    total: Optional[int] = None  # None when include_total=false
     page: int
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
     has_more: bool
+    next_cursor: Optional[str] = None
 
 
 # ============================================================================
@@ -329,4 +331,31 @@ class PhoneListPaginatedOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+
+class CatalogImportChange(BaseModel):
+    line: int
+    action: str
+    brand: str
+    model: str
+    ram_gb: Optional[float] = None
+    internal_storage_gb: float
+    fields: Dict[str, Dict[str, Any]] = {}
+
+
+class CatalogImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class CatalogImportReport(BaseModel):
+    dry_run: bool
+    rows: int
+    inserted: int
+    updated: int
+    unchanged: int
+    duplicates: int
+    invalid: int
+    errors: List[CatalogImportRowError]
+    changes: List[CatalogImportChange]
+
 from backend.services.sell_phone.schema.schemas import OrderOut
@@ -1,10 +1,12 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-import bcrypt
+from backend.shared.auth import hashing
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+import os
 from backend.shared.db.connections import get_db
+from backend.shared.cache import TTLCache
 from backend.services.admin.schema.models import Admin
 
 # Secret for admin JWT (should be different from customer JWT in production)
@@ -14,18 +16,19 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
 admin_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/admin/auth/login")
 
+# Filtered row counts for admin listings; a slightly stale total is fine
+# for audits and avoids a full count on every page view.
+listing_count_cache = TTLCache(ttl_seconds=int(os.getenv("ADMIN_COUNT_CACHE_TTL_SECONDS", "30")))
+
 
 def get_password_hash(password: str) -> str:
-    """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    """Hash password using bcrypt (see backend.shared.auth.hashing)"""
+    return hashing.hash_password(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
-    try:
-        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
-    except ValueError:
-        return False
+    return hashing.verify_password(plain_password, hashed_password)
 
 
 def create_admin_access_token(*, data: dict, expires_delta: timedelta = None):
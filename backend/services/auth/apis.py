@@ -1,27 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from sqlalchemy.orm import Session
-from backend.services.auth import models, schemas, utils
-from backend.shared.db.connections import Base, engine, get_db
+from backend.services.auth import models, schemas, utils, principals
+from backend.shared.db.connections import get_db
+from backend.shared.auth import hashing
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 
-# ensure tables exist
-Base.metadata.create_all(bind=engine)
-
 @router.post("/signup", response_model=schemas.UserRegistrationResponse, tags=["auth"])
-def signup(user_in: schemas.UserCreate, db: Session = Depends(utils.get_db)):
+async def signup(user_in: schemas.UserCreate, db: Session = Depends(utils.get_db)):
     # Check for duplicate email
-    existing_email = db.query(models.User).filter(models.User.email == user_in.email).first()
+    existing_email = await run_in_threadpool(
+        lambda: db.query(models.User).filter(models.User.email == user_in.email).first()
+    )
     if existing_email:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Check for duplicate phone if provided
     if user_in.phone:
-        existing_phone = db.query(models.User).filter(models.User.phone == user_in.phone).first()
+        existing_phone = await run_in_threadpool(
+            lambda: db.query(models.User).filter(models.User.phone == user_in.phone).first()
+        )
         if existing_phone:
             raise HTTPException(status_code=400, detail="Phone number already registered")
     
-    hashed = utils.get_password_hash(user_in.password)
+    hashed = await hashing.hash_password_async(user_in.password)
+    return await run_in_threadpool(_create_user, db, user_in, hashed)
+
+
+def _create_user(db: Session, user_in: schemas.UserCreate, hashed: str) -> dict:
     user = models.User(
         email=user_in.email,
         full_name=user_in.full_name,
@@ -45,17 +52,21 @@ def signup(user_in: schemas.UserCreate, db: Session = Depends(utils.get_db)):
     }
 
 @router.post("/login", response_model=schemas.Token, tags=["auth"])
-def login(payload: schemas.UserLogin, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(
-        (models.User.phone == payload.identifier) | (models.User.email == payload.identifier)
-    ).first()
-    print(user)
+async def login(payload: schemas.UserLogin, db: Session = Depends(get_db)):
+    # async so bcrypt runs on the hashing pool without holding a request worker;
+    # DB calls go through the threadpool to keep the event loop free
+    user = await run_in_threadpool(
+        lambda: db.query(models.User).filter(
+            (models.User.phone == payload.identifier) | (models.User.email == payload.identifier)
+        ).first()
+    )
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect credentials")
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Account is inactive")
-    if not utils.verify_password(payload.password, user.hashed_password):
+    if not await hashing.verify_password_async(payload.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect credentials")
+    await hashing.rehash_if_needed(db, user, payload.password)
     token = utils.create_access_token(data={"user_id": user.id})
     return {"access_token": token, "token_type": "bearer"}
 
@@ -82,35 +93,15 @@ def read_me(current_user: models.User = Depends(utils.get_current_user)):
 	return {"full_name": current_user.full_name}
 
 @router.get("/me/details", response_model=schemas.UserOut, tags=["auth"])
-def read_me_details(current_user: models.User = Depends(utils.get_current_user)):
+def read_me_details(
+    current_user: models.User = Depends(utils.get_current_user),
+    db: Session = Depends(get_db),
+):
     """
     Return full current user details useful for prefilling forms (phone, address, etc).
     """
     # Determine role by checking admin/agent/partner tables
-    role = "customer"
-    try:
-        from backend.services.admin.schema.models import Admin
-        from backend.services.partner.schema.models import Agent, Partner
-
-        if current_user and current_user.email:
-            admin = (db := None)
-            # use the engine-bound session via utils.get_db if needed; here we can query using current session
-            # but we do not have db here; instead use simple existence checks via SQL queries using current_user.email
-            # Prefer to query via the existing DB session by importing get_db and using a new session
-            from backend.shared.db.connections import SessionLocal
-            dbs = SessionLocal()
-            try:
-                if dbs.query(Admin).filter(Admin.email == current_user.email).first():
-                    role = "admin"
-                elif dbs.query(Agent).filter(Agent.email == current_user.email).first():
-                    role = "agent"
-                elif dbs.query(Partner).filter(Partner.email == current_user.email).first():
-                    role = "partner"
-            finally:
-                dbs.close()
-    except Exception:
-        # if any error, default to customer
-        role = "customer"
+    role = utils.resolve_role(db, current_user.email)
 
     # Return plain dict so Pydantic model includes inferred `role` key
     return {
@@ -169,19 +160,7 @@ def google_auth(payload: dict = Body(...), db: Session = Depends(get_db)):
         needs_profile = (not user.phone) or (not user.address)
 
         # infer role for client convenience
-        role = "customer"
-        try:
-            from backend.services.admin.schema.models import Admin
-            from backend.services.partner.schema.models import Agent, Partner
-
-            if db.query(Admin).filter(Admin.email == user.email).first():
-                role = "admin"
-            elif db.query(Agent).filter(Agent.email == user.email).first():
-                role = "agent"
-            elif db.query(Partner).filter(Partner.email == user.email).first():
-                role = "partner"
-        except Exception:
-            role = "customer"
+        role = utils.resolve_role(db, user.email)
 
         return {
             "access_token": token,
@@ -240,6 +219,7 @@ def update_current_user(
     db.add(user)
     db.commit()
     db.refresh(user)
+    principals.principal_cache.invalidate("user", user.id)
     
     # Log serviceability info if pincode changed (non-blocking, just for info)
     if pincode_changed and new_pincode:
@@ -290,6 +270,7 @@ def update_user(user_id: int, payload: schemas.UserUpdate, current_user: models.
     db.add(user)
     db.commit()
     db.refresh(user)
+    principals.principal_cache.invalidate("user", user.id)
     return user
 
 @router.delete("/users/{user_id}", status_code=204, tags=["auth"])
@@ -302,4 +283,5 @@ def delete_user(user_id: int, current_user: models.User = Depends(utils.get_curr
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     db.delete(user)
     db.commit()
+    principals.principal_cache.invalidate("user", user_id)
     return None
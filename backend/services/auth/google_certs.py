@@ -0,0 +1,191 @@
+"""
+Google ID token verification with cached signing certificates.
+
+`google.oauth2.id_token` fetches Google's signing certs on every verification.
+Google serves them with `Cache-Control: public, max-age=...` (hours), so we
+wrap the google-auth transport in a caching request that keeps GET responses
+until their max-age expires, on top of a pooled `requests.Session` shared with
+the OAuth code exchange.
+
+Google rotates its keys ahead of time, but a token signed with a key newer
+than our cached copy would fail until max-age runs out. When a token's `kid`
+is not among the cached certs, the certs are refetched once before verifying
+(at most every GOOGLE_CERTS_REFETCH_INTERVAL_SECONDS, so tokens with made-up
+kids cannot turn every sign-in into a download).
+
+GOOGLE_CERTS_URL overrides the certificate endpoint (e.g. to point at a local
+key server in development).
+"""
+import base64
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+import requests
+from google.auth import exceptions, transport
+from google.auth.transport import requests as grequests
+from google.oauth2 import id_token as google_id_token
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+GOOGLE_CERTS_REFETCH_INTERVAL_SECONDS = float(os.getenv("GOOGLE_CERTS_REFETCH_INTERVAL_SECONDS", "30"))
+
+# Pooled HTTP session for all calls to Google (certs and token exchange)
+http_session = requests.Session()
+http_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def cache_lifetime(headers) -> int:
+    """
+    Seconds a response may be reused according to its Cache-Control
+    (max-age minus Age). 0 if it must not be cached.
+    """
+    cache_control = (headers.get("Cache-Control") or headers.get("cache-control") or "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    if not match:
+        return 0
+    age = headers.get("Age") or headers.get("age") or 0
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        age = 0
+    return max(0, int(match.group(1)) - age)
+
+
+class _CachedResponse(transport.Response):
+    def __init__(self, status: int, headers: dict, data: bytes):
+        self._status = status
+        self._headers = headers
+        self._data = data
+
+    @property
+    def status(self):
+        return self._status
+
+    @property
+    def headers(self):
+        return self._headers
+
+    @property
+    def data(self):
+        return self._data
+
+
+class CachingRequest(transport.Request):
+    """google-auth transport that caches successful GET responses per Cache-Control."""
+
+    def __init__(self, session: requests.Session = None):
+        self._request = grequests.Request(session=session or http_session)
+        self._lock = threading.Lock()
+        # url -> (expires_at, response)
+        self._cache: Dict[str, Tuple[float, _CachedResponse]] = {}
+        # url -> monotonic time of the last forced refetch
+        self._refetched_at: Dict[str, float] = {}
+
+    def __call__(self, url, method="GET", body=None, headers=None, **kwargs):
+        if method != "GET" or body is not None:
+            return self._request(url, method=method, body=body, headers=headers, **kwargs)
+
+        cached = self.cached(url)
+        if cached is not None:
+            return cached
+        return self._fetch(url, headers=headers, **kwargs)
+
+    def cached(self, url: str) -> Optional[_CachedResponse]:
+        """The cached response for `url` if it is still fresh, else None."""
+        with self._lock:
+            cached = self._cache.get(url)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def _fetch(self, url, headers=None, **kwargs):
+        now = time.monotonic()
+        response = self._request(url, method="GET", headers=headers, **kwargs)
+        if response.status == 200:
+            lifetime = cache_lifetime(response.headers)
+            if lifetime:
+                snapshot = _CachedResponse(response.status, dict(response.headers), response.data)
+                with self._lock:
+                    self._cache[url] = (now + lifetime, snapshot)
+                return snapshot
+        return response
+
+    def refetch(self, url: str, min_interval: float = 0) -> bool:
+        """
+        Fetch `url` again even if the cached copy is fresh. A failed fetch
+        keeps the cached copy. Skipped (returns False) if the last refetch of
+        `url` was less than `min_interval` seconds ago.
+        """
+        now = time.monotonic()
+        with self._lock:
+            last = self._refetched_at.get(url)
+            if last is not None and now - last < min_interval:
+                return False
+            self._refetched_at[url] = now
+        try:
+            self._fetch(url)
+        except exceptions.TransportError:
+            logger.warning("Refetching %s failed; keeping the cached copy", url, exc_info=True)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._refetched_at.clear()
+
+
+# Shared by all sign-ins so certs are downloaded once per max-age window
+cert_request = CachingRequest()
+
+
+def _token_kid(id_token_str: str) -> Optional[str]:
+    """`kid` from the token's (unverified) header, if it can be read."""
+    try:
+        header = id_token_str.split(".", 1)[0]
+        return json.loads(base64.urlsafe_b64decode(header + "=" * (-len(header) % 4))).get("kid")
+    except (ValueError, AttributeError):
+        return None
+
+
+def _cached_key_ids() -> Optional[Set[str]]:
+    """Key ids of the cached signing certs; None if none are cached (the next verification fetches them)."""
+    response = cert_request.cached(GOOGLE_CERTS_URL)
+    if response is None:
+        return None
+    certs = json.loads(response.data)
+    if "keys" in certs:
+        return {key.get("kid") for key in certs["keys"]}
+    return set(certs)
+
+
+def verify_google_id_token(id_token_str: str, audience: Optional[str] = None) -> dict:
+    """
+    Verify a Google ID token against the cached signing certs, refetching
+    them first if the token was signed with a key they do not contain.
+
+    Raises:
+        ValueError: If the token is invalid, expired, for another audience
+            or from an unexpected issuer
+        google.auth.exceptions.TransportError: If the certs cannot be fetched
+    """
+    kid = _token_kid(id_token_str)
+    key_ids = _cached_key_ids()
+    if kid and key_ids is not None and kid not in key_ids:
+        cert_request.refetch(GOOGLE_CERTS_URL, min_interval=GOOGLE_CERTS_REFETCH_INTERVAL_SECONDS)
+    idinfo = google_id_token.verify_token(
+        id_token_str, cert_request, audience=audience, certs_url=GOOGLE_CERTS_URL
+    )
+    if idinfo.get("iss") not in GOOGLE_ISSUERS:
+        raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+    return idinfo
@@ -0,0 +1,201 @@
+"""
+Authenticated principal cache.
+
+`get_current_user`, `get_current_partner` and `get_current_agent` run on every
+authenticated request. Instead of loading the ORM row each time, they resolve
+the token to an immutable snapshot of the principal (identity, approval,
+active and hold state) cached for PRINCIPAL_CACHE_TTL_SECONDS. Hold state is
+taken from the in-memory hold cache (backend.services.partner.hold_cache).
+
+Entries are keyed by (subject type, id, token iat) and are dropped explicitly
+when the underlying state changes in this process: partner approval, rejection,
+clarification, hold placed/lifted, agent update/deactivation and user profile
+updates. Other workers see such changes after at most one TTL.
+
+Snapshots are read-only. Endpoints that need live values (e.g. credit balance)
+or need to modify the row must load it from their own session.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+
+
+def _hold_in_effect(has_hold: bool, lift_date: Optional[datetime]) -> bool:
+    if not has_hold:
+        return False
+    if lift_date is None:
+        return True
+    if lift_date.tzinfo is None:
+        lift_date = lift_date.replace(tzinfo=timezone.utc)
+    return lift_date > datetime.now(timezone.utc)
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    id: int
+    email: str
+    full_name: Optional[str]
+    phone: Optional[str]
+    address: Optional[str]
+    pincode: Optional[str]
+    is_active: bool
+
+
+@dataclass(frozen=True)
+class PartnerPrincipal:
+    id: int
+    email: str
+    full_name: str
+    company_name: Optional[str]
+    verification_status: str
+    is_active: bool
+    has_hold: bool = False
+    hold_reason: Optional[str] = None
+    hold_lift_date: Optional[datetime] = None
+
+    @property
+    def is_on_hold(self) -> bool:
+        """Hold state at the time of the call (timed holds expire on their own)."""
+        return _hold_in_effect(self.has_hold, self.hold_lift_date)
+
+
+@dataclass(frozen=True)
+class AgentPrincipal:
+    id: int
+    partner_id: int
+    email: str
+    full_name: str
+    is_active: bool
+    partner_has_hold: bool = False
+    partner_hold_reason: Optional[str] = None
+    partner_hold_lift_date: Optional[datetime] = None
+
+    @property
+    def partner_on_hold(self) -> bool:
+        """Whether the agent's partner is currently on hold."""
+        return _hold_in_effect(self.partner_has_hold, self.partner_hold_lift_date)
+
+
+# ------------------------------
+# Loaders
+# ------------------------------
+
+def load_user_principal(db: Session, user_id: int) -> Optional[UserPrincipal]:
+    from backend.services.auth.models import User
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        return None
+    return UserPrincipal(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        phone=user.phone,
+        address=user.address,
+        pincode=getattr(user, "pincode", None),
+        is_active=user.is_active,
+    )
+
+
+def load_partner_principal(db: Session, partner_id: int) -> Optional[PartnerPrincipal]:
+    from backend.services.partner.schema.models import Partner
+    from backend.services.partner.hold_cache import hold_cache
+
+    partner = db.query(Partner).filter(Partner.id == partner_id).first()
+    if not partner:
+        return None
+    hold = hold_cache.get(db, partner_id)
+    return PartnerPrincipal(
+        id=partner.id,
+        email=partner.email,
+        full_name=partner.full_name,
+        company_name=partner.company_name,
+        verification_status=partner.verification_status,
+        is_active=partner.is_active,
+        has_hold=hold is not None,
+        hold_reason=hold.reason if hold else None,
+        hold_lift_date=hold.lift_date if hold else None,
+    )
+
+
+def load_agent_principal(db: Session, agent_id: int) -> Optional[AgentPrincipal]:
+    from backend.services.partner.schema.models import Agent
+    from backend.services.partner.hold_cache import hold_cache
+
+    agent = db.query(Agent).filter(Agent.id == agent_id).first()
+    if not agent:
+        return None
+    hold = hold_cache.get(db, agent.partner_id)
+    return AgentPrincipal(
+        id=agent.id,
+        partner_id=agent.partner_id,
+        email=agent.email,
+        full_name=agent.full_name,
+        is_active=agent.is_active,
+        partner_has_hold=hold is not None,
+        partner_hold_reason=hold.reason if hold else None,
+        partner_hold_lift_date=hold.lift_date if hold else None,
+    )
+
+
+# ------------------------------
+# Cache
+# ------------------------------
+
+class PrincipalCache:
+    """Thread-safe TTL cache of principal snapshots."""
+
+    def __init__(self, ttl_seconds: float = PRINCIPAL_CACHE_TTL_SECONDS):
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # (subject type, id) -> {iat: (expires_at, snapshot)}
+        self._entries: Dict[Tuple[str, int], Dict[object, Tuple[float, object]]] = {}
+
+    def get_or_load(self, subject_type: str, subject_id: int, iat, loader: Callable[[], object]):
+        """Return the cached snapshot, loading it on a miss. None results are not cached."""
+        key = (subject_type, subject_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, {}).get(iat)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        snapshot = loader()
+        if snapshot is not None and self._ttl_seconds > 0:
+            with self._lock:
+                by_iat = self._entries.setdefault(key, {})
+                # Drop expired tokens' entries for this subject
+                for stale in [k for k, (exp, _) in by_iat.items() if exp <= now]:
+                    del by_iat[stale]
+                by_iat[iat] = (now + self._ttl_seconds, snapshot)
+        return snapshot
+
+    def invalidate(self, subject_type: str, subject_id: int) -> None:
+        """Drop all cached snapshots of one principal."""
+        with self._lock:
+            self._entries.pop((subject_type, subject_id), None)
+
+    def invalidate_partner(self, partner_id: int) -> None:
+        """Drop a partner and all of its agents (agents carry the partner's hold state)."""
+        with self._lock:
+            self._entries.pop(("partner", partner_id), None)
+            for key in [
+                k for k, by_iat in self._entries.items()
+                if k[0] == "agent" and any(s.partner_id == partner_id for _, s in by_iat.values())
+            ]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide cache used by the auth dependencies
+principal_cache = PrincipalCache()
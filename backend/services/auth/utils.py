@@ -1,12 +1,13 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-import bcrypt
+from backend.shared.auth import hashing
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import case, exists, select
 from sqlalchemy.orm import Session
 from backend.shared.db.connections import get_db
-from backend.services.auth import models, schemas
-import requests
+from backend.shared.cache import TTLCache
+from backend.services.auth import models, schemas, principals
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -17,15 +18,14 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Hashing lives in backend.shared.auth.hashing (bounded executor, configurable cost).
+# These synchronous wrappers are kept for scripts and non-hot paths;
+# request handlers should await hashing.verify_password_async instead.
 def get_password_hash(password: str) -> str:
-    # bcrypt returns bytes; decode to store as string
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return hashing.hash_password(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    try:
-        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
-    except ValueError:
-        return False
+    return hashing.verify_password(plain_password, hashed_password)
 
 def create_access_token(*, data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -45,11 +45,15 @@ def decode_access_token(token: str):
     except JWTError:
         return None
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.User:
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> principals.UserPrincipal:
+    """Resolve the token to a cached, read-only snapshot of the user."""
     payload = decode_access_token(token)
     if not payload or "user_id" not in payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
-    user = db.query(models.User).filter(models.User.id == int(payload["user_id"])).first()
+    user_id = int(payload["user_id"])
+    user = principals.principal_cache.get_or_load(
+        "user", user_id, payload.get("iat"), lambda: principals.load_user_principal(db, user_id)
+    )
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
@@ -58,9 +62,8 @@ def get_current_partner(token: str = Depends(oauth2_scheme), db: Session = Depen
     """
     Dependency to get the currently authenticated partner from JWT token.
     Expects token payload to have 'partner_id' field.
+    Returns a cached, read-only PartnerPrincipal snapshot (see principals.py).
     """
-    from backend.services.partner.schema.models import Partner
-    
     payload = decode_access_token(token)
     if not payload or "partner_id" not in payload:
         raise HTTPException(
@@ -68,7 +71,10 @@ def get_current_partner(token: str = Depends(oauth2_scheme), db: Session = Depen
             detail="Invalid partner authentication credentials"
         )
     
-    partner = db.query(Partner).filter(Partner.id == int(payload["partner_id"])).first()
+    partner_id = int(payload["partner_id"])
+    partner = principals.principal_cache.get_or_load(
+        "partner", partner_id, payload.get("iat"), lambda: principals.load_partner_principal(db, partner_id)
+    )
     if not partner:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -88,9 +94,8 @@ def get_current_agent(token: str = Depends(oauth2_scheme), db: Session = Depends
     """
     Dependency to get the currently authenticated agent from JWT token.
     Expects token payload to have 'agent_id' field.
+    Returns a cached, read-only AgentPrincipal snapshot (see principals.py).
     """
-    from backend.services.partner.schema.models import Agent
-    
     payload = decode_access_token(token)
     if not payload or "agent_id" not in payload:
         raise HTTPException(
@@ -98,7 +103,10 @@ def get_current_agent(token: str = Depends(oauth2_scheme), db: Session = Depends
             detail="Invalid agent authentication credentials"
         )
     
-    agent = db.query(Agent).filter(Agent.id == int(payload["agent_id"])).first()
+    agent_id = int(payload["agent_id"])
+    agent = principals.principal_cache.get_or_load(
+        "agent", agent_id, payload.get("iat"), lambda: principals.load_agent_principal(db, agent_id)
+    )
     if not agent:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -116,8 +124,7 @@ def get_current_agent(token: str = Depends(oauth2_scheme), db: Session = Depends
 
 import os
 import secrets
-from google.oauth2 import id_token as google_id_token
-from google.auth.transport import requests as grequests
+from backend.services.auth import google_certs
 
 def create_or_get_user_from_google(id_token_str: str, db: Session, pincode: str | None = None):
     """
@@ -127,7 +134,8 @@ def create_or_get_user_from_google(id_token_str: str, db: Session, pincode: str
         # Optional audience check using GOOGLE_CLIENT_ID env var
         audience = os.getenv("GOOGLE_CLIENT_ID", None)
 
-        idinfo = google_id_token.verify_oauth2_token(id_token_str, grequests.Request(), audience)
+        # Signing certs are cached per their Cache-Control max-age
+        idinfo = google_certs.verify_google_id_token(id_token_str, audience)
     except ValueError as e:
         msg = f"Invalid Google token: {str(e)}"
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=msg)
@@ -156,6 +164,7 @@ def create_or_get_user_from_google(id_token_str: str, db: Session, pincode: str
             db.add(user)
             db.commit()
             db.refresh(user)
+            principals.principal_cache.invalidate("user", user.id)
         return user, False
 
     # Create user if not exists
@@ -208,7 +217,7 @@ def exchange_auth_code_for_id_token(auth_code: str, code_verifier: str | None =
     if code_verifier:
         data["code_verifier"] = code_verifier
 
-    resp = requests.post(token_url, data=data, timeout=10)
+    resp = google_certs.http_session.post(token_url, data=data, timeout=10)
     if resp.status_code != 200:
         raise HTTPException(
             status_code=400,
@@ -222,6 +231,42 @@ def exchange_auth_code_for_id_token(auth_code: str, code_verifier: str | None =
     return id_token
 
 
+# email -> role ('admin' | 'agent' | 'partner' | 'customer').
+# Invalidated when an admin, partner or agent is created; the TTL covers
+# deletions and changes made by other workers.
+role_cache = TTLCache(ttl_seconds=int(os.getenv("ROLE_CACHE_TTL_SECONDS", "300")), max_entries=10000)
+
+
+def resolve_role(db: Session, email: str | None) -> str:
+    """
+    Role label for an email: admin, then agent, then partner, else customer.
+    Resolved with a single EXISTS query on the caller's session and cached.
+    """
+    from backend.services.admin.schema.models import Admin
+    from backend.services.partner.schema.models import Agent, Partner
+
+    if not email:
+        return "customer"
+    role = role_cache.get(email)
+    if role is None:
+        role = db.execute(
+            select(case(
+                (exists().where(Admin.email == email), "admin"),
+                (exists().where(Agent.email == email), "agent"),
+                (exists().where(Partner.email == email), "partner"),
+                else_="customer",
+            ))
+        ).scalar()
+        role_cache.set(email, role)
+    return role
+
+
+def invalidate_role(email: str | None) -> None:
+    """Call after creating an admin, partner or agent account for `email`."""
+    if email:
+        role_cache.invalidate(email)
+
+
 def check_pincode_serviceability(pincode: str, db: Session) -> dict:
     """
     Check if a pincode is serviced by any partner.
@@ -238,7 +283,7 @@ def check_pincode_serviceability(pincode: str, db: Session) -> dict:
             "message": str (optional warning)
         }
     """
-    from backend.services.partner.schema.models import PartnerServiceablePincode
+    from backend.services.partner.pincode_index import pincode_index
     
     if not pincode or len(pincode.strip()) != 6:
         return {
@@ -250,10 +295,7 @@ def check_pincode_serviceability(pincode: str, db: Session) -> dict:
     pincode = pincode.strip()
     
     # Count active partners servicing this pincode
-    partner_count = db.query(PartnerServiceablePincode).filter(
-        PartnerServiceablePincode.pincode == pincode,
-        PartnerServiceablePincode.is_active == True
-    ).count()
+    partner_count = pincode_index.partner_count(db, pincode)
     
     if partner_count > 0:
         return {
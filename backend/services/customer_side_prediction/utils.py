@@ -1,7 +1,4 @@
 import os
-from langchain_mistralai import ChatMistralAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
@@ -17,13 +14,17 @@ def get_phone_price_from_db(
     Brand and model are compulsory, RAM and storage are optional.
     Returns the best matching phone price.
     """
-    from backend.services.sell_phone.schema.models import PhoneList
+    from backend.services.sell_phone.schema.models import PhoneList, normalize_key
+    
+    # Match on the indexed lowercase keys (case-insensitive, like ilike)
+    brand_key = normalize_key(brand)
+    model_key = normalize_key(model)
     
     # Build query with brand and model (compulsory)
     query = db.query(PhoneList).filter(
         and_(
-            PhoneList.Brand.ilike(brand),
-            PhoneList.Model.ilike(model)
+            PhoneList.brand_key == brand_key,
+            PhoneList.model_key == model_key
         )
     )
     
@@ -42,8 +43,8 @@ def get_phone_price_from_db(
     if not phone and storage_gb is not None:
         query = db.query(PhoneList).filter(
             and_(
-                PhoneList.Brand.ilike(brand),
-                PhoneList.Model.ilike(model)
+                PhoneList.brand_key == brand_key,
+                PhoneList.model_key == model_key
             )
         )
         if ram_gb is not None:
@@ -54,8 +55,8 @@ def get_phone_price_from_db(
     if not phone and ram_gb is not None:
         query = db.query(PhoneList).filter(
             and_(
-                PhoneList.Brand.ilike(brand),
-                PhoneList.Model.ilike(model)
+                PhoneList.brand_key == brand_key,
+                PhoneList.model_key == model_key
             )
         )
         if storage_gb is not None:
@@ -66,8 +67,8 @@ def get_phone_price_from_db(
     if not phone:
         phone = db.query(PhoneList).filter(
             and_(
-                PhoneList.Brand.ilike(brand),
-                PhoneList.Model.ilike(model)
+                PhoneList.brand_key == brand_key,
+                PhoneList.model_key == model_key
             )
         ).first()
     
@@ -77,6 +78,11 @@ def get_phone_price_from_db(
     return float(phone.Selling_Price)
 
 def get_mistral_chain():
+    # langchain is heavy to import; load it on first use rather than at app startup
+    from langchain_mistralai import ChatMistralAI
+    from langchain_core.prompts import PromptTemplate
+    from langchain_core.output_parsers import JsonOutputParser
+    
     # Initialize MistralAI model via LangChain
     llm = ChatMistralAI(
         model="mistral-small-latest",  # Use appropriate Mistral model
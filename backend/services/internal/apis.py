@@ -0,0 +1,84 @@
+"""
+Operational endpoints for monitoring (not part of the public API).
+
+Requests must send INTERNAL_API_TOKEN in the X-Internal-Token header. With
+no token configured the endpoints answer 404, unless
+INTERNAL_API_ALLOW_UNAUTHENTICATED=true (local development only).
+"""
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from backend.shared import metrics
+from backend.shared.db import pool
+from backend.shared.db.connections import engine
+from backend.shared.startup import startup_timer
+
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+INTERNAL_API_ALLOW_UNAUTHENTICATED = os.getenv("INTERNAL_API_ALLOW_UNAUTHENTICATED", "false").lower() == "true"
+
+
+def require_internal_token(x_internal_token: Optional[str] = Header(None)):
+    if not INTERNAL_API_TOKEN:
+        # Fail closed: unconfigured deployments do not expose these endpoints
+        if INTERNAL_API_ALLOW_UNAUTHENTICATED:
+            return
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(x_internal_token or "", INTERNAL_API_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid internal token")
+
+
+router = APIRouter(prefix="/internal", tags=["Internal"], dependencies=[Depends(require_internal_token)])
+
+# Prometheus scrapes /metrics at the root
+metrics_router = APIRouter(tags=["Internal"], dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/db-pool")
+def get_db_pool_status():
+    """
+    Connection pool occupancy (size, checked in/out, overflow) and checkout
+    telemetry (count, timeouts, wait-time percentiles over recent checkouts).
+    """
+    return pool.pool_status(engine)
+
+
+@router.post("/db-pool/reset-stats", status_code=204)
+def reset_db_pool_stats():
+    """Zero the checkout counters, e.g. before a load test."""
+    stats = getattr(engine.pool, "stats", None)
+    if stats is not None:
+        stats.reset()
+    return None
+
+
+@router.get("/startup")
+def get_startup_timings():
+    """Per-phase timing of this worker's startup (imports, schema, routers, jobs)."""
+    return startup_timer.report()
+
+
+def _pool_metric_lines() -> list:
+    status = pool.pool_status(engine)
+    lines = []
+    for key, help_text, metric_type in (
+        ("checked_out", "Connections currently checked out", "gauge"),
+        ("overflow", "Overflow connections currently open", "gauge"),
+        ("timeouts", "Checkouts that timed out waiting for a connection", "counter"),
+    ):
+        if key in status:
+            name = f"db_pool_{key}" + ("_total" if metric_type == "counter" else "")
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}", f"{name} {status[key]}"]
+    return lines
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus exposition: per-route latency, DB queries/time, response size, pool state."""
+    return PlainTextResponse(
+        metrics.registry.render(_pool_metric_lines()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,8 +1,14 @@
 import os
-from ultralytics import YOLO
+from functools import lru_cache
 
-# Load the YOLO model (using a pre-trained model; adjust path if needed)
-model = YOLO('../best.pt')  # You can change to a custom model path
+
+@lru_cache(maxsize=1)
+def get_model():
+    """Load the YOLO model on first use (ultralytics and the weights are slow to load)."""
+    from ultralytics import YOLO
+
+    # Using a pre-trained model; adjust path if needed
+    return YOLO('../best.pt')  # You can change to a custom model path
 
 def detect_and_save(image_path, output_filename='result.jpg'):
     """
@@ -19,7 +25,7 @@ def detect_and_save(image_path, output_filename='result.jpg'):
     os.makedirs(data_folder, exist_ok=True)
     
     # Perform prediction
-    results = model.predict(source=image_path, save=False)  # Predict without auto-saving
+    results = get_model().predict(source=image_path, save=False)  # Predict without auto-saving
     
     # Save the annotated image to the data folder
     output_path = os.path.join(data_folder, output_filename)
@@ -0,0 +1,172 @@
+"""
+Delta sync for the agent app.
+
+Instead of reloading the order list and each order's detail, the app keeps a
+local copy and asks `GET /agent/sync?since=<watermark>` for what changed:
+
+- orders assigned to the agent with `updated_at` after the watermark,
+- status history entries of those orders created after the watermark (all
+  entries for orders newly assigned to the agent),
+- ids of orders that left the agent's list (tombstones).
+
+Tombstones are written by a `before_flush` session hook whenever an order's
+`agent_id` changes away from an agent (reassignment, cancelled pickup) or an
+assigned order is deleted, so every write path is covered without callers
+having to remember it. They are kept for AGENT_SYNC_TOMBSTONE_RETENTION_DAYS;
+a client whose watermark is older than that (or that sends none) gets a full
+snapshot and must replace its local copy.
+
+Each response carries the next watermark, taken before the queries run and
+moved back by AGENT_ORDERS_SYNC_OVERLAP_SECONDS so rows committed by
+transactions still in flight are not missed. Clients may therefore see a
+row twice and must apply changes idempotently (upsert by id).
+
+Settings (environment):
+    AGENT_SYNC_TOMBSTONE_RETENTION_DAYS   default 30
+"""
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, event, inspect, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.services.partner import utils as partner_utils
+from backend.services.partner.schema.models import AgentOrderTombstone
+from backend.services.sell_phone.schema.models import Order, OrderStatusHistory
+
+logger = logging.getLogger(__name__)
+
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("AGENT_SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+
+SYNC_HISTORY_COLUMNS = (
+    OrderStatusHistory.id, OrderStatusHistory.order_id, OrderStatusHistory.from_status,
+    OrderStatusHistory.to_status, OrderStatusHistory.changed_by_user_type, OrderStatusHistory.notes,
+    OrderStatusHistory.created_at,
+)
+
+
+# ------------------------------
+# Tombstones
+# ------------------------------
+
+def _stored_agent_id(session: Session, order: Order) -> Optional[int]:
+    """agent_id of an order as currently stored in the database."""
+    history = inspect(order).attrs.agent_id.history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    # Overwritten without being loaded first
+    return session.connection().execute(
+        select(Order.agent_id).where(Order.id == order.id)
+    ).scalar()
+
+
+@event.listens_for(Session, "before_flush")
+def _record_tombstones(session: Session, flush_context, instances) -> None:
+    for obj in session.dirty:
+        if not isinstance(obj, Order) or not inspect(obj).attrs.agent_id.history.has_changes():
+            continue
+        old_agent_id = _stored_agent_id(session, obj)
+        if old_agent_id is not None and old_agent_id != obj.agent_id:
+            session.add(AgentOrderTombstone(
+                agent_id=old_agent_id,
+                order_id=obj.id,
+                reason="unassigned" if obj.agent_id is None else "reassigned",
+            ))
+
+    for obj in session.deleted:
+        if isinstance(obj, Order):
+            old_agent_id = _stored_agent_id(session, obj)
+            if old_agent_id is not None:
+                session.add(AgentOrderTombstone(agent_id=old_agent_id, order_id=obj.id, reason="deleted"))
+
+
+def prune_tombstones(db: Session) -> int:
+    """Delete tombstones past the retention window. Returns the number removed."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+    removed = db.execute(
+        delete(AgentOrderTombstone).where(AgentOrderTombstone.created_at < cutoff)
+    ).rowcount
+    db.commit()
+    return removed
+
+
+def prune_job() -> None:
+    """Background job entry point: prune using a dedicated session."""
+    from backend.shared.db.connections import SessionLocal
+
+    db = SessionLocal()
+    try:
+        removed = prune_tombstones(db)
+        if removed:
+            logger.info("Pruned %d agent order tombstones", removed)
+    except Exception:
+        db.rollback()
+        logger.exception("Agent order tombstone pruning failed")
+    finally:
+        db.close()
+
+
+# ------------------------------
+# Sync
+# ------------------------------
+
+def needs_full_sync(since: Optional[datetime]) -> bool:
+    """True if there is no watermark or tombstones since it may have been pruned."""
+    if since is None:
+        return True
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return since < datetime.now(timezone.utc) - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+
+
+async def get_changes(db: AsyncSession, agent_id: int, since: Optional[datetime]) -> dict:
+    """
+    Changes to an agent's orders since a watermark, in the shape of AgentSyncOut.
+    With no usable watermark every current order and its history is returned
+    and `full_sync` is set.
+    """
+    watermark = datetime.now(timezone.utc) - timedelta(seconds=partner_utils.AGENT_ORDERS_SYNC_OVERLAP_SECONDS)
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc)
+    full_sync = needs_full_sync(since)
+    if full_sync:
+        since = None
+
+    orders_stmt = partner_utils.agent_orders_select(agent_id, updated_since=since).order_by(
+        Order.updated_at, Order.id
+    )
+    history_stmt = select(*SYNC_HISTORY_COLUMNS).join(Order, Order.id == OrderStatusHistory.order_id).where(
+        Order.agent_id == agent_id
+    )
+    if since is not None:
+        # Orders newly assigned to the agent come with their earlier history too
+        history_stmt = history_stmt.where(or_(OrderStatusHistory.created_at > since, Order.assigned_at > since))
+    history_stmt = history_stmt.order_by(OrderStatusHistory.created_at, OrderStatusHistory.id)
+
+    orders = (await db.execute(orders_stmt)).all()
+    history = (await db.execute(history_stmt)).mappings().all()
+
+    removed_order_ids = []
+    if since is not None:
+        order_ids = {row.id for row in orders}
+        tombstoned = (await db.execute(
+            select(AgentOrderTombstone.order_id).where(
+                AgentOrderTombstone.agent_id == agent_id,
+                AgentOrderTombstone.created_at > since,
+            ).distinct()
+        )).scalars().all()
+        # An order given back to the agent since then is in `orders` instead
+        removed_order_ids = sorted(set(tombstoned) - order_ids)
+
+    return {
+        "watermark": watermark,
+        "full_sync": full_sync,
+        "orders": [partner_utils.format_agent_order(row) for row in orders],
+        "status_history": [dict(row) for row in history],
+        "removed_order_ids": removed_order_ids,
+    }
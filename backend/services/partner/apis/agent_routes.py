@@ -1,24 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from backend.shared.db.connections import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.shared.db.connections import get_db, get_async_db
 from backend.services.partner.schema import schemas as partner_schemas
 from backend.services.partner.schema.models import Agent
 from backend.services.partner import utils as partner_utils
+from backend.services.partner import agent_sync
+from backend.services.partner import pickup_planner
 from backend.services.auth import utils as auth_utils
+from backend.shared.auth import hashing
+from backend.shared import responses
+from backend.shared.db.pagination import apply_keyset, encode_cursor
 from backend.services.sell_phone.schema.models import Order
 from backend.services.sell_phone.utils import create_status_history
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 router = APIRouter(prefix="/agent", tags=["Agent"])
 
 
+def _parse_pickup_date(value: str) -> datetime:
+    """
+    Parse a YYYY-MM-DD pickup date from a request payload.
+    The result is naive midnight, which the database reads in its session
+    timezone exactly as it did the raw string. Invalid dates are a 400
+    rather than a database error.
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pickup date format. Use YYYY-MM-DD")
+
+
 # ================================
 # AGENT AUTHENTICATION
 # ================================
 
 @router.post("/login", response_model=partner_schemas.AgentToken)
-def agent_login(
+async def agent_login(
     payload: partner_schemas.AgentLogin,
     db: Session = Depends(get_db),
 ):
@@ -26,12 +46,16 @@ def agent_login(
     Agent login endpoint.
     """
     try:
-        agent = partner_utils.authenticate_agent(db, payload.email, payload.password)
+        agent = await partner_utils.authenticate_agent(db, payload.email, payload.password)
         token = partner_utils.create_agent_token(agent)
+        await hashing.rehash_if_needed(db, agent, payload.password)
         
-        return partner_schemas.AgentToken(
-            access_token=token,
-            agent=partner_schemas.AgentOut.from_orm(agent)
+        # Reading the ORM instance may load expired columns; keep it off the event loop
+        return await run_in_threadpool(
+            lambda: partner_schemas.AgentToken(
+                access_token=token,
+                agent=partner_schemas.AgentOut.from_orm(agent)
+            )
         )
     except ValueError as e:
         raise HTTPException(
@@ -49,14 +73,13 @@ def get_current_agent_profile(
     Get current agent's profile with partner hold status.
     """
     # Check if agent's partner is on hold
-    hold = partner_utils.get_partner_hold_details(db, current_agent.partner_id)
-    is_on_hold = hold is not None
+    is_on_hold = current_agent.partner_on_hold
     
     return partner_schemas.AgentNameOut(
         full_name=current_agent.full_name,
         is_on_hold=is_on_hold,
-        hold_reason=hold.reason if hold else None,
-        hold_lift_date=hold.lift_date if hold else None
+        hold_reason=current_agent.partner_hold_reason if is_on_hold else None,
+        hold_lift_date=current_agent.partner_hold_lift_date if is_on_hold else None
     )
 
 
@@ -64,48 +87,69 @@ def get_current_agent_profile(
 # AGENT ORDER MANAGEMENT
 # ================================
 
-@router.get("/orders", response_model=List[dict])
-def get_agent_orders(
+@router.get("/orders", response_model=List[partner_schemas.AgentOrderListItem])
+async def get_agent_orders(
+    response: Response,
     status_filter: str = Query(None, description="Filter by order status"),
-    db: Session = Depends(get_db),
+    updated_since: Optional[datetime] = Query(
+        None, description="Only orders changed after this time; pass the previous X-Sync-Timestamp"
+    ),
+    limit: int = Query(partner_utils.AGENT_ORDERS_PAGE_SIZE, ge=1, le=200, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    db: AsyncSession = Depends(get_async_db),
     current_agent: Agent = Depends(auth_utils.get_current_agent),
 ):
     """
-    Get all orders assigned to the current agent.
+    Get orders assigned to the current agent, most recently assigned first.
+
+    Pages are keyset-paginated: the `X-Next-Cursor` response header holds
+    the cursor for the next page (absent on the last page).
+    For incremental sync, send the `X-Sync-Timestamp` of the previous
+    response as `updated_since`. Orders taken off the agent are not listed.
     """
-    orders = partner_utils.get_agent_orders(
-        db=db,
-        agent_id=current_agent.id,
-        status_filter=status_filter
+    # Taken before the query and moved back by a small overlap, so rows
+    # committed by transactions still in flight are picked up next time
+    sync_timestamp = datetime.now(timezone.utc) - timedelta(seconds=partner_utils.AGENT_ORDERS_SYNC_OVERLAP_SECONDS)
+    if updated_since is not None and updated_since.tzinfo is not None:
+        updated_since = updated_since.astimezone(timezone.utc)
+
+    stmt = partner_utils.agent_orders_select(current_agent.id, status_filter, updated_since)
+    try:
+        stmt = apply_keyset(stmt, partner_utils.AGENT_ORDER_SORT_KEY, Order.id, descending=True, cursor=cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].sort_key, rows[-1].id)
+    response.headers["X-Sync-Timestamp"] = sync_timestamp.isoformat()
+
+    return responses.list_response(
+        [partner_utils.format_agent_order(row) for row in rows],
+        partner_schemas.AgentOrderListItem,
+        response=response,
     )
-    
-    result = []
-    for order in orders:
-        result.append({
-            "id": order.id,
-            "phone_name": order.phone_name,
-            "brand": order.brand,
-            "model": order.model,
-            "specs": f"{int(order.ram_gb)}GB RAM • {int(order.storage_gb)}GB Storage",
-            "status": "pickup completed" if order.status == "pickup_completed" else order.status,
-            "estimated_value": order.ai_estimated_price,
-            "customer_name": order.customer_name,
-            "customer_phone": order.customer_phone,
-            "pickup_address_line": order.pickup_address_line,
-            "pickup_city": order.pickup_city,
-            "pickup_state": order.pickup_state,
-            "pickup_pincode": order.pickup_pincode,
-            "pickup_date": order.pickup_date.strftime('%d/%m/%Y') if order.pickup_date else None,
-            "pickup_time": order.pickup_time,
-            "payment_method": order.payment_method,
-            "ram_gb": order.ram_gb,
-            "storage_gb": order.storage_gb,
-            "ai_estimated_price": order.ai_estimated_price,
-            "final_quoted_price": order.final_quoted_price,
-            "status_detail": "pickup completed" if order.status == "pickup_completed" else order.status,
-        })
-    
-    return result
+
+
+@router.get("/sync", response_model=partner_schemas.AgentSyncOut)
+async def sync_agent_orders(
+    since: Optional[datetime] = Query(
+        None, description="`watermark` of the previous sync; omit for a full snapshot"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_agent: Agent = Depends(auth_utils.get_current_agent),
+):
+    """
+    Orders, status history entries and removed order ids changed since
+    `since`, for the app to merge into its local copy. When `full_sync` is
+    true the local copy must be replaced instead.
+    """
+    changes = await agent_sync.get_changes(db, current_agent.id, since)
+    return responses.model_response(changes, partner_schemas.AgentSyncOut)
 
 
 @router.get("/orders/{order_id}", response_model=dict)
@@ -176,6 +220,52 @@ def get_agent_order_detail(
     }
 
 
+@router.get("/schedule/suggested", response_model=partner_schemas.SuggestedScheduleOut)
+def get_suggested_schedule(
+    date: Optional[str] = Query(None, description="Day to plan (YYYY-MM-DD, default today)"),
+    start_time: Optional[str] = Query(None, description="Start of the working day (HH:MM)"),
+    end_time: Optional[str] = Query(None, description="End of the working day (HH:MM)"),
+    start_pincode: Optional[str] = Query(None, description="Pincode the agent starts from"),
+    start_latitude: Optional[float] = Query(None, ge=-90, le=90),
+    start_longitude: Optional[float] = Query(None, ge=-180, le=180),
+    db: Session = Depends(get_db),
+    current_agent: Agent = Depends(auth_utils.get_current_agent),
+):
+    """
+    Suggest a visiting order and pickup time windows for the agent's orders
+    that still need scheduling, minimising travel between pincodes.
+    Nothing is saved: schedule each stop with schedule-pickup, using its
+    `window_start` as the time.
+    """
+    day = _parse_pickup_date(date).date() if date else datetime.now().date()
+    try:
+        start_clock = pickup_planner.parse_clock(start_time) if start_time else None
+        end_clock = pickup_planner.parse_clock(end_time) if end_time else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid time format. Use HH:MM")
+    if start_clock and end_clock and start_clock >= end_clock:
+        raise HTTPException(status_code=400, detail="start_time must be before end_time")
+    
+    start = None
+    if (start_latitude is None) != (start_longitude is None):
+        raise HTTPException(status_code=400, detail="Provide both start_latitude and start_longitude")
+    if start_latitude is not None:
+        start = (start_latitude, start_longitude)
+    elif start_pincode:
+        start = pickup_planner.load_centroids(db, [start_pincode]).get(pickup_planner.normalize_pincode(start_pincode))
+        if start is None:
+            raise HTTPException(status_code=400, detail="Unknown start pincode")
+    
+    return pickup_planner.suggest_schedule(
+        db=db,
+        agent_id=current_agent.id,
+        day=day,
+        start_time=start_clock,
+        end_time=end_clock,
+        start=start
+    )
+
+
 @router.post("/orders/{order_id}/schedule-pickup", status_code=200)
 def schedule_pickup(
     order_id: int,
@@ -189,13 +279,14 @@ def schedule_pickup(
     No accept/reject allowed - agent directly schedules pickup.
     """
     # Check if agent's partner is on hold
-    if partner_utils.check_partner_on_hold(db, current_agent.partner_id):
+    if current_agent.partner_on_hold:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Your partner account is on hold. You cannot schedule pickups at this time. Contact your partner administrator."
         )
     
     order = partner_utils.validate_agent_order_access(db, current_agent.id, order_id)
+    pickup_date = _parse_pickup_date(payload.scheduled_date)
     
     # Validate order status - agent can schedule from assigned_to_agent status
     if order.status not in ["assigned_to_agent", "accepted_by_agent"]:
@@ -207,7 +298,7 @@ def schedule_pickup(
     # Update order status to accepted (auto-accept) and schedule pickup
     old_status = order.status
     order.status = "pickup_scheduled"
-    order.pickup_date = payload.scheduled_date
+    order.pickup_date = pickup_date
     order.pickup_time = payload.scheduled_time
     
     # Set accepted_at if not already set
@@ -251,7 +342,7 @@ def complete_pickup(
     Records actual condition, final price, and customer acceptance.
     """
     # Check if agent's partner is on hold
-    if partner_utils.check_partner_on_hold(db, current_agent.partner_id):
+    if current_agent.partner_on_hold:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Your partner account is on hold. You cannot complete pickups at this time. Contact your partner administrator."
@@ -328,7 +419,7 @@ def process_payment(
     Only available if customer accepted the offer.
     """
     # Check if agent's partner is on hold
-    if partner_utils.check_partner_on_hold(db, current_agent.partner_id):
+    if current_agent.partner_on_hold:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Your partner account is on hold. You cannot process payments at this time. Contact your partner administrator."
@@ -396,7 +487,7 @@ def reschedule_pickup(
     Reschedule a pickup that was previously scheduled.
     """
     # Check if agent's partner is on hold
-    if partner_utils.check_partner_on_hold(db, current_agent.partner_id):
+    if current_agent.partner_on_hold:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Your partner account is on hold. You cannot reschedule pickups at this time. Contact your partner administrator."
@@ -412,11 +503,12 @@ def reschedule_pickup(
             detail=f"Can only reschedule accepted or scheduled pickups (current status: {order.status})"
         )
     
+    new_date = _parse_pickup_date(payload.new_date)
     old_date = order.pickup_date.strftime('%d/%m/%Y') if order.pickup_date else 'Not set'
     old_time = order.pickup_time or 'Not set'
     
     # Update order with new pickup schedule
-    order.pickup_date = payload.new_date
+    order.pickup_date = new_date
     order.pickup_time = payload.new_time
     if order.status == "accepted_by_agent":
         order.status = "pickup_scheduled"
@@ -457,7 +549,7 @@ def cancel_pickup(
     Cancel a pickup. Returns order to partner for reassignment.
     """
     # Check if agent's partner is on hold
-    if partner_utils.check_partner_on_hold(db, current_agent.partner_id):
+    if current_agent.partner_on_hold:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Your partner account is on hold. You cannot cancel pickups at this time. Contact your partner administrator."
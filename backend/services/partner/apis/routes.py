@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import func
 from backend.shared.db.connections import get_db
 from backend.services.partner.schema import schemas as partner_schemas
 from backend.services.partner.schema.models import Agent, Partner
 from backend.services.partner import utils as partner_utils
+from backend.services.partner.pincode_index import pincode_index
+from backend.services.auth.principals import principal_cache
 from backend.services.auth import utils as auth_utils
+from backend.shared.auth import hashing
+from backend.shared import responses
 from backend.services.sell_phone.schema.models import Order
 from backend.services.sell_phone.utils import create_status_history
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 from datetime import datetime, timezone
-from backend.services.admin.schema.models import CreditPlan, PartnerCreditTransaction
+from backend.services.admin.schema.models import CreditPlan
+from backend.services.admin import ledger
 from backend.services.admin import schema as admin_schemas
 
 router = APIRouter(prefix="/partner", tags=["Partner"])
@@ -42,15 +48,17 @@ def partner_get_credit_plans(db: Session = Depends(get_db)):
 @router.post("/purchase-credits", response_model=dict)
 def partner_purchase_credits(
     payload: dict,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
     current_partner: Partner = Depends(auth_utils.get_current_partner),
 ):
     """Allow partner to purchase a credit plan (simulated/offline).
 
     Body: { "plan_id": int, "payment_method": str, "payment_transaction_id": Optional[str] }
+    Retries with the same payment_transaction_id or Idempotency-Key header are not credited twice.
     """
     # Check if partner is on hold
-    if partner_utils.check_partner_on_hold(db, current_partner.id):
+    if current_partner.is_on_hold:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Your account is on hold. You cannot purchase credits at this time. Contact support for details."
@@ -67,29 +75,30 @@ def partner_purchase_credits(
     if not plan:
         raise HTTPException(status_code=404, detail="Credit plan not found")
 
-    balance_before = current_partner.credit_balance
     bonus = (plan.credit_amount * (plan.bonus_percentage or 0.0)) / 100.0
     credit_added = plan.credit_amount + bonus
-    current_partner.credit_balance = (current_partner.credit_balance or 0.0) + credit_added
-    balance_after = current_partner.credit_balance
 
-    transaction = PartnerCreditTransaction(
-        partner_id=current_partner.id,
-        transaction_type="credit_purchase",
-        amount=credit_added,
-        balance_before=balance_before,
-        balance_after=balance_after,
+    # A retried purchase with the same payment reference (or Idempotency-Key
+    # header) returns the original transaction instead of crediting twice.
+    key = idempotency_key or payment_transaction_id
+    transaction, _ = ledger.record_transaction(
+        db,
+        current_partner.id,
+        credit_added,
+        "credit_purchase",
+        idempotency_key=f"credit_purchase:{current_partner.id}:{key}" if key else None,
         reference_id=plan.id,
         reference_type="credit_plan",
         payment_method=payment_method,
         payment_transaction_id=payment_transaction_id,
         notes=f"Purchased plan {plan.plan_name}",
     )
-
-    db.add(current_partner)
-    db.add(transaction)
     db.commit()
 
+    credit_added = transaction.amount
+    balance_before = transaction.balance_before
+    balance_after = transaction.balance_after
+
     return {
         "message": "Credits purchased successfully",
         "credit_added": credit_added,
@@ -128,6 +137,8 @@ def partner_signup(
         )
         db.commit()
         db.refresh(partner)
+        pincode_index.refresh_partner(db, partner.id)
+        auth_utils.invalidate_role(partner.email)
         
         # Generate token
         access_token = partner_utils.create_partner_token(partner)
@@ -142,7 +153,7 @@ def partner_signup(
 
 
 @router.post("/login", response_model=partner_schemas.PartnerToken)
-def partner_login(
+async def partner_login(
     payload: partner_schemas.PartnerLogin,
     db: Session = Depends(get_db),
 ):
@@ -151,7 +162,7 @@ def partner_login(
     Returns JWT token for authentication.
     """
     try:
-        partner = partner_utils.authenticate_partner(
+        partner = await partner_utils.authenticate_partner(
             db=db,
             email=payload.email,
             password=payload.password
@@ -159,11 +170,15 @@ def partner_login(
         
         # Generate token
         access_token = partner_utils.create_partner_token(partner)
+        await hashing.rehash_if_needed(db, partner, payload.password)
         
-        return partner_schemas.PartnerToken(
-            access_token=access_token,
-            token_type="bearer",
-            partner=partner
+        # Reading the ORM instance may load expired columns; keep it off the event loop
+        return await run_in_threadpool(
+            lambda: partner_schemas.PartnerToken(
+                access_token=access_token,
+                token_type="bearer",
+                partner=partner
+            )
         )
     except ValueError as e:
         raise HTTPException(
@@ -182,16 +197,16 @@ def get_partner_profile(
     Get current partner profile with hold status.
     Requires authentication.
     """
-    # Check if partner is on hold
-    hold = partner_utils.get_partner_hold_details(db, current_partner.id)
-    is_on_hold = hold is not None
+    # Balance is read live; identity and hold state come from the principal snapshot
+    credit_balance = db.query(Partner.credit_balance).filter(Partner.id == current_partner.id).scalar()
+    is_on_hold = current_partner.is_on_hold
     
     return partner_schemas.PartnerCreditNameOut(
         full_name=current_partner.full_name,
-        credit_balance=current_partner.credit_balance,
+        credit_balance=credit_balance,
         is_on_hold=is_on_hold,
-        hold_reason=hold.reason if hold else None,
-        hold_lift_date=hold.lift_date if hold else None
+        hold_reason=current_partner.hold_reason if is_on_hold else None,
+        hold_lift_date=current_partner.hold_lift_date if is_on_hold else None
     )
 
 
@@ -209,7 +224,7 @@ def create_agent(
     Create a new agent for the current partner.
     """
     # Check if partner is on hold
-    if partner_utils.check_partner_on_hold(db, current_partner.id):
+    if current_partner.is_on_hold:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Your account is on hold. You cannot create new agents at this time. Contact support for details."
@@ -227,6 +242,7 @@ def create_agent(
         )
         db.commit()
         db.refresh(agent)
+        auth_utils.invalidate_role(agent.email)
         return agent
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -302,6 +318,7 @@ def update_agent(
     
     db.commit()
     db.refresh(agent)
+    principal_cache.invalidate("agent", agent.id)
     return agent
 
 
@@ -326,6 +343,7 @@ def deactivate_agent(
     agent.updated_at = datetime.utcnow()
     
     db.commit()
+    principal_cache.invalidate("agent", agent.id)
     
     return {"message": "Agent deactivated successfully", "agent_id": agent_id}
 
@@ -334,88 +352,79 @@ def deactivate_agent(
 # ORDER ASSIGNMENT ENDPOINTS (FOR PARTNERS)
 # ================================
 
-@router.get("/locked-deals", response_model=List[dict])
+# Derived fields of LockedDealOut and the Order columns they are computed from
+LOCKED_DEAL_DERIVED_FIELDS = {
+    "lead_cost": ("final_quoted_price", "quoted_price"),
+    "time_remaining": ("lead_lock_expires_at",),
+}
+
+
+@router.get(
+    "/locked-deals",
+    response_model=List[partner_schemas.LockedDealOut],
+    response_model_exclude_unset=True,
+)
 def get_locked_deals(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
     db: Session = Depends(get_db),
     current_partner: Partner = Depends(auth_utils.get_current_partner),
 ):
     """
     Get all deals locked by the current partner (status = lead_locked).
+    Only the columns needed for the response are loaded.
     """
-    from backend.services.sell_phone.utils import calculate_lead_cost, expire_all_expired_locks
+    from backend.services.sell_phone.utils import (
+        calculate_lead_cost, expire_all_expired_locks, get_lead_cost_percentage
+    )
+
+    all_fields = list(partner_schemas.LockedDealOut.model_fields)
+    if fields:
+        selected = ["id"] + [f.strip() for f in fields.split(",") if f.strip() and f.strip() != "id"]
+        unknown = [f for f in selected if f not in all_fields]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+    else:
+        selected = all_fields
+
+    # Columns to load: selected order columns plus whatever derived fields need
+    columns = {"id"}
+    for field in selected:
+        columns.update(LOCKED_DEAL_DERIVED_FIELDS.get(field, (field,)))
 
     # Expire any locks that have passed their expiry before returning locked deals
     expire_all_expired_locks(db)
     
-    orders = db.query(Order).filter(
+    orders = db.query(Order).options(
+        load_only(*[getattr(Order, c) for c in sorted(columns)])
+    ).filter(
         Order.partner_id == current_partner.id,
         Order.status == "lead_locked"
     ).order_by(Order.lead_locked_at.desc()).all()
     
+    lead_cost_percentage = get_lead_cost_percentage(db) if "lead_cost" in selected else None
+    now = datetime.now(timezone.utc)
+    
     result = []
     for order in orders:
-        lead_cost = calculate_lead_cost(db, order.final_quoted_price or order.quoted_price)
-        result.append({
-            "id": order.id,
-            "customer_id": order.customer_id,
-            "partner_id": order.partner_id,
-            "agent_id": order.agent_id,
-            "phone_name": order.phone_name,
-            "brand": order.brand,
-            "model": order.model,
-            "ram_gb": order.ram_gb,
-            "storage_gb": order.storage_gb,
-            "variant": order.variant,
-            "ai_estimated_price": order.ai_estimated_price,
-            "ai_reasoning": order.ai_reasoning,
-            "customer_condition_answers": order.customer_condition_answers,
-            "final_quoted_price": order.final_quoted_price,
-            "customer_name": order.customer_name,
-            "customer_phone": order.customer_phone,
-            "customer_email": order.customer_email,
-            "pickup_address_line": order.pickup_address_line,
-            "pickup_city": order.pickup_city,
-            "pickup_state": order.pickup_state,
-            "pickup_pincode": order.pickup_pincode,
-            "pickup_date": order.pickup_date,
-            "pickup_time": order.pickup_time,
-            "payment_method": order.payment_method,
-            "status": order.status,
-            "lead_locked_at": order.lead_locked_at,
-            "lead_lock_expires_at": order.lead_lock_expires_at,
-            "purchased_at": order.purchased_at,
-            "assigned_at": order.assigned_at,
-            "accepted_at": order.accepted_at,
-            "completed_at": order.completed_at,
-            "cancelled_at": order.cancelled_at,
-            "cancellation_reason": order.cancellation_reason,
-            "actual_condition": order.actual_condition,
-            "final_offered_price": order.final_offered_price,
-            "customer_accepted_offer": order.customer_accepted_offer,
-            "pickup_notes": order.pickup_notes,
-            "payment_amount": order.payment_amount,
-            "payment_transaction_id": order.payment_transaction_id,
-            "payment_notes": order.payment_notes,
-            "payment_processed_at": order.payment_processed_at,
-            "user_id": order.user_id,
-            "condition": order.condition,
-            "quoted_price": order.quoted_price,
-            "phone_number": order.phone_number,
-            "email": order.email,
-            "address_line": order.address_line,
-            "city": order.city,
-            "state": order.state,
-            "pincode": order.pincode,
-            "agent_name": order.agent_name,
-            "agent_phone": order.agent_phone,
-            "agent_email": order.agent_email,
-            "created_at": order.created_at,
-            "lead_cost": lead_cost,
-            "time_remaining": None if not order.lead_lock_expires_at else 
-                (order.lead_lock_expires_at - datetime.now(timezone.utc)).total_seconds()
-        })
-    
-    return result
+        row = {}
+        for field in selected:
+            if field == "lead_cost":
+                row[field] = calculate_lead_cost(
+                    db, order.final_quoted_price or order.quoted_price, lead_cost_percentage
+                )
+            elif field == "time_remaining":
+                expires_at = order.lead_lock_expires_at
+                if expires_at is not None and expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                row[field] = None if not expires_at else (expires_at - now).total_seconds()
+            else:
+                row[field] = getattr(order, field)
+        result.append(row)
+    
+    return responses.list_response(result, partner_schemas.LockedDealOut, exclude_unset=True)
 
 
 @router.get("/lead-purchase-info/{order_id}", response_model=dict)
@@ -447,7 +456,9 @@ def get_lead_purchase_info(
         )
     
     lead_cost = calculate_lead_cost(db, order.final_quoted_price or order.quoted_price)
-    current_balance = current_partner.credit_balance or 0.0
+    current_balance = db.query(Partner.credit_balance).filter(
+        Partner.id == current_partner.id
+    ).scalar() or 0.0
     balance_after = current_balance - lead_cost
     has_sufficient_credits = current_balance >= lead_cost
     
@@ -518,7 +529,41 @@ def get_partner_orders(
             "created_at": order.created_at,
         })
     
-    return result
+    return responses.list_response(result, partner_schemas.PartnerOrderBriefOut)
+
+
+@router.post("/orders/bulk-assign", response_model=partner_schemas.BulkAssignOut)
+def bulk_assign_orders(
+    payload: partner_schemas.BulkAssignRequest,
+    db: Session = Depends(get_db),
+    current_partner: Partner = Depends(auth_utils.get_current_partner),
+):
+    """
+    Assign (or reassign) many orders to agents in one request.
+    
+    Each pair is validated like the single assign / reassign endpoints; valid
+    pairs are applied together and invalid ones are reported in `results`
+    without failing the rest.
+    """
+    # Check if partner is on hold
+    if current_partner.is_on_hold:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Your account is on hold. You cannot assign orders at this time. Contact support for details."
+        )
+    
+    results = partner_utils.bulk_assign_orders(
+        db=db,
+        partner_id=current_partner.id,
+        assignments=[(item.order_id, item.agent_id) for item in payload.assignments]
+    )
+    assigned = sum(1 for r in results if r["success"])
+    
+    return {
+        "assigned": assigned,
+        "failed": len(results) - assigned,
+        "results": results
+    }
 
 
 @router.post("/orders/{order_id}/assign", status_code=200)
@@ -532,7 +577,7 @@ def assign_order_to_agent(
     Assign a purchased order to an agent.
     """
     # Check if partner is on hold
-    if partner_utils.check_partner_on_hold(db, current_partner.id):
+    if current_partner.is_on_hold:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Your account is on hold. You cannot assign orders at this time. Contact support for details."
@@ -604,7 +649,7 @@ def reassign_order_to_agent(
     Reassign an order to a different agent.
     """
     # Check if partner is on hold
-    if partner_utils.check_partner_on_hold(db, current_partner.id):
+    if current_partner.is_on_hold:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Your account is on hold. You cannot reassign orders at this time. Contact support for details."
@@ -0,0 +1,179 @@
+"""
+In-memory partner hold state.
+
+Hold checks run on every lead action and agent pickup/payment request, so
+active holds are kept in process memory as
+
+    partner id -> (hold id, reason, lift date)
+
+and a check is a dict lookup. A timed hold stops counting once its lift date
+passes, whether or not the row has been lifted yet; `lift_expired_holds`
+(run by the `partner-hold-auto-lift` background job) marks such rows lifted,
+so request handlers never write hold rows.
+
+The map is built lazily on first use, refreshed per partner by
+place_partner_hold / lift_partner_hold, and fully rebuilt every
+HOLD_CACHE_TTL_SECONDS so that workers pick up holds changed by other
+processes. The pincode index and the principal cache read hold state from
+here.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.services.partner.schema.models import PartnerHold
+
+logger = logging.getLogger(__name__)
+
+HOLD_CACHE_TTL_SECONDS = int(os.getenv("HOLD_CACHE_TTL_SECONDS", "60"))
+
+AUTO_LIFT_REASON = "Hold period ended"
+
+
+@dataclass(frozen=True)
+class HoldState:
+    hold_id: int
+    reason: str
+    lift_date: Optional[datetime]  # None = until lifted by an admin
+
+    def in_effect(self, now: Optional[datetime] = None) -> bool:
+        if self.lift_date is None:
+            return True
+        lift_date = self.lift_date
+        if lift_date.tzinfo is None:
+            lift_date = lift_date.replace(tzinfo=timezone.utc)
+        return lift_date > (now or datetime.now(timezone.utc))
+
+
+class HoldCache:
+    """
+    Thread-safe map of active partner holds.
+    Read methods take the request's db session so the cache can load (or
+    reload, once stale) without opening a second connection.
+    """
+
+    def __init__(self, ttl_seconds: int = HOLD_CACHE_TTL_SECONDS):
+        self._lock = threading.Lock()
+        self._ttl_seconds = ttl_seconds
+        self._loaded_at: Optional[float] = None
+        self._holds: Dict[int, HoldState] = {}
+
+    # ------------------------------
+    # Loading
+    # ------------------------------
+
+    def _ensure_loaded(self, db: Session) -> None:
+        if self._loaded_at is None or (time.monotonic() - self._loaded_at) > self._ttl_seconds:
+            self.rebuild(db)
+
+    def rebuild(self, db: Session) -> None:
+        """Reload all active holds from the database."""
+        rows = db.query(PartnerHold.id, PartnerHold.partner_id, PartnerHold.reason, PartnerHold.lift_date).filter(
+            PartnerHold.is_active == True
+        ).order_by(PartnerHold.id).all()
+        # Should there be several active holds, the latest one wins
+        holds = {row.partner_id: HoldState(row.id, row.reason, row.lift_date) for row in rows}
+        with self._lock:
+            self._holds = holds
+            self._loaded_at = time.monotonic()
+
+    def refresh_partner(self, db: Session, partner_id: int) -> None:
+        """Reload one partner's hold. Call after committing a hold change."""
+        if self._loaded_at is None:
+            # Nothing cached yet; the next read will do a full build.
+            return
+        row = db.query(PartnerHold.id, PartnerHold.reason, PartnerHold.lift_date).filter(
+            PartnerHold.partner_id == partner_id,
+            PartnerHold.is_active == True
+        ).order_by(PartnerHold.id.desc()).first()
+        with self._lock:
+            if row is not None:
+                self._holds[partner_id] = HoldState(row.id, row.reason, row.lift_date)
+            else:
+                self._holds.pop(partner_id, None)
+
+    def invalidate(self) -> None:
+        """Force a full rebuild on next access."""
+        with self._lock:
+            self._loaded_at = None
+
+    # ------------------------------
+    # Reads
+    # ------------------------------
+
+    def get(self, db: Session, partner_id: int) -> Optional[HoldState]:
+        """The partner's hold if one is currently in effect, else None."""
+        self._ensure_loaded(db)
+        with self._lock:
+            hold = self._holds.get(partner_id)
+        return hold if hold is not None and hold.in_effect() else None
+
+    def is_on_hold(self, db: Session, partner_id: int) -> bool:
+        return self.get(db, partner_id) is not None
+
+    def partners_on_hold(self, db: Session) -> Set[int]:
+        """Ids of all partners currently on hold."""
+        self._ensure_loaded(db)
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            holds = list(self._holds.items())
+        return {partner_id for partner_id, hold in holds if hold.in_effect(now)}
+
+
+# Process-wide cache used by routes and utilities
+hold_cache = HoldCache()
+
+
+# ------------------------------
+# Auto-lift
+# ------------------------------
+
+def lift_expired_holds(db: Session) -> List[int]:
+    """
+    Mark active holds whose lift date has passed as lifted.
+    Returns the ids of the partners whose hold was lifted.
+    """
+    now = datetime.now(timezone.utc)
+    rows = db.execute(
+        update(PartnerHold)
+        .where(
+            PartnerHold.is_active == True,
+            PartnerHold.lift_date.isnot(None),
+            PartnerHold.lift_date <= now
+        )
+        .values(is_active=False, lifted_at=now, lift_reason=AUTO_LIFT_REASON)
+        .returning(PartnerHold.partner_id)
+    ).scalars().all()
+    db.commit()
+
+    partner_ids = sorted(set(rows))
+    if partner_ids:
+        from backend.services.auth.principals import principal_cache
+
+        for partner_id in partner_ids:
+            hold_cache.refresh_partner(db, partner_id)
+            principal_cache.invalidate_partner(partner_id)
+    return partner_ids
+
+
+def auto_lift_job() -> None:
+    """Background job entry point: auto-lift expired holds using a dedicated session."""
+    from backend.shared.db.connections import SessionLocal
+
+    db = SessionLocal()
+    try:
+        lifted = lift_expired_holds(db)
+        if lifted:
+            logger.info("Auto-lifted expired holds for partners %s", lifted)
+    except Exception:
+        db.rollback()
+        logger.exception("Partner hold auto-lift failed")
+    finally:
+        db.close()
@@ -0,0 +1,382 @@
+"""
+Suggested pickup schedules for agents.
+
+Orders only carry a pincode and a free-text address, so each stop is placed
+at its pincode's centroid from `pincode_centroids` (loaded from a CSV with
+`import_centroids` / import_pincode_centroids.py). Travel between stops is
+estimated from the great-circle distance times PICKUP_PLANNER_ROAD_FACTOR at
+PICKUP_PLANNER_SPEED_KMH.
+
+The visiting order is built with nearest-neighbour and then improved with
+2-opt (reverse any segment that shortens the route) until no move helps or
+PICKUP_PLANNER_MAX_2OPT_PASSES is reached. Routes are open paths: from the
+agent's start point if one is given, else from whichever stop gives the
+shortest nearest-neighbour route. An agent has tens of stops a day, so plain
+Python is fast enough.
+
+Walking the route from the day's start time gives each stop an ETA; the
+suggested time window starts at the ETA rounded down to
+PICKUP_WINDOW_ROUNDING_MINUTES and lasts PICKUP_WINDOW_MINUTES. Stops that
+cannot be reached before the end of the working day, or whose pincode has no
+centroid, are returned separately.
+
+Settings (environment):
+    PICKUP_PLANNER_SPEED_KMH           default 18 (city traffic)
+    PICKUP_PLANNER_ROAD_FACTOR         default 1.3 (road vs straight-line distance)
+    PICKUP_PLANNER_SERVICE_MINUTES     time spent at each pickup, default 20
+    PICKUP_PLANNER_DAY_START           default 10:00
+    PICKUP_PLANNER_DAY_END             default 19:00
+    PICKUP_WINDOW_MINUTES              default 60
+    PICKUP_WINDOW_ROUNDING_MINUTES     default 30
+    PICKUP_PLANNER_MAX_2OPT_PASSES     default 50
+"""
+import csv
+import logging
+import math
+import os
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.orm import Session
+
+from backend.services.partner.schema.models import PincodeCentroid
+from backend.services.sell_phone.schema.models import Order
+
+logger = logging.getLogger(__name__)
+
+SPEED_KMH = float(os.getenv("PICKUP_PLANNER_SPEED_KMH", "18"))
+ROAD_FACTOR = float(os.getenv("PICKUP_PLANNER_ROAD_FACTOR", "1.3"))
+SERVICE_MINUTES = int(os.getenv("PICKUP_PLANNER_SERVICE_MINUTES", "20"))
+DAY_START = os.getenv("PICKUP_PLANNER_DAY_START", "10:00")
+DAY_END = os.getenv("PICKUP_PLANNER_DAY_END", "19:00")
+WINDOW_MINUTES = int(os.getenv("PICKUP_WINDOW_MINUTES", "60"))
+WINDOW_ROUNDING_MINUTES = int(os.getenv("PICKUP_WINDOW_ROUNDING_MINUTES", "30"))
+MAX_2OPT_PASSES = int(os.getenv("PICKUP_PLANNER_MAX_2OPT_PASSES", "50"))
+
+CENTROID_IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+# Orders the agent still has to schedule (same statuses schedule_pickup accepts)
+SCHEDULABLE_STATUSES = ("assigned_to_agent", "accepted_by_agent")
+
+EARTH_RADIUS_KM = 6371.0
+
+Point = Tuple[float, float]
+
+
+class CentroidImportError(ValueError):
+    """The file cannot be imported at all (e.g. missing columns)."""
+
+
+def normalize_pincode(value: Optional[str]) -> str:
+    return "".join((value or "").split())
+
+
+def parse_clock(value: str) -> time:
+    """Parse an HH:MM time. Raises ValueError."""
+    return datetime.strptime(value.strip(), "%H:%M").time()
+
+
+# ------------------------------
+# Centroid import
+# ------------------------------
+
+# Accepted header names (case-insensitive), e.g. the India Post pincode directory
+_COLUMN_ALIASES = {
+    "pincode": ("pincode", "pin", "pin_code"),
+    "latitude": ("latitude", "lat"),
+    "longitude": ("longitude", "lon", "lng", "long"),
+    "district": ("district", "districtname", "city"),
+    "state": ("state", "statename"),
+}
+
+
+def _resolve_columns(fieldnames: Sequence[str]) -> Dict[str, str]:
+    by_lower = {name.strip().lower(): name for name in fieldnames or []}
+    columns = {}
+    for column, aliases in _COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in by_lower:
+                columns[column] = by_lower[alias]
+                break
+    missing = [c for c in ("pincode", "latitude", "longitude") if c not in columns]
+    if missing:
+        raise CentroidImportError(f"Missing required columns: {', '.join(missing)}")
+    return columns
+
+
+def read_centroids_csv(lines: Iterable[str], report: dict) -> Dict[str, dict]:
+    """
+    Centroid per pincode from CSV text: the mean of all valid rows for the
+    pincode (directories list one row per post office). Invalid rows are
+    counted and recorded in `report`.
+
+    Raises:
+        CentroidImportError: If required columns are missing from the header
+    """
+    reader = csv.DictReader(lines)
+    columns = _resolve_columns(reader.fieldnames)
+    sums: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+    labels: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+
+    for row in reader:
+        report["rows"] += 1
+        try:
+            pincode = normalize_pincode(row.get(columns["pincode"]))
+            if not pincode:
+                raise ValueError("pincode is required")
+            latitude = float(row.get(columns["latitude"]) or "nan")
+            longitude = float(row.get(columns["longitude"]) or "nan")
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                raise ValueError("latitude/longitude missing or out of range")
+        except ValueError as e:
+            report["invalid"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"line": reader.line_num, "error": str(e)})
+            continue
+        total = sums[pincode]
+        total[0] += latitude
+        total[1] += longitude
+        total[2] += 1
+        if pincode not in labels:
+            labels[pincode] = tuple(
+                ((row.get(columns[c]) or "").strip() or None) if c in columns else None
+                for c in ("district", "state")
+            )
+
+    return {
+        pincode: {
+            "pincode": pincode,
+            "latitude": lat / count,
+            "longitude": lon / count,
+            "district": labels[pincode][0],
+            "state": labels[pincode][1],
+        }
+        for pincode, (lat, lon, count) in sums.items()
+    }
+
+
+def import_centroids(
+    db: Session,
+    lines: Iterable[str],
+    dry_run: bool = False,
+    batch_size: int = CENTROID_IMPORT_BATCH_SIZE,
+) -> dict:
+    """
+    Upsert a pincode CSV into pincode_centroids.
+
+    Returns:
+        Report with counts (rows, pincodes, inserted, updated, invalid) and
+        the first errors
+
+    Raises:
+        CentroidImportError: If the file is missing required columns
+    """
+    report = {"dry_run": dry_run, "rows": 0, "pincodes": 0, "inserted": 0, "updated": 0, "invalid": 0, "errors": []}
+    centroids = read_centroids_csv(lines, report)
+    report["pincodes"] = len(centroids)
+
+    existing = {pincode for (pincode,) in db.query(PincodeCentroid.pincode).all()}
+    inserts = [c for p, c in centroids.items() if p not in existing]
+    updates = [{**c, "_pincode": p} for p, c in centroids.items() if p in existing]
+    report["inserted"] = len(inserts)
+    report["updated"] = len(updates)
+    if dry_run:
+        return report
+
+    table = PincodeCentroid.__table__
+    try:
+        for i in range(0, len(inserts), batch_size):
+            db.execute(insert(table), inserts[i:i + batch_size])
+        for i in range(0, len(updates), batch_size):
+            db.execute(
+                update(table).where(table.c.pincode == bindparam("_pincode")),
+                [{k: v for k, v in row.items() if k != "pincode"} for row in updates[i:i + batch_size]],
+            )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return report
+
+
+def load_centroids(db: Session, pincodes: Iterable[str]) -> Dict[str, Point]:
+    """(latitude, longitude) for each of the given pincodes that has a centroid."""
+    pincodes = {normalize_pincode(p) for p in pincodes if p}
+    if not pincodes:
+        return {}
+    rows = db.query(PincodeCentroid.pincode, PincodeCentroid.latitude, PincodeCentroid.longitude).filter(
+        PincodeCentroid.pincode.in_(pincodes)
+    ).all()
+    return {row.pincode: (row.latitude, row.longitude) for row in rows}
+
+
+# ------------------------------
+# Routing
+# ------------------------------
+
+def haversine_km(a: Point, b: Point) -> float:
+    """Great-circle distance between two (latitude, longitude) points in km."""
+    lat1, lon1 = math.radians(a[0]), math.radians(a[1])
+    lat2, lon2 = math.radians(b[0]), math.radians(b[1])
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def distance_matrix(points: Sequence[Point]) -> List[List[float]]:
+    """Estimated road distance (km) between every pair of points."""
+    n = len(points)
+    matrix = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            matrix[i][j] = matrix[j][i] = haversine_km(points[i], points[j]) * ROAD_FACTOR
+    return matrix
+
+
+def path_length(route: Sequence[int], dist: List[List[float]]) -> float:
+    return sum(dist[route[i]][route[i + 1]] for i in range(len(route) - 1))
+
+
+def nearest_neighbour(dist: List[List[float]], start: int) -> List[int]:
+    """Greedy route from `start` always visiting the closest unvisited point."""
+    unvisited = set(range(len(dist))) - {start}
+    route = [start]
+    while unvisited:
+        last = dist[route[-1]]
+        # Ties broken by index so plans are deterministic
+        nearest = min(unvisited, key=lambda j: (last[j], j))
+        route.append(nearest)
+        unvisited.remove(nearest)
+    return route
+
+
+def two_opt(route: List[int], dist: List[List[float]], fix_start: bool = True) -> List[int]:
+    """
+    Improve an open route by reversing segments while that shortens it.
+    With fix_start the first point (the agent's start) stays in place.
+    """
+    route = list(route)
+    n = len(route)
+    first = 1 if fix_start else 0
+    for _ in range(MAX_2OPT_PASSES):
+        improved = False
+        for i in range(first, n - 1):
+            prev = route[i - 1] if i > 0 else None
+            for k in range(i + 1, n):
+                nxt = route[k + 1] if k + 1 < n else None
+                a, b = route[i], route[k]
+                # Only the edges at both ends of the reversed segment change
+                before = (dist[prev][a] if prev is not None else 0.0) + (dist[b][nxt] if nxt is not None else 0.0)
+                after = (dist[prev][b] if prev is not None else 0.0) + (dist[a][nxt] if nxt is not None else 0.0)
+                if after < before - 1e-9:
+                    route[i:k + 1] = reversed(route[i:k + 1])
+                    improved = True
+        if not improved:
+            break
+    return route
+
+
+def plan_route(points: Sequence[Point], start: Optional[Point] = None) -> List[int]:
+    """
+    Visiting order (indices into `points`) for an open route, starting from
+    `start` if given.
+    """
+    if not points:
+        return []
+    if start is not None:
+        dist = distance_matrix([start, *points])
+        route = two_opt(nearest_neighbour(dist, 0), dist, fix_start=True)
+        return [i - 1 for i in route[1:]]
+
+    dist = distance_matrix(points)
+    best = min((nearest_neighbour(dist, s) for s in range(len(points))), key=lambda r: path_length(r, dist))
+    return two_opt(best, dist, fix_start=False)
+
+
+# ------------------------------
+# Day plan
+# ------------------------------
+
+def _floor_minutes(value: datetime, minutes: int) -> datetime:
+    value = value.replace(second=0, microsecond=0)
+    return value - timedelta(minutes=(value.hour * 60 + value.minute) % minutes)
+
+
+def suggest_schedule(
+    db: Session,
+    agent_id: int,
+    day: date,
+    start_time: Optional[time] = None,
+    end_time: Optional[time] = None,
+    start: Optional[Point] = None,
+) -> dict:
+    """
+    Suggested order and time windows for an agent's unscheduled pickups on
+    `day`, in the shape of SuggestedScheduleOut. Nothing is written; the
+    agent schedules each stop with schedule_pickup.
+    """
+    start_time = start_time or parse_clock(DAY_START)
+    end_time = end_time or parse_clock(DAY_END)
+    orders = db.query(
+        Order.id, Order.phone_name, Order.customer_name, Order.customer_phone, Order.pickup_address_line,
+        Order.pickup_city, Order.pickup_pincode,
+    ).filter(
+        Order.agent_id == agent_id,
+        Order.status.in_(SCHEDULABLE_STATUSES)
+    ).order_by(Order.id).all()
+
+    centroids = load_centroids(db, (o.pickup_pincode for o in orders))
+    placed = [o for o in orders if normalize_pincode(o.pickup_pincode) in centroids]
+    unplanned = [
+        {"order_id": o.id, "pickup_pincode": o.pickup_pincode, "reason": "No location known for this pincode"}
+        for o in orders if normalize_pincode(o.pickup_pincode) not in centroids
+    ]
+    points = [centroids[normalize_pincode(o.pickup_pincode)] for o in placed]
+
+    clock = datetime.combine(day, start_time)
+    day_end = datetime.combine(day, end_time)
+    position = start
+    stops = []
+    total_km = 0.0
+    for index in plan_route(points, start):
+        order, point = placed[index], points[index]
+        leg_km = haversine_km(position, point) * ROAD_FACTOR if position is not None else 0.0
+        arrival = clock + timedelta(hours=leg_km / SPEED_KMH)
+        if arrival + timedelta(minutes=SERVICE_MINUTES) > day_end:
+            unplanned.append({
+                "order_id": order.id, "pickup_pincode": order.pickup_pincode,
+                "reason": "Does not fit in the working day",
+            })
+            continue
+        window_start = _floor_minutes(arrival, WINDOW_ROUNDING_MINUTES)
+        stops.append({
+            "sequence": len(stops) + 1,
+            "order_id": order.id,
+            "phone_name": order.phone_name,
+            "customer_name": order.customer_name,
+            "customer_phone": order.customer_phone,
+            "pickup_address_line": order.pickup_address_line,
+            "pickup_city": order.pickup_city,
+            "pickup_pincode": order.pickup_pincode,
+            "latitude": point[0],
+            "longitude": point[1],
+            "distance_from_previous_km": round(leg_km, 2),
+            "eta": arrival.strftime("%H:%M"),
+            "window_start": window_start.strftime("%H:%M"),
+            "window_end": (window_start + timedelta(minutes=WINDOW_MINUTES)).strftime("%H:%M"),
+        })
+        total_km += leg_km
+        clock = arrival + timedelta(minutes=SERVICE_MINUTES)
+        position = point
+
+    return {
+        "date": day.isoformat(),
+        "start_time": start_time.strftime("%H:%M"),
+        "end_time": end_time.strftime("%H:%M"),
+        "total_distance_km": round(total_km, 2),
+        "estimated_finish": clock.strftime("%H:%M") if stops else None,
+        "stops": stops,
+        "unplanned": unplanned,
+    }
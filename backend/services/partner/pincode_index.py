@@ -0,0 +1,161 @@
+"""
+In-memory pincode -> partner routing index.
+
+Serviceability is checked on the critical path of order creation and every
+lead action, so instead of querying `partner_serviceable_pincodes` per request
+we keep two maps in process memory:
+
+    pincode    -> set of partner ids servicing it
+    partner id -> set of pincodes it services
+
+plus the routing state of each partner (approved / active). Hold state comes
+from the hold cache (backend.services.partner.hold_cache).
+The index is built lazily on first use, refreshed per partner on signup and
+approval changes, and fully rebuilt every PINCODE_INDEX_TTL_SECONDS so that
+workers pick up changes made by other processes.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from backend.services.partner.schema.models import Partner, PartnerServiceablePincode
+from backend.services.partner.hold_cache import hold_cache
+
+PINCODE_INDEX_TTL_SECONDS = int(os.getenv("PINCODE_INDEX_TTL_SECONDS", "300"))
+
+
+class PincodeIndex:
+    """
+    Thread-safe pincode routing index.
+    All read methods take the request's db session so the index can load
+    (or reload, once stale) without opening a second connection.
+    """
+
+    def __init__(self, ttl_seconds: int = PINCODE_INDEX_TTL_SECONDS):
+        self._lock = threading.RLock()
+        self._ttl_seconds = ttl_seconds
+        self._loaded_at: Optional[float] = None
+        self._partners_by_pincode: Dict[str, Set[int]] = {}
+        self._pincodes_by_partner: Dict[int, Set[str]] = {}
+        # Partners that are approved and active (holds are checked separately)
+        self._routable_partners: Set[int] = set()
+
+    # ------------------------------
+    # Loading
+    # ------------------------------
+
+    def _is_stale(self) -> bool:
+        return self._loaded_at is None or (time.monotonic() - self._loaded_at) > self._ttl_seconds
+
+    def _ensure_loaded(self, db: Session) -> None:
+        if self._is_stale():
+            self.rebuild(db)
+
+    def rebuild(self, db: Session) -> None:
+        """Rebuild the whole index from the database."""
+        rows = db.query(PartnerServiceablePincode.partner_id, PartnerServiceablePincode.pincode).filter(
+            PartnerServiceablePincode.is_active == True
+        ).all()
+        routable = db.query(Partner.id).filter(
+            Partner.verification_status == "approved",
+            Partner.is_active == True
+        ).all()
+
+        partners_by_pincode: Dict[str, Set[int]] = {}
+        pincodes_by_partner: Dict[int, Set[str]] = {}
+        for partner_id, pincode in rows:
+            pincode = pincode.strip()
+            partners_by_pincode.setdefault(pincode, set()).add(partner_id)
+            pincodes_by_partner.setdefault(partner_id, set()).add(pincode)
+
+        with self._lock:
+            self._partners_by_pincode = partners_by_pincode
+            self._pincodes_by_partner = pincodes_by_partner
+            self._routable_partners = {r.id for r in routable}
+            self._loaded_at = time.monotonic()
+
+    def refresh_partner(self, db: Session, partner_id: int) -> None:
+        """
+        Reload a single partner's pincodes and routing state.
+        Call after committing partner signup or verification changes.
+        """
+        if self._loaded_at is None:
+            # Nothing cached yet; the next read will do a full build.
+            return
+
+        partner = db.query(Partner.verification_status, Partner.is_active).filter(
+            Partner.id == partner_id
+        ).first()
+        pincodes = {
+            p.pincode.strip()
+            for p in db.query(PartnerServiceablePincode.pincode).filter(
+                PartnerServiceablePincode.partner_id == partner_id,
+                PartnerServiceablePincode.is_active == True
+            ).all()
+        }
+
+        with self._lock:
+            for pincode in self._pincodes_by_partner.pop(partner_id, set()):
+                members = self._partners_by_pincode.get(pincode)
+                if members is not None:
+                    members.discard(partner_id)
+                    if not members:
+                        del self._partners_by_pincode[pincode]
+
+            if partner is None:
+                self._routable_partners.discard(partner_id)
+                return
+
+            if pincodes:
+                self._pincodes_by_partner[partner_id] = pincodes
+                for pincode in pincodes:
+                    self._partners_by_pincode.setdefault(pincode, set()).add(partner_id)
+
+            if partner.verification_status == "approved" and partner.is_active:
+                self._routable_partners.add(partner_id)
+            else:
+                self._routable_partners.discard(partner_id)
+
+    def invalidate(self) -> None:
+        """Force a full rebuild on next access."""
+        with self._lock:
+            self._loaded_at = None
+
+    # ------------------------------
+    # Reads
+    # ------------------------------
+
+    def partners_for_pincode(self, db: Session, pincode: str) -> List[int]:
+        """
+        Fan-out list: ids of approved, active, not-on-hold partners servicing a pincode.
+        """
+        self._ensure_loaded(db)
+        on_hold = hold_cache.partners_on_hold(db)
+        with self._lock:
+            members = self._partners_by_pincode.get((pincode or "").strip(), ())
+            return [pid for pid in members if pid in self._routable_partners and pid not in on_hold]
+
+    def partner_count(self, db: Session, pincode: str) -> int:
+        """Number of partners that can currently receive leads for a pincode."""
+        return len(self.partners_for_pincode(db, pincode))
+
+    def partner_services_pincode(self, db: Session, partner_id: int, pincode: Optional[str]) -> bool:
+        """O(1) check that a partner has an active serviceable pincode entry."""
+        if not pincode:
+            return False
+        self._ensure_loaded(db)
+        with self._lock:
+            return pincode.strip() in self._pincodes_by_partner.get(partner_id, ())
+
+    def pincodes_for_partner(self, db: Session, partner_id: int) -> List[str]:
+        """Active serviceable pincodes of a partner."""
+        self._ensure_loaded(db)
+        with self._lock:
+            return list(self._pincodes_by_partner.get(partner_id, ()))
+
+
+# Process-wide index used by routes and utilities
+pincode_index = PincodeIndex()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Text, Index
 from sqlalchemy.sql import func
 from backend.shared.db.connections import Base
 
@@ -105,3 +105,39 @@ class Agent(Base):
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class AgentOrderTombstone(Base):
+    """
+    Record of an order leaving an agent's list (reassigned, returned to the
+    partner or deleted), so the agent app's delta sync can drop it locally.
+    Written by the session hook in backend.services.partner.agent_sync.
+    """
+    __tablename__ = "agent_order_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    agent_id = Column(Integer, ForeignKey("agents.id", ondelete="CASCADE"), nullable=False)
+    # Not a foreign key: the tombstone outlives a deleted order
+    order_id = Column(Integer, nullable=False)
+    reason = Column(String, nullable=False)  # 'reassigned', 'unassigned', 'deleted'
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Agent delta sync: tombstones since the client's watermark
+        Index("ix_agent_order_tombstones_agent_id_created_at", "agent_id", "created_at"),
+    )
+
+
+class PincodeCentroid(Base):
+    """
+    Approximate location of a pincode (mean of its post offices), used to
+    order an agent's pickups. Loaded with import_pincode_centroids.py.
+    """
+    __tablename__ = "pincode_centroids"
+
+    pincode = Column(String, primary_key=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    district = Column(String, nullable=True)
+    state = Column(String, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
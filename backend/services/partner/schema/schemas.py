@@ -124,6 +124,96 @@ class PartnerOrderBriefOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+# Locked-deal row for the partner locked deals list. The default response
+# carries every field; a `fields=` selection narrows it, which is why every
+# field except `id` is optional.
+class LockedDealOut(BaseModel):
+    id: int
+    customer_id: Optional[int] = None
+    partner_id: Optional[int] = None
+    agent_id: Optional[int] = None
+    phone_name: Optional[str] = None
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    ram_gb: Optional[float] = None
+    storage_gb: Optional[float] = None
+    variant: Optional[str] = None
+    ai_estimated_price: Optional[float] = None
+    ai_reasoning: Optional[str] = None
+    customer_condition_answers: Optional[dict] = None
+    final_quoted_price: Optional[float] = None
+    customer_name: Optional[str] = None
+    customer_phone: Optional[str] = None
+    customer_email: Optional[str] = None
+    pickup_address_line: Optional[str] = None
+    pickup_city: Optional[str] = None
+    pickup_state: Optional[str] = None
+    pickup_pincode: Optional[str] = None
+    pickup_date: Optional[datetime] = None
+    pickup_time: Optional[str] = None
+    payment_method: Optional[str] = None
+    status: Optional[str] = None
+    lead_locked_at: Optional[datetime] = None
+    lead_lock_expires_at: Optional[datetime] = None
+    purchased_at: Optional[datetime] = None
+    assigned_at: Optional[datetime] = None
+    accepted_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    cancelled_at: Optional[datetime] = None
+    cancellation_reason: Optional[str] = None
+    actual_condition: Optional[str] = None
+    final_offered_price: Optional[float] = None
+    customer_accepted_offer: Optional[bool] = None
+    pickup_notes: Optional[str] = None
+    payment_amount: Optional[float] = None
+    payment_transaction_id: Optional[str] = None
+    payment_notes: Optional[str] = None
+    payment_processed_at: Optional[datetime] = None
+    user_id: Optional[int] = None
+    condition: Optional[str] = None
+    quoted_price: Optional[float] = None
+    phone_number: Optional[str] = None
+    email: Optional[str] = None
+    address_line: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    pincode: Optional[str] = None
+    agent_name: Optional[str] = None
+    agent_phone: Optional[str] = None
+    agent_email: Optional[str] = None
+    created_at: Optional[datetime] = None
+    lead_cost: Optional[float] = None
+    time_remaining: Optional[float] = None
+
+
+class BulkAssignItem(BaseModel):
+    """One (order, agent) pair in a bulk assignment"""
+    order_id: int
+    agent_id: int
+
+
+class BulkAssignRequest(BaseModel):
+    """Schema for assigning many orders at once"""
+    assignments: List[BulkAssignItem] = Field(..., min_length=1, max_length=200)
+
+
+class BulkAssignItemResult(BaseModel):
+    """Outcome of one pair; `detail` explains a failure"""
+    order_id: int
+    agent_id: int
+    agent_name: Optional[str] = None
+    success: bool
+    action: Optional[str] = None  # 'assigned' or 'reassigned'
+    detail: Optional[str] = None
+
+
+class BulkAssignOut(BaseModel):
+    """Per-item results of a bulk assignment"""
+    assigned: int
+    failed: int
+    results: List[BulkAssignItemResult]
+
+
 # ================================
 # AGENT SCHEMAS
 # ================================
@@ -207,6 +297,53 @@ class AgentOrderSummary(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class AgentOrderListItem(BaseModel):
+    """Compact order row for the agent order list"""
+    id: int
+    phone_name: str
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    specs: Optional[str] = None
+    status: str
+    status_detail: str
+    estimated_value: Optional[float] = None
+    customer_name: Optional[str] = None
+    customer_phone: Optional[str] = None
+    pickup_address_line: Optional[str] = None
+    pickup_city: Optional[str] = None
+    pickup_state: Optional[str] = None
+    pickup_pincode: Optional[str] = None
+    pickup_date: Optional[str] = None  # DD/MM/YYYY
+    pickup_time: Optional[str] = None
+    payment_method: Optional[str] = None
+    ram_gb: Optional[float] = None
+    storage_gb: Optional[float] = None
+    ai_estimated_price: Optional[float] = None
+    final_quoted_price: Optional[float] = None
+    assigned_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class AgentSyncStatusHistoryItem(BaseModel):
+    """Status history entry in an agent delta sync"""
+    id: int
+    order_id: int
+    from_status: Optional[str] = None
+    to_status: str
+    changed_by_user_type: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class AgentSyncOut(BaseModel):
+    """Changes to an agent's orders since the client's watermark"""
+    watermark: datetime  # Send as `since` on the next sync
+    full_sync: bool  # True: replace the local copy instead of merging
+    orders: List[AgentOrderListItem]
+    status_history: List[AgentSyncStatusHistoryItem]
+    removed_order_ids: List[int]
+
+
 class SchedulePickupRequest(BaseModel):
     """Schema for scheduling pickup"""
     scheduled_date: str  # YYYY-MM-DD format
@@ -245,6 +382,42 @@ class CancelPickupRequest(BaseModel):
     notes: Optional[str] = None
 
 
+class SuggestedStop(BaseModel):
+    """One pickup in a suggested day plan"""
+    sequence: int
+    order_id: int
+    phone_name: Optional[str] = None
+    customer_name: Optional[str] = None
+    customer_phone: Optional[str] = None
+    pickup_address_line: Optional[str] = None
+    pickup_city: Optional[str] = None
+    pickup_pincode: Optional[str] = None
+    latitude: float  # Pincode centroid
+    longitude: float
+    distance_from_previous_km: float
+    eta: str  # HH:MM
+    window_start: str  # HH:MM, pass as scheduled_time
+    window_end: str  # HH:MM
+
+
+class UnplannedStop(BaseModel):
+    """Order left out of a suggested day plan"""
+    order_id: int
+    pickup_pincode: Optional[str] = None
+    reason: str
+
+
+class SuggestedScheduleOut(BaseModel):
+    """Suggested visiting order and time windows for an agent's pickups"""
+    date: str  # YYYY-MM-DD
+    start_time: str  # HH:MM
+    end_time: str  # HH:MM
+    total_distance_km: float
+    estimated_finish: Optional[str] = None  # HH:MM
+    stops: List[SuggestedStop]
+    unplanned: List[UnplannedStop]
+
+
 class AgentLocationUpdate(BaseModel):
     """Schema for updating agent location"""
     latitude: float = Field(..., ge=-90, le=90)
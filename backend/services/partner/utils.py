@@ -1,11 +1,16 @@
+import os
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func, or_, select
 from fastapi import HTTPException, status
 from datetime import datetime, timezone
 from backend.services.partner.schema.models import Agent, Partner, PartnerServiceablePincode, PartnerHold
-from backend.services.auth.utils import get_password_hash, verify_password, create_access_token
+from backend.services.partner.hold_cache import hold_cache
+from backend.services.auth.utils import get_password_hash, create_access_token
+from backend.shared.auth import hashing
+from starlette.concurrency import run_in_threadpool
 from backend.services.sell_phone.schema.models import Order
-from typing import List, Optional
+from backend.services.sell_phone.utils import create_status_history
+from typing import Dict, List, Optional, Tuple
 
 
 # ================================
@@ -86,7 +91,7 @@ def create_partner_application(
     return partner
 
 
-def authenticate_partner(db: Session, email: str, password: str) -> Partner:
+async def authenticate_partner(db: Session, email: str, password: str) -> Partner:
     """
     Authenticate a partner by email and password.
     
@@ -101,12 +106,14 @@ def authenticate_partner(db: Session, email: str, password: str) -> Partner:
     Raises:
         ValueError: If credentials are invalid
     """
-    partner = db.query(Partner).filter(Partner.email == email).first()
+    partner = await run_in_threadpool(
+        lambda: db.query(Partner).filter(Partner.email == email).first()
+    )
     
     if not partner:
         raise ValueError("Invalid credentials")
     
-    if not verify_password(password, partner.hashed_password):
+    if not await hashing.verify_password_async(password, partner.hashed_password):
         raise ValueError("Invalid credentials")
     
     if not partner.is_active:
@@ -193,7 +200,7 @@ def create_agent(
     return agent
 
 
-def authenticate_agent(db: Session, email: str, password: str) -> Agent:
+async def authenticate_agent(db: Session, email: str, password: str) -> Agent:
     """
     Authenticate an agent by email and password.
     
@@ -208,12 +215,14 @@ def authenticate_agent(db: Session, email: str, password: str) -> Agent:
     Raises:
         ValueError: If credentials are invalid
     """
-    agent = db.query(Agent).filter(Agent.email == email).first()
+    agent = await run_in_threadpool(
+        lambda: db.query(Agent).filter(Agent.email == email).first()
+    )
     
     if not agent:
         raise ValueError("Invalid credentials")
     
-    if not verify_password(password, agent.hashed_password):
+    if not await hashing.verify_password_async(password, agent.hashed_password):
         raise ValueError("Invalid credentials")
     
     if not agent.is_active:
@@ -240,28 +249,78 @@ def create_agent_token(agent: Agent) -> str:
     return create_access_token(data=token_data)
 
 
-def get_agent_orders(
-    db: Session,
+# How far X-Sync-Timestamp is moved back to cover transactions committing during a sync
+AGENT_ORDERS_SYNC_OVERLAP_SECONDS = int(os.getenv("AGENT_ORDERS_SYNC_OVERLAP_SECONDS", "30"))
+
+# Agent order list page size when the client does not pass `limit`
+AGENT_ORDERS_PAGE_SIZE = int(os.getenv("AGENT_ORDERS_PAGE_SIZE", "50"))
+
+# Agent order list sort key: assignment time (older rows may lack it)
+AGENT_ORDER_SORT_KEY = func.coalesce(Order.assigned_at, Order.created_at)
+
+AGENT_ORDER_LIST_COLUMNS = (
+    Order.id, Order.phone_name, Order.brand, Order.model, Order.status, Order.ai_estimated_price,
+    Order.final_quoted_price, Order.customer_name, Order.customer_phone, Order.pickup_address_line,
+    Order.pickup_city, Order.pickup_state, Order.pickup_pincode, Order.pickup_date, Order.pickup_time,
+    Order.payment_method, Order.ram_gb, Order.storage_gb, Order.assigned_at, Order.updated_at,
+)
+
+
+def agent_orders_select(
     agent_id: int,
-    status_filter: str = None
-) -> list:
+    status_filter: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+):
     """
-    Get orders assigned to an agent.
+    Select the agent order list columns (plus `sort_key`) for an agent's orders.
+    Ordering / keyset filtering is applied by the caller on AGENT_ORDER_SORT_KEY.
     
     Args:
-        db: Database session
         agent_id: ID of the agent
         status_filter: Optional status filter (e.g., 'assigned_to_agent', 'accepted_by_agent')
-        
-    Returns:
-        List of Order objects
+        updated_since: Only orders changed after this time
     """
-    query = db.query(Order).filter(Order.agent_id == agent_id)
-    
+    stmt = select(*AGENT_ORDER_LIST_COLUMNS, AGENT_ORDER_SORT_KEY.label("sort_key")).where(
+        Order.agent_id == agent_id
+    )
     if status_filter:
-        query = query.filter(Order.status == status_filter)
-    
-    return query.order_by(Order.assigned_at.desc()).all()
+        stmt = stmt.where(Order.status == status_filter)
+    if updated_since is not None:
+        stmt = stmt.where(Order.updated_at > updated_since)
+    return stmt
+
+
+def format_agent_order(row) -> dict:
+    """Shape a row from agent_orders_select as an AgentOrderListItem."""
+    status_label = "pickup completed" if row.status == "pickup_completed" else row.status
+    specs = None
+    if row.ram_gb is not None and row.storage_gb is not None:
+        specs = f"{int(row.ram_gb)}GB RAM • {int(row.storage_gb)}GB Storage"
+    return {
+        "id": row.id,
+        "phone_name": row.phone_name,
+        "brand": row.brand,
+        "model": row.model,
+        "specs": specs,
+        "status": status_label,
+        "status_detail": status_label,
+        "estimated_value": row.ai_estimated_price,
+        "customer_name": row.customer_name,
+        "customer_phone": row.customer_phone,
+        "pickup_address_line": row.pickup_address_line,
+        "pickup_city": row.pickup_city,
+        "pickup_state": row.pickup_state,
+        "pickup_pincode": row.pickup_pincode,
+        "pickup_date": row.pickup_date.strftime('%d/%m/%Y') if row.pickup_date else None,
+        "pickup_time": row.pickup_time,
+        "payment_method": row.payment_method,
+        "ram_gb": row.ram_gb,
+        "storage_gb": row.storage_gb,
+        "ai_estimated_price": row.ai_estimated_price,
+        "final_quoted_price": row.final_quoted_price,
+        "assigned_at": row.assigned_at,
+        "updated_at": row.updated_at,
+    }
 
 
 def validate_agent_order_access(
@@ -336,6 +395,113 @@ def validate_partner_order_access(
     return order
 
 
+# Order statuses from which a partner may (re)assign an agent
+ASSIGNABLE_STATUSES = ("lead_purchased",)
+REASSIGNABLE_STATUSES = ("assigned_to_agent", "accepted_by_agent")
+
+
+def bulk_assign_orders(
+    db: Session,
+    partner_id: int,
+    assignments: List[Tuple[int, int]]
+) -> List[dict]:
+    """
+    Assign or reassign many orders to agents in one transaction.
+    
+    Orders and agents are loaded with one query each and every pair is
+    validated against them; valid pairs are applied (same changes and status
+    history as the single assign / reassign endpoints) and committed together.
+    Invalid pairs are skipped, not fatal.
+    
+    Args:
+        db: Database session
+        partner_id: ID of the partner
+        assignments: (order_id, agent_id) pairs
+        
+    Returns:
+        One result dict per pair, in request order (see BulkAssignItemResult)
+    """
+    order_ids = {order_id for order_id, _ in assignments}
+    agent_ids = {agent_id for _, agent_id in assignments}
+    
+    orders: Dict[int, Order] = {
+        order.id: order
+        for order in db.query(Order).filter(
+            Order.id.in_(order_ids),
+            Order.partner_id == partner_id
+        ).with_for_update().all()
+    } if order_ids else {}
+    agents: Dict[int, Agent] = {
+        agent.id: agent
+        for agent in db.query(Agent).filter(
+            Agent.id.in_(agent_ids),
+            Agent.partner_id == partner_id,
+            Agent.is_active == True
+        ).all()
+    } if agent_ids else {}
+    
+    now = datetime.utcnow()
+    seen = set()
+    results = []
+    for order_id, agent_id in assignments:
+        result = {
+            "order_id": order_id, "agent_id": agent_id, "agent_name": None,
+            "success": False, "action": None, "detail": None,
+        }
+        results.append(result)
+        
+        order = orders.get(order_id)
+        agent = agents.get(agent_id)
+        if order_id in seen:
+            result["detail"] = "Order appears more than once in this request"
+            continue
+        seen.add(order_id)
+        if order is None:
+            result["detail"] = "Order not found"
+            continue
+        if agent is None:
+            result["detail"] = "Agent not found or not active"
+            continue
+        
+        old_status = order.status
+        if old_status in ASSIGNABLE_STATUSES:
+            order.status = "accepted_by_agent"
+            order.accepted_at = now
+            action = "assigned"
+            notes = f"Assigned to agent {agent.full_name} (ID: {agent_id})"
+        elif old_status in REASSIGNABLE_STATUSES:
+            if order.agent_id == agent_id:
+                result["detail"] = "Order is already assigned to this agent"
+                continue
+            notes = f"Reassigned from agent {order.agent_id} to agent {agent.full_name} (ID: {agent_id})"
+            order.status = "assigned_to_agent"  # Reset to assigned status
+            order.accepted_at = None  # Clear acceptance timestamp
+            action = "reassigned"
+        else:
+            result["detail"] = f"Order cannot be assigned (current status: {old_status})"
+            continue
+        
+        order.agent_id = agent_id
+        order.agent_name = agent.full_name
+        order.agent_phone = agent.phone
+        order.agent_email = agent.email
+        order.assigned_at = now
+        
+        create_status_history(
+            db=db,
+            order_id=order_id,
+            from_status=old_status,
+            to_status=order.status,
+            changed_by_user_type="partner",
+            changed_by_user_id=partner_id,
+            notes=notes
+        )
+        result.update(success=True, action=action, agent_name=agent.full_name)
+    
+    db.commit()
+    return results
+
+
 # ================================
 # PARTNER HOLD UTILITIES
 # ================================
@@ -343,36 +509,24 @@ def validate_partner_order_access(
 def check_partner_on_hold(db: Session, partner_id: int) -> bool:
     """
     Check if a partner is currently on hold.
+    Reads the in-memory hold cache; expired holds are lifted by the
+    background auto-lift job, not here.
     
     Args:
-        db: Database session
+        db: Database session (used only to load the cache when stale)
         partner_id: ID of the partner
         
     Returns:
         True if partner is on hold, False otherwise
     """
-    current_hold = db.query(PartnerHold).filter(
-        PartnerHold.partner_id == partner_id,
-        PartnerHold.is_active == True
-    ).first()
-    
-    if not current_hold:
-        return False
-    
-    # Check if hold has expired
-    if current_hold.lift_date and current_hold.lift_date <= datetime.now(timezone.utc):
-        # Auto-lift the hold
-        current_hold.is_active = False
-        current_hold.lifted_at = datetime.now(timezone.utc)
-        db.commit()
-        return False
-    
-    return True
+    return hold_cache.is_on_hold(db, partner_id)
 
 
 def get_partner_hold_details(db: Session, partner_id: int) -> Optional[PartnerHold]:
     """
     Get current active hold details for a partner.
+    A timed hold past its lift date is not returned (even before the
+    auto-lift job has marked it lifted).
     
     Args:
         db: Database session
@@ -381,23 +535,11 @@ def get_partner_hold_details(db: Session, partner_id: int) -> Optional[PartnerHo
     Returns:
         PartnerHold object if active hold exists, None otherwise
     """
-    current_hold = db.query(PartnerHold).filter(
+    return db.query(PartnerHold).filter(
         PartnerHold.partner_id == partner_id,
-        PartnerHold.is_active == True
-    ).first()
-    
-    if not current_hold:
-        return None
-    
-    # Check if hold has expired
-    if current_hold.lift_date and current_hold.lift_date <= datetime.now(timezone.utc):
-        # Auto-lift the hold
-        current_hold.is_active = False
-        current_hold.lifted_at = datetime.now(timezone.utc)
-        db.commit()
-        return None
-    
-    return current_hold
+        PartnerHold.is_active == True,
+        or_(PartnerHold.lift_date == None, PartnerHold.lift_date > datetime.now(timezone.utc))
+    ).order_by(PartnerHold.id.desc()).first()
 
 
 def place_partner_hold(
@@ -427,8 +569,8 @@ def place_partner_hold(
     if not partner:
         raise ValueError(f"Partner with ID {partner_id} not found")
     
-    # Check if already on hold
-    if check_partner_on_hold(db, partner_id):
+    # Check if already on hold (from the database, not the cache)
+    if get_partner_hold_details(db, partner_id):
         raise ValueError("Partner is already on hold")
     
     hold = PartnerHold(
@@ -443,6 +585,7 @@ def place_partner_hold(
     db.add(hold)
     db.commit()
     db.refresh(hold)
+    hold_cache.refresh_partner(db, partner_id)
     
     return hold
 
@@ -480,5 +623,6 @@ def lift_partner_hold(
     
     db.commit()
     db.refresh(hold)
+    hold_cache.refresh_partner(db, partner_id)
     
     return hold
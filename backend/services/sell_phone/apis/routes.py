@@ -1,19 +1,23 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status, Body
+from fastapi import APIRouter, Depends, Query, HTTPException, status, Body, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
-from backend.shared.db.connections import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, select
+from backend.shared.db.connections import get_db, get_async_db
+from backend.shared import responses, http_cache
 from ..schema.models import PhoneList, Order, LeadLock, OrderStatusHistory
 from ..schema import schemas as sell_schemas
+from .. import catalog_version
 from ..utils import (
-    mock_ai_price_prediction, get_serviceable_partners, calculate_lead_cost,
+    mock_ai_price_prediction, get_serviceable_partners, calculate_lead_cost, get_lead_cost_percentage,
     check_active_lock, create_status_history, get_lock_duration_minutes,
     deduct_partner_credits, expire_lock_if_needed
 )
 from backend.services.auth import utils as auth_utils, models as auth_models
-from backend.services.partner.schema.models import Partner, PartnerServiceablePincode
+from backend.services.partner.schema.models import Partner
+from backend.services.partner.pincode_index import pincode_index
 from backend.services.admin.schema.models import PartnerCreditTransaction
 from math import ceil
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
 router = APIRouter(prefix="/sell-phone", tags=["Sell Phone"])
@@ -21,41 +25,59 @@ router = APIRouter(prefix="/sell-phone", tags=["Sell Phone"])
 # Simple geocoder (Nominatim via geopy)
 # Note: pickup coordinates removed — geocoding not required here anymore.
 
+# Part of the catalog ETags; bump when a catalog response's shape changes
+CATALOG_RESPONSE_REVISION = 1
+
+
+async def catalog_not_modified(request: Request, response: Response, db: AsyncSession):
+    """
+    Set the catalog's ETag / Last-Modified on `response` (from the version
+    counter bumped on every phones_list write). Returns the 304 response to
+    send if the client's copy is current, else None.
+    """
+    row = (await db.execute(catalog_version.version_select())).first()
+    version, updated_at = (row.version, row.updated_at) if row else (0, None)
+    etag = http_cache.make_etag("catalog", CATALOG_RESPONSE_REVISION, version)
+    return http_cache.conditional(request, response, etag, updated_at)
+
+
 @router.get("/phones")
-def get_phones_list(
-    db: Session = Depends(get_db),
+async def get_phones_list(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=100, description="Items per page"),
     search: str = Query(None, description="Search query for Brand or Model")
 ):
-    # Subquery to get unique Brand + Model combinations, selecting the max id for each
-    subquery = db.query(
-        PhoneList.Brand,
-        PhoneList.Model,
-        func.max(PhoneList.id).label('max_id')
-    ).group_by(PhoneList.Brand, PhoneList.Model).subquery()
+    not_modified = await catalog_not_modified(request, response, db)
+    if not_modified:
+        return not_modified
+
+    # One row per Brand + Model: the max id represents the model, and the
+    # highest variant price is aggregated in the same pass
+    subquery = select(
+        PhoneList.brand_key,
+        PhoneList.model_key,
+        func.max(PhoneList.id).label('max_id'),
+        func.max(PhoneList.Selling_Price).label('highest_price')
+    ).group_by(PhoneList.brand_key, PhoneList.model_key).subquery()
     
-    query = db.query(PhoneList).join(subquery, PhoneList.id == subquery.c.max_id)
+    query = select(PhoneList, subquery.c.highest_price).join(subquery, PhoneList.id == subquery.c.max_id)
     
     if search:
         # Decode '+' back to spaces for proper search
         search = search.replace('+', ' ')
-        query = query.filter(
+        query = query.where(
             PhoneList.Brand.ilike(f"%{search}%") | PhoneList.Model.ilike(f"%{search}%")
         )
     
-    total = query.count()
-    phones = query.offset((page - 1) * limit).limit(limit).all()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    rows = (await db.execute(query.offset((page - 1) * limit).limit(limit))).all()
     total_pages = ceil(total / limit)
     
     result_phones = []
-    for phone in phones:
-        # Get the highest variant price for this phone model
-        highest_variant = db.query(func.max(PhoneList.Selling_Price)).filter(
-            PhoneList.Brand == phone.Brand,
-            PhoneList.Model == phone.Model
-        ).scalar()
-        
+    for phone, highest_price in rows:
         result_phones.append({
             "id": phone.id,
             "Brand": phone.Brand,
@@ -63,7 +85,7 @@ def get_phones_list(
             "Model": phone.Model,
             "Storage_Raw": phone.Storage_Raw,
             "Original_Price": phone.Original_Price,
-            "Selling_Price": highest_variant or phone.Selling_Price,
+            "Selling_Price": highest_price or phone.Selling_Price,
             "RAM_GB": phone.RAM_GB,
             "Internal_Storage_GB": phone.Internal_Storage_GB
         })
@@ -77,16 +99,20 @@ def get_phones_list(
     }
 
 @router.get("/phones/{phone_id}")
-def get_phone(phone_id: int, db: Session = Depends(get_db)):
-    phone = db.query(PhoneList).filter(PhoneList.id == phone_id).first()
+async def get_phone(phone_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    not_modified = await catalog_not_modified(request, response, db)
+    if not_modified:
+        return not_modified
+
+    phone = await db.get(PhoneList, phone_id)
     if not phone:
         raise HTTPException(status_code=404, detail="Phone not found")
     
     # Get the highest variant price for this phone model
-    highest_variant = db.query(func.max(PhoneList.Selling_Price)).filter(
-        PhoneList.Brand == phone.Brand,
-        PhoneList.Model == phone.Model
-    ).scalar()
+    highest_variant = await db.scalar(select(func.max(PhoneList.Selling_Price)).where(
+        PhoneList.brand_key == phone.brand_key,
+        PhoneList.model_key == phone.model_key
+    ))
     
     return {
         "id": phone.id,
@@ -101,15 +127,21 @@ def get_phone(phone_id: int, db: Session = Depends(get_db)):
     }
 
 @router.get("/phones/{phone_id}/variants")
-def get_phone_variants(phone_id: int, db: Session = Depends(get_db)):
-    phone = db.query(PhoneList).filter(PhoneList.id == phone_id).first()
+async def get_phone_variants(
+    phone_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    not_modified = await catalog_not_modified(request, response, db)
+    if not_modified:
+        return not_modified
+
+    phone = await db.get(PhoneList, phone_id)
     if not phone:
         raise HTTPException(status_code=404, detail="Phone not found")
     
-    variants = db.query(PhoneList.RAM_GB, PhoneList.Internal_Storage_GB).filter(
-        PhoneList.Brand == phone.Brand,
-        PhoneList.Model == phone.Model
-    ).distinct().all()
+    variants = (await db.execute(select(PhoneList.RAM_GB, PhoneList.Internal_Storage_GB).where(
+        PhoneList.brand_key == phone.brand_key,
+        PhoneList.model_key == phone.model_key
+    ).distinct())).all()
     
     rams = sorted(set(v.RAM_GB for v in variants))
     storages = sorted(set(v.Internal_Storage_GB for v in variants))
@@ -117,22 +149,28 @@ def get_phone_variants(phone_id: int, db: Session = Depends(get_db)):
     return {"rams": rams, "storages": storages}
 
 @router.get("/phones/{phone_id}/price")
-def get_phone_variant_price(
+async def get_phone_variant_price(
     phone_id: int,
+    request: Request,
+    response: Response,
     ram_gb: int = Query(..., description="RAM in GB"),
     storage_gb: int = Query(..., description="Storage in GB"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    phone = db.query(PhoneList).filter(PhoneList.id == phone_id).first()
+    not_modified = await catalog_not_modified(request, response, db)
+    if not_modified:
+        return not_modified
+
+    phone = await db.get(PhoneList, phone_id)
     if not phone:
         raise HTTPException(status_code=404, detail="Phone not found")
     
-    variant = db.query(PhoneList.Selling_Price).filter(
-        PhoneList.Brand == phone.Brand,
-        PhoneList.Model == phone.Model,
+    variant = (await db.execute(select(PhoneList.Selling_Price).where(
+        PhoneList.brand_key == phone.brand_key,
+        PhoneList.model_key == phone.model_key,
         PhoneList.RAM_GB == ram_gb,
         PhoneList.Internal_Storage_GB == storage_gb
-    ).first()
+    ).limit(1))).first()
     
     if not variant:
         raise HTTPException(status_code=404, detail="Variant not found")
@@ -263,7 +301,7 @@ def get_my_orders(
 	Get orders for the current user.
 	"""
 	query = db.query(Order).filter(Order.customer_id == current_user.id)
-	return query.order_by(Order.created_at.desc()).all()
+	return responses.list_response(query.order_by(Order.created_at.desc()).all(), sell_schemas.OrderOut)
 
 
 @router.post("/orders/{order_id}/cancel", response_model=sell_schemas.OrderCancelResponse)
@@ -332,13 +370,13 @@ def cancel_order(
 # ================================
 
 @router.get("/partner/leads/available", response_model=List[sell_schemas.LeadSummary])
-def get_available_leads(
+async def get_available_leads(
 	page: int = Query(1, ge=1),
 	limit: int = Query(20, ge=1, le=100),
 	min_price: Optional[float] = Query(None, ge=0),
 	max_price: Optional[float] = Query(None, ge=0),
 	brand: Optional[str] = Query(None),
-	db: Session = Depends(get_db),
+	db: AsyncSession = Depends(get_async_db),
 	current_partner: Partner = Depends(auth_utils.get_current_partner),
 ):
 	"""
@@ -346,52 +384,57 @@ def get_available_leads(
 	Shows leads that are not locked or purchased by others.
 	"""
 	# Check if partner is on hold
-	from backend.services.partner import utils as partner_utils
-	if partner_utils.check_partner_on_hold(db, current_partner.id):
+	if current_partner.is_on_hold:
 		return []  # Return empty list instead of raising error for better UX
 	
 	# Get partner's serviceable pincodes
-	serviceable_pincodes = db.query(PartnerServiceablePincode.pincode).filter(
-		PartnerServiceablePincode.partner_id == current_partner.id,
-		PartnerServiceablePincode.is_active == True
-	).all()
-	
-	pincode_list = [p.pincode for p in serviceable_pincodes]
+	pincode_list = await db.run_sync(pincode_index.pincodes_for_partner, current_partner.id)
 	
 	if not pincode_list:
 		return []
 	
-	# Base query: orders in partner's pincodes with status available_for_partners
-	# Use pickup_pincode when available, fall back to legacy pincode
-	query = db.query(Order).filter(
-		func.coalesce(Order.pickup_pincode, Order.pincode).in_(pincode_list),
-		Order.status == "available_for_partners"
+	# Base query: orders in partner's pincodes with status available_for_partners.
+	# Legacy rows had pickup_pincode backfilled from pincode, so filtering on
+	# pickup_pincode alone lets the (status, pickup_pincode, created_at) index apply.
+	query = select(Order).where(
+		Order.status == "available_for_partners",
+		Order.pickup_pincode.in_(pincode_list)
 	)
 	
 	# Apply filters
 	if min_price is not None:
-		query = query.filter(Order.final_quoted_price >= min_price)
+		query = query.where(Order.final_quoted_price >= min_price)
 	if max_price is not None:
-		query = query.filter(Order.final_quoted_price <= max_price)
+		query = query.where(Order.final_quoted_price <= max_price)
 	if brand:
-		query = query.filter(Order.brand.ilike(f"%{brand}%"))
-	
-	# Get total count before pagination
-	total = query.count()
+		query = query.where(Order.brand.ilike(f"%{brand}%"))
 	
 	# Paginate
-	orders = query.order_by(Order.created_at.desc()).offset((page - 1) * limit).limit(limit).all()
+	orders = (await db.scalars(
+		query.order_by(Order.created_at.desc()).offset((page - 1) * limit).limit(limit)
+	)).all()
+	if not orders:
+		return []
+	
+	# Lock state of the whole page in one query; expired locks are released
+	# the same way expire_lock_if_needed does
+	locks = (await db.execute(select(LeadLock, LeadLock.expires_at > datetime.now(timezone.utc)).where(
+		LeadLock.order_id.in_([order.id for order in orders]),
+		LeadLock.is_active == True
+	))).all()
+	active_locks = {lock.order_id: lock for lock, live in locks if live}
+	expired_order_ids = {lock.order_id for lock, live in locks if not live}
+	if expired_order_ids:
+		await db.run_sync(lambda sync_db: [expire_lock_if_needed(sync_db, order_id) for order_id in expired_order_ids])
 	
 	# Calculate lead cost for each and check lock status
+	lead_cost_percentage = await db.run_sync(get_lead_cost_percentage)
 	leads = []
 	for order in orders:
-		# Expire any expired locks before checking
-		expire_lock_if_needed(db, order.id)
-		
-		lead_cost = calculate_lead_cost(db, order.final_quoted_price or order.quoted_price)
+		lead_cost = calculate_lead_cost(None, order.final_quoted_price or order.quoted_price, lead_cost_percentage)
 		
 		# Check if this lead is actively locked
-		active_lock = check_active_lock(db, order.id)
+		active_lock = active_locks.get(order.id)
 		is_locked = active_lock is not None
 		locked_by_me = is_locked and active_lock.partner_id == current_partner.id
 		
@@ -405,9 +448,9 @@ def get_available_leads(
 			condition=order.condition,
 			quoted_price=order.final_quoted_price or order.quoted_price,
 			ai_estimated_price=order.ai_estimated_price,
-				pickup_pincode=(order.pickup_pincode or order.pincode),
-				pickup_city=(order.pickup_city or order.city),
-				pickup_state=(order.pickup_state or order.state),
+			pickup_pincode=(order.pickup_pincode or order.pincode),
+			pickup_city=(order.pickup_city or order.city),
+			pickup_state=(order.pickup_state or order.state),
 			pickup_date=order.pickup_date,
 			lead_cost=lead_cost,
 			is_locked=is_locked,
@@ -436,13 +479,7 @@ def get_lead_detail(
 		raise HTTPException(status_code=404, detail="Lead not found")
 	
 	# Verify partner services this pincode (use pickup_pincode with fallback)
-	serviceable = db.query(PartnerServiceablePincode).filter(
-		PartnerServiceablePincode.partner_id == current_partner.id,
-		PartnerServiceablePincode.pincode == (order.pickup_pincode or order.pincode),
-		PartnerServiceablePincode.is_active == True
-	).first()
-	
-	if not serviceable:
+	if not pincode_index.partner_services_pincode(db, current_partner.id, order.pickup_pincode or order.pincode):
 		raise HTTPException(
 			status_code=403,
 			detail="This lead is not in your serviceable area"
@@ -504,8 +541,7 @@ def lock_lead(
 	Lock expires after configured duration (default 15 minutes).
 	"""
 	# Check if partner is on hold
-	from backend.services.partner import utils as partner_utils
-	if partner_utils.check_partner_on_hold(db, current_partner.id):
+	if current_partner.is_on_hold:
 		raise HTTPException(
 			status_code=status.HTTP_403_FORBIDDEN,
 			detail="Your account is on hold. You cannot access leads at this time. Contact support for details."
@@ -524,13 +560,7 @@ def lock_lead(
 		)
 	
 	# Verify partner services this pincode
-	serviceable = db.query(PartnerServiceablePincode).filter(
-		PartnerServiceablePincode.partner_id == current_partner.id,
-		PartnerServiceablePincode.pincode == (order.pickup_pincode or order.pincode),
-		PartnerServiceablePincode.is_active == True
-	).first()
-	
-	if not serviceable:
+	if not pincode_index.partner_services_pincode(db, current_partner.id, order.pickup_pincode or order.pincode):
 		raise HTTPException(
 			status_code=403,
 			detail="This lead is not in your serviceable area"
@@ -664,8 +694,7 @@ def purchase_lead(
 	Race-condition safe with SELECT FOR UPDATE on partner credits.
 	"""
 	# Check if partner is on hold
-	from backend.services.partner import utils as partner_utils
-	if partner_utils.check_partner_on_hold(db, current_partner.id):
+	if current_partner.is_on_hold:
 		raise HTTPException(
 			status_code=status.HTTP_403_FORBIDDEN,
 			detail="Your account is on hold. You cannot purchase leads at this time. Contact support for details."
@@ -0,0 +1,49 @@
+"""
+Phone catalog version, the HTTP cache validator of the catalog routes.
+
+The single `catalog_version` row is bumped in the same transaction as every
+write to `phones_list`: a `before_flush` session hook covers ORM writes (e.g.
+the admin phone CRUD), and bulk Core writers call `bump` themselves. Catalog
+writes are rare admin operations, so one row is enough.
+"""
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.services.sell_phone.schema.models import CatalogVersion, PhoneList
+
+CATALOG_VERSION_ID = 1
+
+
+def version_select():
+    """SELECT version, updated_at of the catalog; no row until the first catalog write."""
+    return select(CatalogVersion.version, CatalogVersion.updated_at).where(
+        CatalogVersion.id == CATALOG_VERSION_ID
+    )
+
+
+def bump(session: Session) -> None:
+    """
+    Invalidate cached catalog responses within the session's transaction.
+    Call after writes the flush hook cannot see (Core inserts/updates).
+    """
+    connection = session.connection()
+    table = CatalogVersion.__table__
+    increment = update(table).where(table.c.id == CATALOG_VERSION_ID).values(
+        version=table.c.version + 1, updated_at=func.now()
+    )
+    if connection.execute(increment).rowcount:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(insert(table).values(id=CATALOG_VERSION_ID, version=1))
+    except IntegrityError:
+        connection.execute(increment)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_on_catalog_write(session: Session, flush_context, instances) -> None:
+    if any(isinstance(obj, PhoneList) for obj in session.new) \
+            or any(isinstance(obj, PhoneList) for obj in session.deleted) \
+            or any(isinstance(obj, PhoneList) and session.is_modified(obj) for obj in session.dirty):
+        bump(session)
@@ -1,6 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Text, JSON, Index, text
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
-from backend.shared.db.connections import Base, engine
+from backend.shared.db.connections import Base
+
+
+def normalize_key(value: str) -> str:
+    """Lookup key for Brand / Model: trimmed and lowercased."""
+    return value.strip().lower()
 
 
 class PhoneList(Base):
@@ -16,6 +22,35 @@ class PhoneList(Base):
     RAM_GB = Column(Float, nullable=True)
     Internal_Storage_GB = Column(Float, nullable=False)
 
+    # Normalized copies of Brand / Model for case-insensitive variant lookups.
+    # Set automatically on ORM writes; Core bulk writes must fill them in.
+    brand_key = Column(String, nullable=False)
+    model_key = Column(String, nullable=False)
+
+    __table_args__ = (
+        # One row per variant; also serves brand/model and brand/model/ram lookups
+        Index("ux_phones_list_variant", "brand_key", "model_key", "RAM_GB", "Internal_Storage_GB", unique=True),
+    )
+
+    @validates("Brand", "Model")
+    def _sync_keys(self, key, value):
+        if value is not None:
+            setattr(self, "brand_key" if key == "Brand" else "model_key", normalize_key(value))
+        return value
+
+
+class CatalogVersion(Base):
+    """
+    Single-row version counter for the phone catalog, bumped by every write
+    to phones_list (see sell_phone/catalog_version.py). Used as the catalog's
+    HTTP cache validator.
+    """
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 
 class Order(Base):
     """
@@ -100,6 +135,28 @@ class Order(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # Composite indexes for the marketplace hot queries (see check_query_plans.py)
+    __table_args__ = (
+        # Available leads: status + pincode, newest first
+        Index("ix_orders_status_pickup_pincode_created_at", "status", "pickup_pincode", "created_at"),
+        # Same query, restricted to rows still on the marketplace
+        Index(
+            "ix_orders_available_pickup_pincode_created_at",
+            "pickup_pincode",
+            "created_at",
+            postgresql_where=text("status = 'available_for_partners'"),
+            sqlite_where=text("status = 'available_for_partners'"),
+        ),
+        # Partner locked deals
+        Index("ix_orders_partner_id_status_lead_locked_at", "partner_id", "status", "lead_locked_at"),
+        # Partner purchased orders
+        Index("ix_orders_partner_id_purchased_at", "partner_id", "purchased_at"),
+        # Agent orders
+        Index("ix_orders_agent_id_assigned_at", "agent_id", "assigned_at"),
+        # Agent delta sync: orders changed since the client's watermark
+        Index("ix_orders_agent_id_updated_at", "agent_id", "updated_at"),
+    )
+
 
 class OrderStatusHistory(Base):
     """
@@ -116,6 +173,11 @@ class OrderStatusHistory(Base):
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Agent delta sync: an order's entries since the client's watermark
+        Index("ix_order_status_history_order_id_created_at", "order_id", "created_at"),
+    )
+
 
 class LeadLock(Base):
     """
@@ -130,8 +192,3 @@ class LeadLock(Base):
     locked_at = Column(DateTime(timezone=True), server_default=func.now())
     expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
     is_active = Column(Boolean, default=True, index=True)
-
-
-# ensure tables exist
-Base.metadata.create_all(bind=engine)
-
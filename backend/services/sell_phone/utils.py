@@ -5,7 +5,8 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from backend.services.sell_phone.schema.models import Order, OrderStatusHistory, LeadLock
-from backend.services.partner.schema.models import Partner, PartnerServiceablePincode
+from backend.services.partner.schema.models import Partner
+from backend.services.partner.pincode_index import pincode_index
 from backend.services.admin.schema.models import AdminCreditConfiguration, PartnerCreditTransaction
 
 
@@ -27,13 +28,16 @@ def get_lead_cost_percentage(db: Session) -> float:
     return 15.0  # Default
 
 
-def calculate_lead_cost(db: Session, quoted_price: float) -> float:
+def calculate_lead_cost(db: Session, quoted_price: float, percentage: Optional[float] = None) -> float:
     """
     Calculate lead cost based on quoted price and admin configuration.
     Signature: (db, quoted_price) to match callers in routes.
     Lead Cost = Quoted Price × (Lead Cost Percentage / 100)
+    Pass `percentage` (from get_lead_cost_percentage) when costing many orders
+    to avoid re-reading the configuration for each one.
     """
-    percentage = get_lead_cost_percentage(db)
+    if percentage is None:
+        percentage = get_lead_cost_percentage(db)
     try:
         price = float(quoted_price or 0.0)
     except Exception:
@@ -121,43 +125,35 @@ def deduct_partner_credits(
     order_id: Optional[int] = None,
     payment_method: Optional[str] = None,
     payment_transaction_id: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
 ) -> Optional[PartnerCreditTransaction]:
     """
     Deduct credits from partner and create transaction record.
     Signature accepts `db` first and keyword args for flexibility.
-    Uses SELECT FOR UPDATE to prevent race conditions.
+    Goes through the credit ledger (atomic conditional UPDATE), so
+    concurrent deductions cannot overdraw or lose updates.
     Returns the transaction record if successful, None otherwise.
     """
-    # Lock partner row
-    partner = db.query(Partner).filter(Partner.id == partner_id).with_for_update().first()
+    from backend.services.admin import ledger
 
-    if not partner:
+    try:
+        transaction, _ = ledger.record_transaction(
+            db,
+            partner_id,
+            -amount,
+            transaction_type,
+            idempotency_key=idempotency_key,
+            reference_id=order_id,
+            reference_type="order" if order_id is not None else None,
+            payment_method=payment_method,
+            payment_transaction_id=payment_transaction_id,
+            notes=description,
+        )
+    except ledger.PartnerNotFoundError:
         return None
-
-    if partner.credit_balance < amount:
+    except ledger.InsufficientCreditsError:
         raise ValueError("Insufficient credits to purchase lead")
 
-    balance_before = partner.credit_balance
-    partner.credit_balance -= amount
-    balance_after = partner.credit_balance
-
-    # Create transaction record
-    transaction = PartnerCreditTransaction(
-        partner_id=partner_id,
-        transaction_type=transaction_type,
-        amount=-amount,
-        balance_before=balance_before,
-        balance_after=balance_after,
-        reference_id=order_id,
-        reference_type="order" if order_id is not None else None,
-        payment_method=payment_method,
-        payment_transaction_id=payment_transaction_id,
-        notes=description,
-    )
-
-    db.add(partner)
-    db.add(transaction)
-
     return transaction
 
 
@@ -165,13 +161,10 @@ def get_serviceable_partners(db: Session, pincode: str) -> int:
     """
     Get count of partners that service a given pincode.
     Signature accepts (db, pincode) to match callers across the codebase.
+    Served from the in-memory pincode index; only approved, active partners
+    that are not on hold are counted.
     """
-    count = db.query(PartnerServiceablePincode).filter(
-        PartnerServiceablePincode.pincode == pincode,
-        PartnerServiceablePincode.is_active == True
-    ).count()
-
-    return count
+    return pincode_index.partner_count(db, pincode)
 
 
 def mock_ai_price_prediction(order_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,124 @@
+"""
+Password hashing on a dedicated, bounded executor.
+
+bcrypt is deliberately slow (~250 ms at cost 12). Calling it directly inside a
+request handler ties up one of the server's worker threads for that whole
+time, so login spikes starve every other endpoint. Async handlers should use
+`hash_password_async` / `verify_password_async`, which run bcrypt on a
+separate pool sized to the CPU count and free the request worker while waiting.
+
+Settings (environment):
+    BCRYPT_ROUNDS            bcrypt cost for new hashes (default 12). Existing
+                             hashes with a different cost are upgraded on the
+                             next successful login (see needs_rehash).
+    PASSWORD_HASH_EXECUTOR   'thread' (default) or 'process'. bcrypt releases
+                             the GIL, so threads already hash in parallel; a
+                             process pool isolates hashing from the app
+                             process entirely.
+    PASSWORD_HASH_WORKERS    pool size (default: number of CPUs)
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0")) or (os.cpu_count() or 1)
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+# ------------------------------
+# Synchronous primitives (also what the pool workers run)
+# ------------------------------
+
+def hash_password(password: str, rounds: int = None) -> str:
+    """Hash a password with bcrypt at the configured cost."""
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Check a password against a bcrypt hash. Malformed hashes never match."""
+    try:
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    except ValueError:
+        return False
+
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost factor of a bcrypt hash ('$2b$12$...' -> 12), None if unparseable."""
+    parts = (hashed_password or "").split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True if a hash was made with a cost other than BCRYPT_ROUNDS."""
+    return hash_rounds(hashed_password) != BCRYPT_ROUNDS
+
+
+# ------------------------------
+# Executor
+# ------------------------------
+
+def get_executor() -> Executor:
+    """The process-wide hashing pool, created on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                if PASSWORD_HASH_EXECUTOR == "process":
+                    _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+                else:
+                    _executor = ThreadPoolExecutor(
+                        max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+                    )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+# ------------------------------
+# Async API for request handlers
+# ------------------------------
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), hash_password, password, BCRYPT_ROUNDS)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), verify_password, plain_password, hashed_password)
+
+
+async def rehash_if_needed(db, account, password: str) -> None:
+    """
+    After a successful login, re-hash the password if it was stored with a
+    different cost than BCRYPT_ROUNDS. `account` is any model with a
+    `hashed_password` column; the change is committed on `db`.
+    """
+    from starlette.concurrency import run_in_threadpool
+
+    if not needs_rehash(account.hashed_password):
+        return
+    account.hashed_password = await hash_password_async(password)
+
+    def _commit():
+        db.commit()
+        db.refresh(account)
+
+    await run_in_threadpool(_commit)
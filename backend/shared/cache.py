@@ -0,0 +1,57 @@
+"""
+Small thread-safe in-process TTL cache.
+
+Used for values that are expensive to compute but fine to serve slightly
+stale (e.g. filtered row counts for admin listings).
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Key/value cache whose entries expire `ttl_seconds` after being set."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if len(self._entries) >= self._max_entries and key not in self._entries:
+                # Drop expired entries first, then the oldest if still full
+                now = time.monotonic()
+                for k in [k for k, (exp, _) in self._entries.items() if exp < now]:
+                    del self._entries[k]
+                if len(self._entries) >= self._max_entries:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + self._ttl_seconds, value)
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or everything when no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
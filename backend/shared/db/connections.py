@@ -6,19 +6,101 @@ from dotenv import load_dotenv
 
 load_dotenv()  # loads .env from project root
 
+from backend.shared.db import pool  # noqa: E402 - reads DB_POOL_* after .env is loaded
+
 # Use DATABASE_URL env var (Postgres URI), fall back to local sqlite for dev
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./repriseai.db")
 
 # If using sqlite, keep check_same_thread; otherwise no special connect_args
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args, pool_pre_ping=True)
+# Pool sizing / pre-ping come from the DB_POOL_* environment (see pool.py)
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **pool.engine_pool_kwargs(DATABASE_URL))
+pool.install_pool_events(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# How the schema is managed:
+#   'create_all' (default) - create missing tables at startup (checks every table, dev/test)
+#   'alembic'              - migrations are applied at deploy time (`alembic upgrade head`);
+#                            startup does not touch the schema
+SCHEMA_MANAGEMENT = os.getenv("SCHEMA_MANAGEMENT", "create_all").lower()
+
+_schema_ready = False
+
+
+def ensure_schema() -> None:
+    """Create missing tables once per process, unless Alembic manages the schema."""
+    global _schema_ready
+    if _schema_ready or SCHEMA_MANAGEMENT == "alembic":
+        return
+    if SCHEMA_MANAGEMENT != "create_all":
+        raise ValueError("SCHEMA_MANAGEMENT must be 'create_all' or 'alembic'")
+    Base.metadata.create_all(bind=engine)
+    _schema_ready = True
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# ------------------------------
+# Async engine (asyncpg for Postgres, aiosqlite for SQLite)
+# ------------------------------
+#
+# Async handlers use `get_async_db` so they do not hold a threadpool worker
+# while waiting on the database. The engine is created on first use, so the
+# async drivers are only required by deployments that serve those routes.
+# ASYNC_DATABASE_URL overrides the URL derived from DATABASE_URL.
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_async_engine = None
+_async_sessionmaker = None
+
+
+def async_database_url(database_url: str = DATABASE_URL) -> str:
+    """DATABASE_URL with its driver swapped for the async one."""
+    override = os.getenv("ASYNC_DATABASE_URL")
+    if override:
+        return override
+    scheme, sep, rest = database_url.partition("://")
+    backend_name = scheme.split("+", 1)[0]
+    if backend_name not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{scheme}' URLs; set ASYNC_DATABASE_URL")
+    return f"{_ASYNC_DRIVERS[backend_name]}{sep}{rest}"
+
+
+def get_async_engine():
+    """The process-wide AsyncEngine, created on first use with the DB_POOL_* settings."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        kwargs = pool.engine_pool_kwargs(DATABASE_URL)
+        # Async engines need the asyncio-adapted pool; keep the sizing settings
+        kwargs.pop("poolclass", None)
+        _async_engine = create_async_engine(async_database_url(), **kwargs)
+        _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+async def get_async_db():
+    get_async_engine()
+    async with _async_sessionmaker() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
@@ -0,0 +1,68 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is an opaque url-safe base64 string holding the sort value and id
+of the last row of the previous page. The next page is fetched with
+`WHERE (sort_col, id) > (value, id)` (or `<` for descending sorts), so
+deep pages cost the same as the first one, unlike OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode the (sort value, id) of the last row on a page into a cursor."""
+    if isinstance(sort_value, datetime):
+        payload = {"t": "dt", "v": sort_value.isoformat(), "id": row_id}
+    else:
+        payload = {"v": sort_value, "id": row_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort_value = payload["v"]
+        if payload.get("t") == "dt":
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def apply_keyset(query, sort_column, id_column, descending: bool, cursor: Optional[str] = None):
+    """
+    Order a query by (sort_column, id_column) and, if a cursor is given,
+    restrict it to rows after the cursor position.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        if descending:
+            query = query.filter(or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < last_id),
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > sort_value,
+                and_(sort_column == sort_value, id_column > last_id),
+            ))
+
+    if descending:
+        return query.order_by(sort_column.desc(), id_column.desc())
+    return query.order_by(sort_column.asc(), id_column.asc())
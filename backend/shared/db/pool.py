@@ -0,0 +1,208 @@
+"""
+Connection pool configuration and telemetry for the shared engine.
+
+Settings (environment):
+    DB_POOL_SIZE               connections kept open (default 5)
+    DB_MAX_OVERFLOW            extra connections allowed under load (default 10)
+    DB_POOL_TIMEOUT_SECONDS    how long a checkout waits for a free connection
+                               before failing (default 30)
+    DB_POOL_RECYCLE_SECONDS    replace connections older than this; -1 disables
+                               (default 1800, below typical server/proxy idle cutoffs)
+    DB_POOL_PRE_PING           'always' (default): ping on every checkout.
+                               'on_error': no ping normally; after a disconnect
+                               error, ping on checkout for DB_PRE_PING_WINDOW_SECONDS
+                               so the remaining stale connections are weeded out.
+                               'off': never ping.
+    DB_PRE_PING_WINDOW_SECONDS see 'on_error' (default 60)
+
+`InstrumentedQueuePool` records how long each checkout waited for a
+connection and how many checkouts timed out; `pool_status` reports those
+together with the pool's current occupancy.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "always").lower()
+DB_PRE_PING_WINDOW_SECONDS = float(os.getenv("DB_PRE_PING_WINDOW_SECONDS", "60"))
+
+PRE_PING_MODES = ("always", "on_error", "off")
+
+# Recent checkout waits kept for percentiles
+WAIT_SAMPLE_SIZE = 2048
+
+
+class PoolStats:
+    """Thread-safe checkout counters shared by an instrumented pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+            self.connects = 0
+            self.invalidations = 0
+            self.pings = 0
+            self._recent_waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            self._recent_waits.append(seconds)
+
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = sorted(self._recent_waits)
+            attempts = self.checkouts + self.timeouts
+
+            def pct(p):
+                return waits[min(len(waits) - 1, int(round(p / 100 * (len(waits) - 1))))] if waits else 0.0
+
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "pings": self.pings,
+                "wait_ms": {
+                    "avg": round(self.total_wait_seconds / attempts * 1000, 3) if attempts else 0.0,
+                    "max": round(self.max_wait_seconds * 1000, 3),
+                    "p50": round(pct(50) * 1000, 3),
+                    "p95": round(pct(95) * 1000, 3),
+                    "p99": round(pct(99) * 1000, 3),
+                },
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout, including ones that time out."""
+
+    def __init__(self, *args, **kwargs):
+        self.stats = kwargs.pop("stats", None) or PoolStats()
+        super().__init__(*args, **kwargs)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # Keep counters across pool recreation (engine.dispose())
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def uses_queue_pool(database_url: str) -> bool:
+    """In-memory SQLite needs its default single-connection pool."""
+    url = make_url(database_url)
+    return not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"))
+
+
+def engine_pool_kwargs(database_url: str) -> dict:
+    """create_engine() keyword arguments for the configured pool."""
+    if DB_POOL_PRE_PING not in PRE_PING_MODES:
+        raise ValueError(f"DB_POOL_PRE_PING must be one of {', '.join(PRE_PING_MODES)}")
+
+    kwargs = {"pool_pre_ping": DB_POOL_PRE_PING == "always"}
+    if uses_queue_pool(database_url):
+        kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=DB_POOL_RECYCLE_SECONDS,
+        )
+    return kwargs
+
+
+def install_pool_events(engine) -> None:
+    """Connect/invalidate counters and, in 'on_error' mode, the reactive pre-ping."""
+    stats = getattr(engine.pool, "stats", None)
+    if stats is not None:
+        event.listen(engine, "connect", lambda *args: stats.increment("connects"))
+        event.listen(engine, "invalidate", lambda *args: stats.increment("invalidations"))
+
+    if DB_POOL_PRE_PING != "on_error":
+        return
+
+    # Monotonic deadline until which checkouts are pinged; 0 = not pinging
+    ping_until = [0.0]
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        if context.is_disconnect:
+            logger.warning("Database disconnect detected; pinging pooled connections for %ss", DB_PRE_PING_WINDOW_SECONDS)
+            ping_until[0] = time.monotonic() + DB_PRE_PING_WINDOW_SECONDS
+
+    @event.listens_for(engine, "checkout")
+    def _ping_after_error(dbapi_connection, connection_record, connection_proxy):
+        if not ping_until[0] or time.monotonic() > ping_until[0]:
+            return
+        if stats is not None:
+            stats.increment("pings")
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception:
+            # The pool discards this connection and retries with a fresh one
+            raise exc.DisconnectionError()
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+
+def pool_status(engine) -> dict:
+    """Current occupancy and checkout telemetry for an engine's pool."""
+    pool = engine.pool
+    status = {
+        "pool_class": type(pool).__name__,
+        "pre_ping": DB_POOL_PRE_PING,
+    }
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            timeout_seconds=pool.timeout(),
+            recycle_seconds=pool._recycle,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(0, pool.overflow()),
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
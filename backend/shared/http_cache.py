@@ -0,0 +1,169 @@
+"""
+HTTP cache validators (ETag / Last-Modified) and conditional GET.
+
+Two ways to get 304 Not Modified responses:
+
+- `conditional()` for routes that know a cheap version of their data (e.g.
+  the phone catalog's version counter). It is checked before the expensive
+  queries run, so a matching request costs one lookup.
+- `ETagMiddleware` for everything else under the given path prefixes (admin
+  listings): the ETag is a hash of the response body, so the handler still
+  runs but unchanged bodies are not sent again.
+
+ETags are weak (W/"...") because compression may change the bytes on the wire.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+
+# Clients may reuse a copy only after revalidating it
+REVALIDATE = "no-cache"
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag from the given version parts."""
+    return 'W/"' + "-".join(str(p) for p in parts) + '"'
+
+
+def body_etag(body: bytes) -> str:
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _not_modified_since(if_modified_since: Optional[str], last_modified: Optional[datetime]) -> bool:
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision
+    return last_modified.replace(microsecond=0) <= since
+
+
+def conditional(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = REVALIDATE,
+) -> Optional[Response]:
+    """
+    Set validators on the route's `response`. Returns a 304 response to send
+    instead when the client's copy is current, else None.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = etag_matches(if_none_match, etag)
+    else:
+        fresh = _not_modified_since(request.headers.get("if-modified-since"), last_modified)
+    return Response(status_code=304, headers=headers) if fresh else None
+
+
+def _kept_on_304(name: bytes) -> bool:
+    name = name.lower()
+    return name in (b"vary", b"content-location", b"expires") or name.startswith(b"access-control-")
+
+
+class ETagMiddleware:
+    """
+    Adds a body-hash ETag to successful GET responses under `path_prefixes`
+    and answers matching If-None-Match requests with 304. Streamed responses
+    (sent in several chunks, e.g. exports) and responses that already carry an
+    ETag are passed through untouched.
+    """
+
+    def __init__(self, app, path_prefixes: Iterable[str] = ("/",), cache_control: str = PRIVATE_REVALIDATE):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+        self.cache_control = cache_control
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" \
+                or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+                break
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                if message["status"] != 200 or any(name.lower() == b"etag" for name, _ in headers):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                # Streaming response: no single body to hash
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            etag = body_etag(body)
+            headers = [(n, v) for n, v in start_message.get("headers", []) if n.lower() != b"cache-control"]
+            validators = [(b"etag", etag.encode("latin-1")), (b"cache-control", self.cache_control.encode("latin-1"))]
+            if etag_matches(if_none_match, etag):
+                await send({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(n, v) for n, v in headers if _kept_on_304(n)] + validators,
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send({**start_message, "headers": headers + validators})
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
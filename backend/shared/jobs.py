@@ -0,0 +1,63 @@
+"""
+Minimal in-process periodic jobs.
+
+Each job runs on its own daemon thread at a fixed interval. Jobs must open
+their own DB session and handle their own errors; an exception escaping a
+job is logged and the job keeps its schedule.
+"""
+import logging
+import threading
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], None], run_on_start: bool = False):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.run_on_start = run_on_start
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self) -> None:
+        if self.run_on_start:
+            self._run_once()
+        while not self._stop.wait(self.interval_seconds):
+            self._run_once()
+
+    def _run_once(self) -> None:
+        try:
+            self.func()
+        except Exception:
+            logger.exception("Periodic job %s failed", self.name)
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval_seconds <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_jobs: List[PeriodicJob] = []
+
+
+def register_job(name: str, interval_seconds: float, func: Callable[[], None], run_on_start: bool = False) -> PeriodicJob:
+    """Register a job to be started by start_jobs(). An interval <= 0 disables it."""
+    job = PeriodicJob(name, interval_seconds, func, run_on_start)
+    _jobs.append(job)
+    return job
+
+
+def start_jobs() -> None:
+    for job in _jobs:
+        job.start()
+
+
+def stop_jobs() -> None:
+    for job in _jobs:
+        job.stop()
@@ -0,0 +1,285 @@
+"""
+Per-endpoint request metrics in Prometheus text format.
+
+`MetricsMiddleware` times every request and records, per route template
+(e.g. /partner/orders/{order_id}/assign): latency, response size, and the
+number of SQL statements and total DB time the request spent. Statements are
+counted by SQLAlchemy cursor events on every engine (sync and async), failed
+statements included (those are also counted in db_failed_queries_total); the
+per-request counters travel in a ContextVar, which follows the request into
+threadpool handlers and async sessions alike.
+
+Settings (environment):
+    SLOW_QUERY_THRESHOLD_MS   log statements slower than this as warnings
+                              (default 500; 0 disables)
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "500"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+@dataclass
+class RequestStats:
+    scope: Optional[dict] = None
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def track_queries(scope: Optional[dict] = None) -> Iterator[RequestStats]:
+    """Count statements run in this context, including threads and tasks it starts."""
+    stats = RequestStats(scope=scope)
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+# ------------------------------
+# Metric types
+# ------------------------------
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = label_names
+        # labels -> [bucket counts..., sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            base = _format_labels(self.label_names, labels)
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{base},le="{_format_value(bound)}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{{{_format_labels(self.label_names, labels)}}} {_format_value(value)}")
+        return lines
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    def escape(value: str) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """All request metrics of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.request_duration = Histogram(
+                "http_request_duration_seconds", "Request latency by route",
+                LATENCY_BUCKETS, ("method", "route", "status"),
+            )
+            self.request_queries = Histogram(
+                "http_request_db_queries", "SQL statements executed per request",
+                QUERY_COUNT_BUCKETS, ("method", "route"),
+            )
+            self.request_db_time = Histogram(
+                "http_request_db_seconds", "Total DB time per request",
+                LATENCY_BUCKETS, ("method", "route"),
+            )
+            self.response_size = Histogram(
+                "http_response_size_bytes", "Response body size",
+                SIZE_BUCKETS, ("method", "route"),
+            )
+            self.slow_queries = Counter(
+                "db_slow_queries_total", f"Statements slower than {SLOW_QUERY_THRESHOLD_MS:g} ms",
+                ("route",),
+            )
+            self.failed_queries = Counter(
+                "db_failed_queries_total", "Statements that raised a database error", ("route",),
+            )
+
+    def record_request(self, method: str, route: str, status: int, seconds: float,
+                       stats: RequestStats, response_bytes: int) -> None:
+        with self._lock:
+            self.request_duration.observe((method, route, str(status)), seconds)
+            self.request_queries.observe((method, route), stats.queries)
+            self.request_db_time.observe((method, route), stats.db_seconds)
+            self.response_size.observe((method, route), response_bytes)
+
+    def record_slow_query(self, route: str) -> None:
+        with self._lock:
+            self.slow_queries.inc((route,))
+
+    def record_failed_query(self, route: str) -> None:
+        with self._lock:
+            self.failed_queries.inc((route,))
+
+    def render(self, extra_lines: Sequence[str] = ()) -> str:
+        with self._lock:
+            lines = []
+            for metric in (self.request_duration, self.request_queries, self.request_db_time,
+                           self.response_size, self.slow_queries, self.failed_queries):
+                lines.extend(metric.render())
+        lines.extend(extra_lines)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+# ------------------------------
+# SQLAlchemy hooks
+# ------------------------------
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which is discarded with the statement
+    # whether it succeeds or fails
+    if context is not None:
+        context._metrics_query_start = time.perf_counter()
+
+
+def _pop_elapsed(context) -> Optional[float]:
+    """Seconds since the statement started; None if it was not started or is already recorded."""
+    start = getattr(context, "_metrics_query_start", None)
+    if start is None:
+        return None
+    context._metrics_query_start = None
+    return time.perf_counter() - start
+
+
+def _record_query(statement: str, elapsed: float, failed: bool = False) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+    route = _route_template(stats.scope) if stats is not None and stats.scope is not None else "background"
+
+    if failed:
+        registry.record_failed_query(route)
+    if SLOW_QUERY_THRESHOLD_MS and elapsed * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        registry.record_slow_query(route)
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s",
+            elapsed * 1000, route, " ".join(statement.split())[:1000],
+        )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Statements run without an execution context (some dialect internals) are counted untimed
+    elapsed = _pop_elapsed(context) if context is not None else 0.0
+    if elapsed is not None:
+        _record_query(statement, elapsed)
+
+
+def _handle_error(exception_context) -> None:
+    elapsed = _pop_elapsed(exception_context.execution_context)
+    if elapsed is not None:
+        _record_query(exception_context.statement or "", elapsed, failed=True)
+
+
+_hooks_installed = False
+
+
+def install_query_hooks() -> None:
+    """Count and time statements on every engine in the process (idempotent)."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _hooks_installed = True
+
+
+# ------------------------------
+# ASGI middleware
+# ------------------------------
+
+class MetricsMiddleware:
+    """Records latency, response size and DB usage for every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        response_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        with track_queries(scope) as stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                registry.record_request(
+                    scope["method"], _route_template(scope), status_code,
+                    time.perf_counter() - start, stats, response_bytes,
+                )
@@ -0,0 +1,260 @@
+"""
+Fast JSON responses for large list endpoints.
+
+By default FastAPI validates every object a route returns against its
+response_model and then encodes the result with the stdlib JSON encoder. For
+lists built from our own ORM rows that validation is repeated work. The
+helpers here project rows onto the response schema's fields (the same
+filtering response_model does) using a field plan compiled once per schema,
+and encode them with orjson. Routes keep their response_model, which still
+drives the OpenAPI docs.
+
+Scalar values are coerced the way validation would (an int in a float field
+becomes a float, a str enum its value, a date in a datetime field midnight),
+so the output matches response_model byte for byte; check_json_responses.py
+verifies that for each converted route. Only plain schemas qualify: a schema
+with validators, computed fields or field types the plan cannot coerce is
+rejected when its plan is compiled.
+
+Settings (environment):
+    FAST_JSON_RESPONSES   'false' (default) hands the data back unchanged so
+                          FastAPI validates it as before; 'true' opts the
+                          converted routes into the fast path.
+"""
+import enum
+import os
+import types
+import typing
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Type
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+# UTC datetimes end in "Z", matching Pydantic's JSON output
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+_MISSING = object()
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+# ------------------------------
+# Schema plans
+# ------------------------------
+
+class _Field(typing.NamedTuple):
+    name: str
+    key: str
+    default: Any
+    nested: Optional[Type[BaseModel]]
+    many: bool
+    coerce: Optional[Callable[[Any], Any]]
+    exact: Optional[type]  # values of exactly this type need no coercion
+
+
+def _unwrap_optional(annotation):
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType) and len(args) == 1:
+        return args[0]
+    return annotation
+
+
+def _to_int(value):
+    if type(value) is int:
+        return value
+    if isinstance(value, (float, Decimal)) and value != int(value):
+        raise ValueError(f"{value!r} is not a whole number")
+    return int(value)
+
+
+def _to_float(value):
+    return value if type(value) is float else float(value)
+
+
+def _to_str(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value if type(value) is str else str(value)
+
+
+def _to_bool(value):
+    if type(value) is bool:
+        return value
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "t", "yes", "y", "on")
+    return bool(value)
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    return datetime.fromisoformat(value)
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+# Scalar annotations and how validation would convert values to them
+_COERCERS = {
+    int: _to_int,
+    float: _to_float,
+    str: _to_str,
+    bool: _to_bool,
+    datetime: _to_datetime,
+    date: _to_date,
+}
+# Annotations whose values are encoded as they are
+_PASS_THROUGH = (dict, list, Any)
+
+
+def _coercer(annotation, schema: Type[BaseModel], name: str) -> Optional[Callable[[Any], Any]]:
+    """
+    Conversion for a non-model field, None for pass-through.
+
+    Raises:
+        TypeError: If the plan cannot reproduce what validation does for the annotation
+    """
+    annotation = _unwrap_optional(annotation)
+    if annotation in _COERCERS:
+        return _COERCERS[annotation]
+    if annotation in _PASS_THROUGH or typing.get_origin(annotation) is dict:
+        return None
+    if typing.get_origin(annotation) in (list, List):
+        args = typing.get_args(annotation)
+        item = _coercer(args[0], schema, name) if args else None
+        return (lambda values: [v if v is None else item(v) for v in values]) if item else None
+    raise TypeError(f"{schema.__name__}.{name}: {annotation!r} is not supported by the fast path")
+
+
+def _nested_model(annotation) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """(model, is_list) for BaseModel / List[BaseModel] annotations, Optional or not."""
+    annotation = _unwrap_optional(annotation)
+    args = list(typing.get_args(annotation))
+    if typing.get_origin(annotation) in (list, List) and args:
+        model, _ = _nested_model(args[0])
+        return model, model is not None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def schema_plan(schema: Type[BaseModel]) -> Tuple[_Field, ...]:
+    """
+    Field plan for projecting rows onto `schema`.
+
+    Raises:
+        TypeError: If the schema has validators or computed fields, or a field
+            type whose validation the plan cannot reproduce
+    """
+    decorators = schema.__pydantic_decorators__
+    if decorators.field_validators or decorators.model_validators or decorators.validators \
+            or decorators.root_validators or decorators.computed_fields or decorators.field_serializers \
+            or decorators.model_serializers:
+        raise TypeError(f"{schema.__name__} has validators or serializers; use its response_model instead")
+
+    plan = []
+    for name, field in schema.model_fields.items():
+        nested, many = _nested_model(field.annotation)
+        if nested is not None:
+            schema_plan(nested)  # reject unsupported nested schemas up front too
+        coerce = None if nested is not None else _coercer(field.annotation, schema, name)
+        exact = _unwrap_optional(field.annotation) if coerce in _COERCERS.values() else None
+        default = _MISSING if field.is_required() else field.get_default(call_default_factory=True)
+        plan.append(_Field(name, field.serialization_alias or field.alias or name, default, nested, many, coerce, exact))
+    return tuple(plan)
+
+
+def project(obj: Any, schema: Type[BaseModel], exclude_unset: bool = False) -> dict:
+    """
+    Plain dict with the schema's fields taken from a dict, ORM object or row.
+
+    With exclude_unset, fields missing from a dict row are left out (what
+    response_model_exclude_unset does); otherwise they get their default.
+    """
+    is_dict = isinstance(obj, dict)
+    out = {}
+    for field in schema_plan(schema):
+        value = obj.get(field.name, _MISSING) if is_dict else getattr(obj, field.name, _MISSING)
+        if value is _MISSING:
+            if exclude_unset and is_dict:
+                continue
+            value = None if field.default is _MISSING else field.default
+        elif value is None:
+            pass
+        elif field.nested is not None:
+            if field.many:
+                value = [project(item, field.nested, exclude_unset) for item in value]
+            else:
+                value = project(value, field.nested, exclude_unset)
+        elif field.coerce is not None and type(value) is not field.exact:
+            value = field.coerce(value)
+        out[field.key] = value
+    return out
+
+
+# ------------------------------
+# Route helpers
+# ------------------------------
+
+def _headers(response: Optional[Response]) -> Optional[dict]:
+    # Headers set on the route's injected Response are only merged by FastAPI
+    # when the route returns data, so carry them over explicitly
+    return dict(response.headers) if response is not None else None
+
+
+def list_response(
+    rows: Iterable[Any],
+    schema: Optional[Type[BaseModel]] = None,
+    exclude_unset: bool = False,
+    response: Optional[Response] = None,
+):
+    """
+    Return a list of rows as an orjson response, projected onto `schema` if
+    given (rows already shaped as plain dicts can omit it). Pass the route's
+    injected `response` to keep headers set on it.
+    """
+    if not FAST_JSON_RESPONSES:
+        return rows if isinstance(rows, list) else list(rows)
+    if schema is None:
+        return ORJSONResponse(rows if isinstance(rows, list) else list(rows), headers=_headers(response))
+    return ORJSONResponse([project(row, schema, exclude_unset) for row in rows], headers=_headers(response))
+
+
+def model_response(
+    data: Any,
+    schema: Type[BaseModel],
+    exclude_unset: bool = False,
+    response: Optional[Response] = None,
+):
+    """Return a single object (e.g. a paginated envelope) as an orjson response."""
+    if not FAST_JSON_RESPONSES:
+        return data
+    return ORJSONResponse(project(data, schema, exclude_unset), headers=_headers(response))
@@ -0,0 +1,42 @@
+"""
+Per-phase startup timing.
+
+main.py wraps each startup phase (module imports, schema setup, router
+registration, background jobs) in `startup_timer.phase(...)`. The breakdown
+is logged once the app has started and served at /internal/startup.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self) -> dict:
+        return {
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases},
+            "total_ms": round((time.perf_counter() - self.started_at) * 1000, 1),
+        }
+
+    def log(self) -> None:
+        report = self.report()
+        breakdown = ", ".join(f"{name}={ms}ms" for name, ms in report["phases_ms"].items())
+        logger.info("Startup finished in %sms (%s)", report["total_ms"], breakdown)
+
+
+# Created when main.py starts importing the app
+startup_timer = StartupTimer()
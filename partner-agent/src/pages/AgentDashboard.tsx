@@ -1,7 +1,7 @@
 import { useState, useEffect } from "react";
 import { useAuth } from "../context/AuthContext";
 import { useNavigate } from "react-router-dom";
-import api from "../lib/api";
+import api, { getAllPages } from "../lib/api";
 import { formatPrice } from "../lib/utils";
 import { Button } from "../components/ui/button";
 import Header from "../components/Header";
@@ -163,8 +163,7 @@ export default function AgentDashboard() {
   const fetchOrders = async () => {
     setLoading(true);
     try {
-      const response = await api.get("/agent/orders");
-      const orders: Order[] = response.data;
+      const orders = await getAllPages<Order>("/agent/orders");
 
       // Filter orders into current and completed
       // Normalize status for comparison (handle both spaces and underscores)